@@ -0,0 +1,112 @@
+import sqlite3
+from collections import defaultdict
+
+import pandas as pd
+
+CARDS_QUERY = """
+SELECT name AS card_name, cmc, image_url
+FROM cards
+ORDER BY name
+"""
+
+# Result column -> link table query. Each link table is read once, in
+# primary-key order, instead of running three subqueries per card
+CARD_LINK_QUERIES = {
+    "card_types": "SELECT card_name, type_name FROM card_types ORDER BY card_name, type_name",
+    "card_tags": "SELECT card_name, tag_name FROM card_tags ORDER BY card_name, tag_name",
+    "decks": "SELECT DISTINCT card_name, deck_name FROM deck_cards WHERE section IN ('main', 'commander') "
+             "ORDER BY card_name, deck_name",
+}
+# Tables the frame is built from; re-ingesting any of them invalidates it
+ALL_CARDS_TABLES = ("cards", "card_types", "card_tags", "deck_cards")
+
+
+def build_all_cards_data_df(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Cards with their types, tags and decks as sorted lists (empty when missing)."""
+    df = pd.read_sql_query(CARDS_QUERY, conn)
+    for column, query in CARD_LINK_QUERIES.items():
+        grouped = defaultdict(list)
+        for card_name, value in conn.execute(query):
+            grouped[card_name].append(value)
+        df[column] = [grouped.get(card_name, []) for card_name in df["card_name"]]
+    return df
+
+
+if __name__ == "__main__":
+    # Benchmark: correlated GROUP_CONCAT subqueries, a pandas groupby, pre-aggregated
+    # CTEs and the set-based load, on a synthetic 50k-card DB
+    import random
+    import tempfile
+    import timeit
+    from pathlib import Path
+
+    from src.precon_db.migrations import migrate
+
+    correlated_query = """
+    SELECT
+        c.name AS card_name, c.cmc, c.image_url,
+        (SELECT GROUP_CONCAT(DISTINCT type_name) FROM card_types WHERE card_name = c.name) AS card_types,
+        (SELECT GROUP_CONCAT(DISTINCT tag_name) FROM card_tags WHERE card_name = c.name) AS card_tags,
+        (SELECT GROUP_CONCAT(DISTINCT deck_name) FROM deck_cards WHERE card_name = c.name) AS decks
+    FROM cards c
+    """
+    n_cards = 50_000
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(str(Path(tmp) / "bench.db"))
+        migrate(conn)
+        names = [f"Card {i}" for i in range(n_cards)]
+        conn.executemany("INSERT INTO cards (name, cmc, type, image_url) VALUES (?, ?, '', '')",
+                         [(name, random.randint(0, 8)) for name in names])
+        conn.executemany("INSERT OR IGNORE INTO card_types VALUES (?, ?)",
+                         [(name, random.choice(["creature", "instant", "artifact", "land"])) for name in names])
+        conn.executemany("INSERT OR IGNORE INTO card_tags VALUES (?, ?)",
+                         [(random.choice(names), f"tag_{random.randint(0, 30)}") for _ in range(n_cards)])
+        conn.executemany("INSERT OR IGNORE INTO deck_cards (card_name, deck_name) VALUES (?, ?)",
+                         [(random.choice(names), f"deck_{random.randint(0, 500)}") for _ in range(n_cards)])
+        conn.commit()
+
+        def _correlated():
+            df = pd.read_sql_query(correlated_query, conn)
+            # Consumers had to split the comma-joined strings themselves
+            for column in ("card_types", "card_tags", "decks"):
+                df[column] = [value.split(",") if value else [] for value in df[column]]
+
+        def _groupby():
+            df = pd.read_sql_query(CARDS_QUERY, conn)
+            for column, query in CARD_LINK_QUERIES.items():
+                links = pd.read_sql_query(query, conn)
+                grouped = links.groupby("card_name", sort=False)[links.columns[1]].agg(list)
+                df[column] = [value if isinstance(value, list) else [] for value in df["card_name"].map(grouped)]
+
+        cte_query = """
+        WITH types AS (SELECT card_name, GROUP_CONCAT(type_name, char(31)) AS v FROM card_types GROUP BY card_name),
+             tags AS (SELECT card_name, GROUP_CONCAT(tag_name, char(31)) AS v FROM card_tags GROUP BY card_name),
+             decks AS (SELECT card_name, GROUP_CONCAT(deck_name, char(31)) AS v FROM deck_cards GROUP BY card_name)
+        SELECT c.name AS card_name, c.cmc, c.image_url,
+               types.v AS card_types, tags.v AS card_tags, decks.v AS decks
+        FROM cards c
+        LEFT JOIN types ON types.card_name = c.name
+        LEFT JOIN tags ON tags.card_name = c.name
+        LEFT JOIN decks ON decks.card_name = c.name
+        ORDER BY c.name
+        """
+
+        def _cte():
+            df = pd.read_sql_query(cte_query, conn)
+            for column in ("card_types", "card_tags", "decks"):
+                df[column] = [value.split("\x1f") if value else [] for value in df[column]]
+
+        timings = {
+            "correlated subqueries + split": _correlated,
+            "groupby(...).agg(list)": _groupby,
+            "pre-aggregated CTEs + split": _cte,
+            "set-based load": lambda: build_all_cards_data_df(conn),
+        }
+        timings = {label: min(timeit.repeat(run, number=1, repeat=5)) for label, run in timings.items()}
+        print(build_all_cards_data_df(conn).head())
+        conn.close()
+
+    for label, seconds in timings.items():
+        print(f"{label + ':':<31}{seconds * 1000:5.0f} ms")
@@ -0,0 +1,53 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Figures shared by the dashboard tabs and the batch report, built from plain
+# arrays so they need neither Streamlit nor a database connection
+
+
+def deck_tag_chart(deck_name: str, tag_names: np.ndarray, tag_counts: np.ndarray) -> go.Figure:
+    """Cards per tag in one deck, most common tag first."""
+    order = np.argsort(-tag_counts, kind='stable')
+    fig = px.bar(
+        x=tag_names[order],
+        y=tag_counts[order],
+        title=f'Tag Count in {deck_name}',
+        labels={'x': 'Tag', 'y': 'Count'}
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+def deck_cmc_chart(deck_name: str, cmc_values: np.ndarray, cmc_counts: np.ndarray) -> go.Figure:
+    """Histogram of the deck's cards by CMC."""
+    fig = px.bar(
+        x=cmc_values,
+        y=cmc_counts,
+        title=f'CMC Distribution in {deck_name}',
+        labels={'x': 'Converted Mana Cost', 'y': 'Number of Cards'}
+    )
+    fig.update_layout(bargap=0)
+    return fig
+
+
+def similarity_heatmap(deck_names: np.ndarray, matrix: np.ndarray, deck_ids: np.ndarray, title: str) -> go.Figure:
+    """Pairwise similarity of `deck_ids`, in the given order.
+
+    Only the selected deck and its nearest neighbours are drawn: a heatmap
+    of every deck pair stops being readable long before it gets expensive.
+    """
+    names = list(deck_names[deck_ids])
+    fig = px.imshow(
+        matrix[np.ix_(deck_ids, deck_ids)],
+        x=names,
+        y=names,
+        zmin=0,
+        zmax=1,
+        color_continuous_scale='Blues',
+        text_auto='.2f',
+        title=title,
+        labels={'color': 'Similarity'}
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from src.analytics.model import DataModel, Links
+
+
+@dataclass
+class DeckView:
+    """Everything the Deck Analysis tab shows about one deck, precomputed."""
+
+    card_ids: np.ndarray
+    # Copies of each of `card_ids` in the deck
+    card_quantities: np.ndarray
+    # Tags and types present in the deck, in name order, with their card counts (counting copies)
+    tag_ids: np.ndarray
+    tag_counts: np.ndarray
+    type_ids: np.ndarray
+    # CMC histogram: one bin per distinct CMC value in the deck
+    cmc_values: np.ndarray
+    cmc_counts: np.ndarray
+    min_cmc: float
+    max_cmc: float
+
+
+def composed_counts(outer: Links, inner: Links, n_inner_targets: int) -> np.ndarray:
+    """Source x target count matrix of `outer` followed by `inner`, weighted by both links.
+
+    E.g. deck -> card followed by card -> tag counts the cards of every tag
+    in every deck, a card with four copies counting four times. Both CSR
+    arrays are walked once, without a Python loop.
+    """
+    starts = inner.offsets[outer.targets]
+    lengths = inner.offsets[outer.targets + 1] - starts
+    sources = np.repeat(outer.sources.astype(np.int64), lengths)
+    # Position in inner.targets of every composed link: the start of its
+    # inner row plus its rank within that row
+    ends = np.cumsum(lengths)
+    positions = np.repeat(starts - (ends - lengths), lengths) + np.arange(ends[-1] if len(ends) else 0)
+    weights = np.repeat(outer.weights, lengths) * inner.weights[positions]
+    return np.bincount(sources * n_inner_targets + inner.targets[positions], weights=weights,
+                       minlength=len(outer) * n_inner_targets).astype(np.int64).reshape(len(outer), n_inner_targets)
+
+
+def build_deck_views(model: DataModel) -> Dict[str, DeckView]:
+    """Views of every deck, from a handful of whole-model array passes."""
+    n_decks = len(model.deck_names)
+    tag_counts = composed_counts(model.deck_cards, model.card_tags, len(model.tag_names))
+    type_counts = composed_counts(model.deck_cards, model.card_types, len(model.type_names))
+
+    cmc_values, cmc_codes = np.unique(model.card_cmc, return_inverse=True)
+    cmc_counts = np.bincount(model.deck_cards.sources.astype(np.int64) * len(cmc_values)
+                             + cmc_codes[model.deck_cards.targets], weights=model.deck_cards.weights,
+                             minlength=n_decks * len(cmc_values)).astype(np.int64).reshape(n_decks, len(cmc_values))
+
+    views = {}
+    for deck_id, deck_name in enumerate(model.deck_names):
+        tag_ids = np.flatnonzero(tag_counts[deck_id])
+        cmc_bins = np.flatnonzero(cmc_counts[deck_id])
+        views[deck_name] = DeckView(
+            card_ids=model.deck_cards.row(deck_id),
+            card_quantities=model.deck_cards.row_weights(deck_id),
+            tag_ids=tag_ids,
+            tag_counts=tag_counts[deck_id, tag_ids],
+            type_ids=np.flatnonzero(type_counts[deck_id]),
+            cmc_values=cmc_values[cmc_bins],
+            cmc_counts=cmc_counts[deck_id, cmc_bins],
+            # Decks without cards get an empty range
+            min_cmc=float(cmc_values[cmc_bins[0]]) if len(cmc_bins) else 0.0,
+            max_cmc=float(cmc_values[cmc_bins[-1]]) if len(cmc_bins) else 0.0,
+        )
+    return views
@@ -0,0 +1,182 @@
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.queries import DECK_CARDS_QUERY
+
+# Tables the model is built from; re-ingesting any of them rebuilds it
+MODEL_TABLES = ("cards", "decks", "tags", "deck_cards", "card_tags", "card_types")
+
+
+def model_table_query(table: str) -> str:
+    """SQL the model reads `table` with: every row, except deck_cards outside the deck as played."""
+    return DECK_CARDS_QUERY if table == "deck_cards" else f"SELECT * FROM {table}"
+
+
+@dataclass
+class Links:
+    """One-to-many links in CSR form: the targets of source `i` are
+    `targets[offsets[i]:offsets[i + 1]]`, sorted ascending."""
+
+    offsets: np.ndarray
+    targets: np.ndarray
+    # Source id of every entry of `targets`, for vectorized group-bys
+    sources: np.ndarray
+    # Multiplicity of every entry, e.g. the copies of a card in a deck (1 for plain links)
+    weights: np.ndarray
+
+    @classmethod
+    def build(cls, sources: np.ndarray, targets: np.ndarray, n_sources: int,
+              weights: Optional[np.ndarray] = None) -> "Links":
+        order = np.lexsort((targets, sources))
+        counts = np.bincount(sources, minlength=n_sources)
+        offsets = np.zeros(n_sources + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            offsets=offsets,
+            targets=targets[order].astype(np.int32),
+            sources=sources[order].astype(np.int32),
+            weights=np.ones(len(order), dtype=np.int32) if weights is None else weights[order].astype(np.int32),
+        )
+
+    def inverse(self, n_targets: int) -> "Links":
+        return Links.build(self.targets, self.sources, n_targets, self.weights)
+
+    def row(self, source: int) -> np.ndarray:
+        return self.targets[self.offsets[source]:self.offsets[source + 1]]
+
+    def row_weights(self, source: int) -> np.ndarray:
+        return self.weights[self.offsets[source]:self.offsets[source + 1]]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+def _codes(values: pd.Series, names: np.ndarray) -> np.ndarray:
+    """Integer ids of `values` in the sorted `names` array (-1 when missing)."""
+    return pd.Categorical(values, categories=names).codes.astype(np.int32)
+
+
+def _sorted_names(values: pd.Series) -> np.ndarray:
+    return np.sort(pd.unique(values.astype(object))).astype(object)
+
+
+def _lookup(names: np.ndarray, name: str, kind: str) -> int:
+    """Position of `name` in the sorted `names` array; KeyError when it is not there."""
+    i = int(np.searchsorted(names, name))
+    if i == len(names) or names[i] != name:
+        raise KeyError(f"unknown {kind}: {name!r}")
+    return i
+
+
+@dataclass
+class DataModel:
+    """Integer-coded view of cards, decks, tags and types.
+
+    Every name is interned once into a sorted names array and referred to by
+    its position everywhere else; links are int32 CSR arrays, deck -> card
+    links weighted by the copies of the card in the deck, and tag
+    membership is also kept as a dense card x tag boolean matrix. Card ids
+    follow name order, the same row order as build_all_cards_data_df(), so
+    card ids and CardIndex positions are interchangeable.
+    """
+
+    card_names: np.ndarray
+    card_cmc: np.ndarray
+    card_image_urls: np.ndarray
+    deck_names: np.ndarray
+    tag_names: np.ndarray
+    type_names: np.ndarray
+    deck_cards: Links
+    card_tags: Links
+    card_types: Links
+    card_tag_matrix: np.ndarray
+
+    @classmethod
+    def build(cls, cards: pd.DataFrame, decks: pd.DataFrame, tags: pd.DataFrame, deck_cards: pd.DataFrame,
+              card_tags: pd.DataFrame, card_types: pd.DataFrame) -> "DataModel":
+        cards = cards.sort_values("name", kind="stable")
+        card_names = cards["name"].to_numpy(dtype=object)
+        deck_names = _sorted_names(decks["name"])
+        tag_names = _sorted_names(tags["name"])
+        type_names = _sorted_names(card_types["type_name"])
+
+        def links(df: pd.DataFrame, source: str, source_names: np.ndarray,
+                  target: str, target_names: np.ndarray, weight: Optional[str] = None) -> Links:
+            sources = _codes(df[source], source_names)
+            targets = _codes(df[target], target_names)
+            # Drop links to rows that are not in the parent tables
+            known = (sources >= 0) & (targets >= 0)
+            weights = df[weight].to_numpy()[known] if weight in df.columns else None
+            return Links.build(sources[known], targets[known], len(source_names), weights)
+
+        card_tag_links = links(card_tags, "card_name", card_names, "tag_name", tag_names)
+        card_tag_matrix = np.zeros((len(card_names), len(tag_names)), dtype=bool)
+        card_tag_matrix[card_tag_links.sources, card_tag_links.targets] = True
+
+        return cls(
+            card_names=card_names,
+            card_cmc=cards["cmc"].to_numpy(dtype=float),
+            card_image_urls=cards["image_url"].to_numpy(dtype=object),
+            deck_names=deck_names,
+            tag_names=tag_names,
+            type_names=type_names,
+            deck_cards=links(deck_cards, "deck_name", deck_names, "card_name", card_names, weight="quantity"),
+            card_tags=card_tag_links,
+            card_types=links(card_types, "card_name", card_names, "type_name", type_names),
+            card_tag_matrix=card_tag_matrix,
+        )
+
+    def deck_id(self, deck_name: str) -> int:
+        return _lookup(self.deck_names, deck_name, "deck")
+
+    def tag_id(self, tag_name: str) -> int:
+        return _lookup(self.tag_names, tag_name, "tag")
+
+    def card_ids(self, card_names: Sequence[str]) -> np.ndarray:
+        """Ids of `card_names`, in the given order; names missing from the model are dropped."""
+        ids = _codes(pd.Series(card_names, dtype=object), self.card_names)
+        return ids[ids >= 0]
+
+    def decks_per_card(self) -> np.ndarray:
+        """Number of decks each card is in, indexed by card id."""
+        return np.bincount(self.deck_cards.targets, minlength=len(self.card_names))
+
+    def tag_counts(self, card_ids: np.ndarray) -> np.ndarray:
+        """Number of `card_ids` carrying each tag, indexed by tag id."""
+        return self.card_tag_matrix[card_ids].sum(axis=0)
+
+    def copies_per_card(self) -> np.ndarray:
+        """Copies of each card over every deck, indexed by card id."""
+        return np.bincount(self.deck_cards.targets, weights=self.deck_cards.weights,
+                           minlength=len(self.card_names)).astype(np.int64)
+
+    def tag_counts_per_deck(self, tag_name: str) -> np.ndarray:
+        """Number of cards (counting copies) with `tag_name` in each deck, indexed by deck id."""
+        has_tag = self.card_tag_matrix[:, self.tag_id(tag_name)]
+        return np.bincount(self.deck_cards.sources, weights=has_tag[self.deck_cards.targets] * self.deck_cards.weights,
+                           minlength=len(self.deck_names)).astype(np.int64)
+
+    def tag_totals(self) -> np.ndarray:
+        """Tagged cards (counting copies) summed over every deck, indexed by tag id."""
+        return self.copies_per_card() @ self.card_tag_matrix
+
+    def type_ids(self, card_ids: np.ndarray) -> np.ndarray:
+        """Sorted distinct type ids of `card_ids`."""
+        selected = np.zeros(len(self.card_names), dtype=bool)
+        selected[card_ids] = True
+        return np.unique(self.card_types.targets[selected[self.card_types.sources]])
+
+    def card_tag_names(self, card_id: int) -> List[str]:
+        return list(self.tag_names[self.card_tags.row(card_id)])
+
+    def card_type_names(self, card_id: int) -> List[str]:
+        return list(self.type_names[self.card_types.row(card_id)])
+
+
+def read_model(conn: sqlite3.Connection) -> DataModel:
+    """Build the model straight from the database, for use outside the dashboard."""
+    return DataModel.build(*(pd.read_sql_query(model_table_query(table), conn) for table in MODEL_TABLES))
@@ -0,0 +1,18 @@
+# Reads shared by the dashboard loaders, the columnar snapshot and the batch report
+
+# Per-deck table materialized at ingest
+DECK_STATS_QUERY = """
+SELECT deck_name, total_cards, avg_cmc, unique_tags
+FROM deck_stats
+ORDER BY deck_name
+"""
+
+# Copies of each card in the deck as played: sideboard, maybeboard and
+# companion rows are stored but left out. A card in the main deck and the
+# command zone counts both
+DECK_CARDS_QUERY = """
+SELECT card_name, deck_name, SUM(quantity) AS quantity
+FROM deck_cards
+WHERE section IN ('main', 'commander')
+GROUP BY card_name, deck_name
+"""
@@ -0,0 +1,289 @@
+"""Batch report of every deck, without Streamlit.
+
+Loads the data model once, computes every per-deck view and the deck
+similarity matrices in whole-model array passes, then writes each deck's
+report on a pool of worker processes:
+
+    <out>/decks.csv, decks.json      one summary row per deck
+    <out>/csv/<deck>/*.csv           cards, tags, CMC histogram, similar decks
+    <out>/json/<deck>.json           the same, as one document
+    <out>/html/<deck>.html           static page with the dashboard's charts
+    <out>/html/index.html            links to every deck page
+
+Usage: python src/analytics/report.py [--out DIR] [--format csv,json,html]
+                                      [--jobs N] [--top-k K] [--db PATH]
+"""
+import functools
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from src.analytics.charts import deck_cmc_chart, deck_tag_chart, similarity_heatmap
+from src.analytics.deck_views import build_deck_views
+from src.analytics.model import DataModel, read_model
+from src.analytics.queries import DECK_STATS_QUERY
+from src.analytics.similarity import SIMILARITY_METRICS, DeckSimilarity
+
+FORMATS = ("csv", "json", "html")
+DEFAULT_TOP_K = 10
+# Below this many decks, starting worker processes costs more than it saves
+PARALLEL_MIN_DECKS = 32
+# Stands for the deck name in the chart templates
+_DECK_PLACEHOLDER = "__deck__"
+
+
+class UnknownDecks(ValueError):
+    """Decks asked for by name that are not in the database."""
+
+
+@dataclass
+class DeckReport:
+    """Everything written about one deck; plain frames and arrays, cheap to send to a worker."""
+
+    deck_name: str
+    summary: Dict[str, object]
+    cards: pd.DataFrame
+    tags: pd.DataFrame
+    cmc: pd.DataFrame
+    similar: pd.DataFrame
+    # The deck and its closest decks, and their pairwise card Jaccard, for the heatmap
+    neighbourhood: np.ndarray
+    neighbourhood_jaccard: np.ndarray
+
+
+def build_deck_reports(model: DataModel, deck_stats: pd.DataFrame, decks: Optional[Sequence[str]] = None,
+                       top_k: int = DEFAULT_TOP_K) -> Iterator[DeckReport]:
+    """Reports of `decks` (default: all), from views and similarities computed for every deck at once."""
+    views = build_deck_views(model)
+    similarity = DeckSimilarity.build(model)
+    stats = deck_stats.set_index("deck_name")
+    card_types = [", ".join(model.card_type_names(card_id)) for card_id in range(len(model.card_names))]
+    card_tags = [", ".join(model.card_tag_names(card_id)) for card_id in range(len(model.card_names))]
+
+    for deck_name in decks if decks is not None else model.deck_names:
+        view = views[deck_name]
+        deck_id = model.deck_id(deck_name)
+        similar_ids = similarity.top_k("card_jaccard", deck_id, top_k)
+        neighbourhood = np.concatenate([[deck_id], similar_ids])
+        has_stats = deck_name in stats.index
+        yield DeckReport(
+            deck_name=deck_name,
+            summary={
+                "deck_name": deck_name,
+                "distinct_cards": len(view.card_ids),
+                "total_cards": int(view.card_quantities.sum()),
+                # Aggregates materialized at ingest, the same numbers the dashboard shows
+                "non_land_cards": int(stats.at[deck_name, "total_cards"]) if has_stats else 0,
+                "avg_cmc": round(float(stats.at[deck_name, "avg_cmc"]), 4) if has_stats else None,
+                "unique_tags": int(stats.at[deck_name, "unique_tags"]) if has_stats else 0,
+                "most_similar_deck": model.deck_names[similar_ids[0]] if len(similar_ids) else None,
+            },
+            cards=pd.DataFrame({
+                "card_name": model.card_names[view.card_ids],
+                "quantity": view.card_quantities,
+                "cmc": model.card_cmc[view.card_ids],
+                "types": [card_types[card_id] for card_id in view.card_ids],
+                "tags": [card_tags[card_id] for card_id in view.card_ids],
+            }),
+            # Most common tag first, the order of the tag chart
+            tags=pd.DataFrame({"tag_name": model.tag_names[view.tag_ids], "tag_count": view.tag_counts})
+            .sort_values("tag_count", ascending=False, kind="stable"),
+            cmc=pd.DataFrame({"cmc": view.cmc_values, "total_cards": view.cmc_counts}),
+            similar=pd.DataFrame({
+                "deck_name": model.deck_names[similar_ids],
+                **{attribute: getattr(similarity, attribute)[deck_id, similar_ids].round(4)
+                   for attribute in SIMILARITY_METRICS.values()},
+                "shared_cards": similarity.shared_cards[deck_id, similar_ids],
+            }),
+            neighbourhood=model.deck_names[neighbourhood],
+            neighbourhood_jaccard=similarity.card_jaccard[np.ix_(neighbourhood, neighbourhood)],
+        )
+
+
+def _html_table(df: pd.DataFrame) -> str:
+    """Plain HTML table of `df`; DataFrame.to_html formats cell by cell and took most of the report's time."""
+    header = "".join(f"<th>{escape(str(column))}</th>" for column in df.columns)
+    rows = "".join(
+        "<tr>" + "".join(f"<td>{'' if value is None else escape(str(value))}</td>" for value in row) + "</tr>"
+        for row in df.itertuples(index=False)
+    )
+    return f"<table border=\"1\">\n<thead><tr>{header}</tr></thead>\n<tbody>{rows}</tbody>\n</table>"
+
+
+def _html_page(title: str, body: str) -> str:
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{escape(title)}</title>"
+            f"<script src=\"plotly.min.js\"></script></head>\n<body>\n<h1>{escape(title)}</h1>\n{body}\n</body></html>\n")
+
+
+@functools.lru_cache(maxsize=None)
+def _chart_template(kind: str) -> dict:
+    """One chart of the dashboard, built once per process, as a plain figure dict."""
+    deck = np.array([_DECK_PLACEHOLDER], dtype=object)
+    if kind == "tags":
+        fig = deck_tag_chart(_DECK_PLACEHOLDER, np.array(["tag"], dtype=object), np.array([1]))
+    elif kind == "cmc":
+        fig = deck_cmc_chart(_DECK_PLACEHOLDER, np.array([0.0]), np.array([1]))
+    else:
+        fig = similarity_heatmap(deck, np.ones((1, 1)), np.array([0]),
+                                 title=f"Shared cards (Jaccard) between {_DECK_PLACEHOLDER} and its closest decks")
+    return fig.to_plotly_json()
+
+
+def _chart_html(kind: str, deck_name: str, **trace) -> str: # type: ignore
+    """HTML of a `kind` chart of one deck: the template with the deck's data swapped in.
+
+    Building and validating a plotly figure costs tens of milliseconds, most
+    of the report's time; every deck's chart has the same layout, so only
+    the data arrays and title change, rendered without validation.
+    """
+    template = _chart_template(kind)
+    layout = dict(template["layout"])
+    layout["title"] = {**layout["title"], "text": layout["title"]["text"].replace(_DECK_PLACEHOLDER, deck_name)}
+    figure = {"data": [{**template["data"][0], **trace}], "layout": layout}
+    return pio.to_html(figure, full_html=False, include_plotlyjs=False, validate=False)
+
+
+def _deck_html(report: DeckReport) -> str:
+    neighbourhood = list(report.neighbourhood)
+    sections = [
+        _html_table(pd.DataFrame([report.summary])),
+        _chart_html("tags", report.deck_name, x=report.tags["tag_name"].to_numpy(),
+                    y=report.tags["tag_count"].to_numpy()),
+        _chart_html("cmc", report.deck_name, x=report.cmc["cmc"].to_numpy(), y=report.cmc["total_cards"].to_numpy()),
+        _chart_html("similarity", report.deck_name, z=report.neighbourhood_jaccard, x=neighbourhood, y=neighbourhood),
+    ]
+    sections += ["<h2>Similar decks</h2>", _html_table(report.similar),
+                 "<h2>Cards</h2>", _html_table(report.cards)]
+    return _html_page(report.deck_name, "\n".join(sections))
+
+
+def write_deck_report(report: DeckReport, out_dir: Path, formats: Sequence[str]) -> str:
+    """Write one deck's files in every requested format. Returns the deck name."""
+    if "csv" in formats:
+        deck_dir = out_dir / "csv" / report.deck_name
+        deck_dir.mkdir(parents=True, exist_ok=True)
+        for name in ("cards", "tags", "cmc", "similar"):
+            getattr(report, name).to_csv(deck_dir / f"{name}.csv", index=False)
+    if "json" in formats:
+        document = {"summary": report.summary}
+        document.update({name: getattr(report, name).to_dict(orient="records")
+                         for name in ("cards", "tags", "cmc", "similar")})
+        (out_dir / "json" / f"{report.deck_name}.json").write_text(json.dumps(document, indent=1, default=str))
+    if "html" in formats:
+        (out_dir / "html" / f"{report.deck_name}.html").write_text(_deck_html(report), encoding="utf-8")
+    return report.deck_name
+
+
+def _write_deck_report_args(args) -> str: # type: ignore
+    return write_deck_report(*args)
+
+
+def write_reports(reports: List[DeckReport], out_dir: Path, formats: Sequence[str] = FORMATS,
+                  max_workers: Optional[int] = None) -> None:
+    """Write every deck's report across a process pool, plus the summary and index files.
+
+    The numbers are all computed before this call; workers only format and
+    write, which is where the time goes (mostly serializing the charts).
+    """
+    for fmt in ("json", "html"):
+        if fmt in formats:
+            (out_dir / fmt).mkdir(parents=True, exist_ok=True)
+    if "html" in formats:
+        # Written once and shared by every page instead of inlined in each
+        (out_dir / "html" / "plotly.min.js").write_text(get_plotlyjs(), encoding="utf-8")
+
+    jobs = [(report, out_dir, formats) for report in reports]
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(jobs) < PARALLEL_MIN_DECKS:
+        list(map(_write_deck_report_args, jobs))
+    else:
+        # A few chunks per worker keeps them busy without pickling every deck separately
+        chunksize = max(1, len(jobs) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_write_deck_report_args, jobs, chunksize=chunksize))
+
+    summary = pd.DataFrame([report.summary for report in reports])
+    summary.to_csv(out_dir / "decks.csv", index=False)
+    (out_dir / "decks.json").write_text(summary.to_json(orient="records", indent=1))
+    if "html" in formats:
+        # Deck names can hold characters that mean something in a URL ("#", "?", "%")
+        links = "\n".join(f"<li><a href=\"{quote(report.deck_name, safe='')}.html\">{escape(report.deck_name)}</a></li>"
+                          for report in reports)
+        (out_dir / "html" / "index.html").write_text(
+            _html_page("Deck reports", f"{_html_table(summary)}\n<ul>\n{links}\n</ul>"), encoding="utf-8")
+
+
+def generate_report(conn: sqlite3.Connection, out_dir: Path, formats: Sequence[str] = FORMATS,
+                    decks: Optional[Sequence[str]] = None, top_k: int = DEFAULT_TOP_K,
+                    max_workers: Optional[int] = None) -> Dict[str, float]:
+    """Write the report of `decks` (default: all) to `out_dir`. Returns seconds per stage.
+
+    Raises UnknownDecks if any of `decks` is not in the database.
+    """
+    timings = {}
+    start = time.perf_counter()
+    model = read_model(conn)
+    unknown = sorted(set(decks or ()) - set(model.deck_names))
+    if unknown:
+        raise UnknownDecks(f"Unknown deck(s): {', '.join(unknown)}")
+    deck_stats = pd.read_sql_query(DECK_STATS_QUERY, conn)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reports = list(build_deck_reports(model, deck_stats, decks=decks, top_k=top_k))
+    timings["compute"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_reports(reports, out_dir, formats=formats, max_workers=max_workers)
+    timings["write"] = time.perf_counter() - start
+    return timings
+
+
+if __name__ == "__main__":
+    from src.precon_db.init_db import DB_PATH
+
+    args = sys.argv[1:]
+
+    def option(flag: str, default: Optional[str] = None) -> Optional[str]:
+        if flag not in args:
+            return default
+        index = args.index(flag)
+        value = args[index + 1]
+        del args[index:index + 2]
+        return value
+
+    out_dir = Path(option("--out", "reports"))
+    formats = option("--format", ",".join(FORMATS)).split(",")
+    jobs = option("--jobs")
+    top_k = int(option("--top-k", str(DEFAULT_TOP_K)))
+    db_path = Path(option("--db", str(DB_PATH)))
+    decks = args or None
+    unknown = sorted(set(formats) - set(FORMATS))
+    if unknown:
+        sys.exit(f"Unknown format(s): {', '.join(unknown)}; choose from {', '.join(FORMATS)}")
+
+    # Read-only: a nightly report must never block or modify an ingest
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        timings = generate_report(conn, out_dir, formats=formats, decks=decks, top_k=top_k,
+                                  max_workers=int(jobs) if jobs else None)
+    except UnknownDecks as error:
+        sys.exit(f"{error}; see the decks table for valid names")
+    n_decks = len(decks) if decks else conn.execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+    conn.close()
+    print(f"{n_decks} deck reports ({', '.join(formats)}) in {out_dir}: "
+          + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
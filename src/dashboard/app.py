@@ -1,9 +1,11 @@
 import streamlit as st
 
-from src.dashboard.dataframes.all_cards_data import load_all_cards_data_df
-from src.dashboard.dataframes.card_tags_per_deck_df import load_card_tags_per_deck
-from src.dashboard.dataframes.common_dataframes import load_card_tags, load_cards, load_deck_cards, load_decks, load_tags
+from src.dashboard.dataframes.card_index import load_card_index
+from src.dashboard.dataframes.common_dataframes import load_summary_counts
+from src.dashboard.dataframes.data_model import load_data_model
+from src.dashboard.dataframes.deck_similarity import load_deck_similarity
 from src.dashboard.dataframes.deck_stats_df import load_deck_stats
+from src.dashboard.dataframes.deck_views import load_deck_views
 from src.dashboard.tabs.decklist_breakdown_tab import render_decklist_breakdown_tab
 from src.dashboard.tabs.tag_tab import render_tag_tab
 from src.dashboard.visualizations.summary_metrics import show_summary_metrics
@@ -24,34 +26,39 @@ st.markdown("---")
 ####### LOAD DATA #######
 #########################
 
-try:
-    cards_df = load_cards()
-    decks_df = load_decks()
-    tags_df = load_tags()
-    deck_cards_df = load_deck_cards()
-    card_tags_df = load_card_tags()
-    card_tags_per_deck_df = load_card_tags_per_deck()
-    deck_stats_df = load_deck_stats()
-    all_cards_df = load_all_cards_data_df()
-except Exception as e:
-    st.error(f"Error loading data: {e}")
-    st.stop()
-
-show_summary_metrics(cards_df, decks_df, tags_df, card_tags_df)
+# Datasets are loaded only when the section that needs them is rendered;
+# the loaders are cached, so each one hits the database once. The data model
+# and card index are shared by every session instead of copied into each.
+def load_or_stop(*loaders):
+    try:
+        return [loader() for loader in loaders]
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        st.stop()
+
+summary_counts, = load_or_stop(load_summary_counts)
+show_summary_metrics(summary_counts)
 
 st.markdown("---")
 
-tag_filter_tab, deck_analysis_tab = st.tabs(["🔍 Filter by Tag", "📈 Deck Analysis"])
+# on_change="rerun" makes the tabs lazy: only the open tab's body runs
+tag_filter_tab, deck_analysis_tab = st.tabs(["🔍 Filter by Tag", "📈 Deck Analysis"], key="main_tabs", on_change="rerun")
 
 with tag_filter_tab:
-    render_tag_tab(card_tags_per_deck_df)
+    if tag_filter_tab.open:
+        model, = load_or_stop(load_data_model)
+        render_tag_tab(model)
 
 ########################
 ## DECKLIST BREAKDOWN ##
 ########################
 
 with deck_analysis_tab:
-    render_decklist_breakdown_tab(deck_stats_df, card_tags_per_deck_df, deck_cards_df, cards_df, all_cards_df)
+    if deck_analysis_tab.open:
+        deck_stats_df, model, card_index, deck_views, deck_similarity = load_or_stop(
+            load_deck_stats, load_data_model, load_card_index, load_deck_views, load_deck_similarity
+        )
+        render_decklist_breakdown_tab(deck_stats_df, model, card_index, deck_views, deck_similarity)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+def connect_read_only(db_path: Path, immutable: bool = False) -> sqlite3.Connection:
+    """Open `db_path` read-only.
+
+    immutable=True also tells SQLite the file cannot change, which skips
+    locking and change detection entirely. Only use it when nothing writes
+    to the database while the dashboard runs (e.g. a database baked into
+    the Docker image); otherwise readers may see torn data.
+    """
+    uri = f"file:{Path(db_path).resolve()}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    # Connections move between threads through the pool, but only one
+    # thread holds a given connection at a time
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+class _Waiter:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.conn: Optional[sqlite3.Connection] = None
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only SQLite connections.
+
+    Each thread checks a connection out for the duration of a `connection()`
+    block, so concurrent Streamlit sessions read in parallel instead of
+    sharing (and interleaving cursors on) one connection. Nested checkouts
+    on the same thread reuse the connection it already holds. The database
+    is expected to be in WAL mode (the loader sets it, and data_checks.py
+    fails the image build without it), so readers never block on an ingest
+    in progress. Waiting threads are served first come, first served.
+    """
+
+    def __init__(self, db_path: Path, size: int = 4, immutable: bool = False, timeout: float = 30.0,
+                 history: int = 10_000):
+        self.db_path = Path(db_path)
+        self.size = size
+        self.immutable = immutable
+        self.timeout = timeout
+        self._idle: List[sqlite3.Connection] = []
+        self._waiters: Deque[_Waiter] = deque()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # label -> recent durations in seconds, for wait and hold time
+        self.wait_times: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=history))
+        self.hold_times: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=history))
+
+    def _checkout(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            if self._opened < self.size:
+                self._opened += 1
+                opened = True
+            else:
+                opened = False
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+        if opened:
+            try:
+                return connect_read_only(self.db_path, self.immutable)
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        if not waiter.ready.wait(self.timeout):
+            with self._lock:
+                if waiter.conn is None:
+                    self._waiters.remove(waiter)
+                    raise TimeoutError(f"No database connection available after {self.timeout:.0f}s "
+                                       f"(pool size {self.size})")
+        return waiter.conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        # Hand the connection straight to the longest waiting thread, so a
+        # thread that checks out in a loop cannot starve the others
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.conn = conn
+                waiter.ready.set()
+            else:
+                self._idle.append(conn)
+
+    @contextmanager
+    def connection(self, label: str = "query") -> Iterator[sqlite3.Connection]:
+        held: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        start = time.perf_counter()
+        conn = self._checkout()
+        acquired = time.perf_counter()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self.wait_times[label].append(acquired - start)
+            self.hold_times[label].append(time.perf_counter() - acquired)
+            self._release(conn)
+
+    def latency_report(self) -> Dict[str, Dict[str, float]]:
+        """p50/p99 of checkout wait and query (hold) time per label, in milliseconds."""
+        report = {}
+        for label, holds in self.hold_times.items():
+            waits = np.asarray(self.wait_times[label]) * 1000
+            holds = np.asarray(holds) * 1000
+            report[label] = {
+                "count": len(holds),
+                "wait_p50": float(np.percentile(waits, 50)),
+                "wait_p99": float(np.percentile(waits, 99)),
+                "query_p50": float(np.percentile(holds, 50)),
+                "query_p99": float(np.percentile(holds, 99)),
+            }
+        return report
+
+    def close(self) -> None:
+        """Close the idle connections; connections still checked out are left alone."""
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._opened -= len(self._idle)
+            self._idle.clear()
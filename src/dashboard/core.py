@@ -1,12 +1,104 @@
+import functools
+import os
+import pandas as pd
 import streamlit as st
 import sqlite3
 from pathlib import Path
+from typing import ContextManager, Optional, Tuple
+
+from src.dashboard.connection_pool import ConnectionPool
+from src.external.thumbnail_cache import ThumbnailCache
+from src.precon_db.snapshot import read_snapshot, snapshot_datasets
 
 # Get project root directory (3 levels up from this file)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
-DB_PATH = PROJECT_ROOT / "precon.db"
+DB_PATH = Path(os.environ.get("PRECON_DB_PATH", PROJECT_ROOT / "precon.db"))
+
+
+# Set PRECON_DB_IMMUTABLE=1 only when nothing writes to the database while the dashboard runs
+POOL_SIZE = int(os.environ.get("PRECON_DB_POOL_SIZE", 4))
+IMMUTABLE = os.environ.get("PRECON_DB_IMMUTABLE", "") == "1"
+
+
+@st.cache_resource
+def get_pool() -> ConnectionPool:
+    """Read-only connection pool shared by every session."""
+    return ConnectionPool(DB_PATH, size=POOL_SIZE, immutable=IMMUTABLE)
 
 
 @st.cache_resource
-def get_connection():
-    return sqlite3.connect(str(DB_PATH), check_same_thread=False)
\ No newline at end of file
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Thumbnails downloaded at ingest, read-only; missing ones fall back to the remote image."""
+    return ThumbnailCache(read_only=True)
+
+
+def get_connection(label: str = "query") -> ContextManager[sqlite3.Connection]:
+    """Check out a read-only connection for the duration of a `with` block.
+
+    `label` groups the checkout in get_pool().latency_report().
+    """
+    return get_pool().connection(label)
+
+
+def get_data_version(*tables: str) -> Tuple:
+    """Ingest generation of `tables`, as bumped by populate_db.
+
+    Deliberately uncached: it is a single primary-key lookup, and it has to
+    see the writes of an ingest that ran after the dashboard started.
+    Databases created before the table_versions migration fall back to the
+    file's modification time, which invalidates everything on any write.
+    """
+    try:
+        with get_connection("data_version") as conn:
+            rows = conn.execute(
+                f"SELECT table_name, version FROM table_versions WHERE table_name IN ({', '.join('?' * len(tables))})",
+                tables
+            ).fetchall()
+    except sqlite3.OperationalError:
+        return (DB_PATH.stat().st_mtime_ns,)
+    return tuple(sorted(rows))
+
+
+def read_dataset(name: str) -> pd.DataFrame:
+    """Uncached read of snapshot dataset `name`: memory-mapped when current, otherwise built with SQL."""
+    tables, build = snapshot_datasets()[name]
+    df = read_snapshot(name, get_data_version(*tables), DB_PATH)
+    if df is None:
+        with get_connection(name) as conn:
+            df = build(conn)
+    return df
+
+
+def cache_by_data_version(*tables: str, resource: bool = False, max_entries: int = 2, snapshot: Optional[str] = None):
+    """Cache a loader until one of its source `tables` is re-ingested.
+
+    Works like st.cache_data (or st.cache_resource with resource=True), but
+    the data version of `tables` is part of the cache key, so an ingest only
+    recomputes the datasets built from the tables it actually touched.
+    `max_entries` bounds how many stale generations are kept around.
+
+    With `snapshot`, a cache miss first tries to memory-map that dataset from
+    the columnar snapshot written by populate_db, and only runs the loader
+    when the snapshot is missing or older than the database.
+    """
+    cache = st.cache_resource if resource else st.cache_data
+
+    def decorator(func):
+        # wraps() keeps func's name and source, which Streamlit uses to tell cached functions apart
+        @cache(max_entries=max_entries, show_spinner=False)
+        @functools.wraps(func)
+        def cached(data_version, *args, **kwargs):
+            if snapshot is not None:
+                df = read_snapshot(snapshot, data_version, DB_PATH)
+                if df is not None:
+                    return df
+            return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cached(get_data_version(*tables), *args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from functools import reduce
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.analytics.model import MODEL_TABLES, DataModel, Links
+from src.dashboard.core import cache_by_data_version
+from src.dashboard.dataframes.data_model import load_data_model
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def _posting_lists(links: Links, names: np.ndarray) -> Dict[str, np.ndarray]:
+    """Map each name to the sorted card ids linked to it (views into `links`)."""
+    return {name: links.row(i) for i, name in enumerate(names)}
+
+
+@dataclass
+class CardIndex:
+    """Inverted index over the cards of the data model.
+
+    Deck, tag and type filters are exact-match posting lists of sorted card
+    ids, so combining filters is an array intersection instead of a
+    substring scan. CMC ranges are answered with a bisect over the cards
+    sorted by CMC. Card ids are also the row positions of
+    build_all_cards_data_df(), which lists the cards in name order too.
+    """
+
+    by_deck: Dict[str, np.ndarray]
+    by_tag: Dict[str, np.ndarray]
+    by_type: Dict[str, np.ndarray]
+    cmc_sorted: np.ndarray
+    cmc_order: np.ndarray
+
+    @classmethod
+    def build(cls, model: DataModel) -> "CardIndex":
+        cmc_order = np.argsort(model.card_cmc, kind="stable").astype(np.int32)
+        return cls(
+            by_deck=_posting_lists(model.deck_cards, model.deck_names),
+            by_tag=_posting_lists(model.card_tags.inverse(len(model.tag_names)), model.tag_names),
+            by_type=_posting_lists(model.card_types.inverse(len(model.type_names)), model.type_names),
+            cmc_sorted=model.card_cmc[cmc_order],
+            cmc_order=cmc_order,
+        )
+
+    def cmc_between(self, low: float, high: float) -> np.ndarray:
+        start = np.searchsorted(self.cmc_sorted, low, side="left")
+        end = np.searchsorted(self.cmc_sorted, high, side="right")
+        return np.sort(self.cmc_order[start:end])
+
+    def filter(self, deck: Optional[str] = None, tag: Optional[str] = None, type_: Optional[str] = None,
+               cmc_range: Optional[Tuple[float, float]] = None) -> np.ndarray:
+        """Sorted card ids matching every given filter (None means no filter)."""
+        selections = []
+        if deck is not None:
+            selections.append(self.by_deck.get(deck, _EMPTY))
+        if tag is not None:
+            selections.append(self.by_tag.get(tag, _EMPTY))
+        if type_ is not None:
+            selections.append(self.by_type.get(type_, _EMPTY))
+        if cmc_range is not None:
+            selections.append(self.cmc_between(*cmc_range))
+        if not selections:
+            return np.arange(len(self.cmc_order), dtype=np.int32)
+        # Smallest list first keeps every intersection cheap
+        selections.sort(key=len)
+        return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), selections)
+
+
+@cache_by_data_version(*MODEL_TABLES, resource=True)
+def load_card_index() -> CardIndex:
+    """Build the index once per data version, on top of the shared data model."""
+    return CardIndex.build(load_data_model())
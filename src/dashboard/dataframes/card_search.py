@@ -0,0 +1,20 @@
+from typing import List
+
+from src.dashboard.core import cache_by_data_version, get_connection
+from src.precon_db.card_search import search_cards
+
+# Ranked matches shown per query; the gallery pages through them
+SEARCH_LIMIT = 500
+
+
+@cache_by_data_version("card_search", max_entries=64)
+def search_card_names(text: str) -> List[str]:
+    """Deck cards matching every word of `text` as a prefix of a name, type or rules text word, best first.
+
+    Returns up to SEARCH_LIMIT + 1 names: the extra one tells the caller
+    there are more matches than it shows. Cached per query and index
+    version, so paging through the results or changing another widget does
+    not run the query again.
+    """
+    with get_connection("card_search") as conn:
+        return search_cards(conn, text, limit=SEARCH_LIMIT + 1)
@@ -1,35 +1,15 @@
-import streamlit as st
 import pandas as pd
 
-from src.dashboard.core import get_connection
-
-@st.cache_data
-def load_cards():
-    conn = get_connection()
-    return pd.read_sql_query("SELECT * FROM cards", conn)
-
-@st.cache_data
-def load_decks():
-    conn = get_connection()
-    return pd.read_sql_query("SELECT * FROM decks", conn)
-
-@st.cache_data
-def load_tags():
-    conn = get_connection()
-    return pd.read_sql_query("SELECT * FROM tags", conn)
-
-@st.cache_data
-def load_deck_cards():
-    conn = get_connection()
-    return pd.read_sql_query("SELECT * FROM deck_cards", conn)
-
-@st.cache_data
-def load_card_tags():
-    conn = get_connection()
-    return pd.read_sql_query("SELECT * FROM card_tags", conn)
-
-cards_df = load_cards()
-decks_df = load_decks()
-tags_df = load_tags()
-deck_cards_df = load_deck_cards()
-card_tags_df = load_card_tags()
\ No newline at end of file
+from src.dashboard.core import cache_by_data_version, get_connection
+
+@cache_by_data_version("cards", "decks", "tags", "card_tags")
+def load_summary_counts():
+    """Row counts for the summary header, without loading the tables themselves"""
+    with get_connection("load_summary_counts") as conn:
+        return pd.read_sql_query("""
+        SELECT
+            (SELECT COUNT(*) FROM cards) AS total_cards,
+            (SELECT COUNT(*) FROM decks) AS total_decks,
+            (SELECT COUNT(*) FROM tags) AS total_tags,
+            (SELECT COUNT(DISTINCT card_name) FROM card_tags) AS unique_tagged_cards
+        """, conn).iloc[0].to_dict()
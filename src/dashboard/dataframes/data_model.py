@@ -0,0 +1,8 @@
+from src.analytics.model import MODEL_TABLES, DataModel
+from src.dashboard.core import cache_by_data_version, read_dataset
+
+
+@cache_by_data_version(*MODEL_TABLES, resource=True)
+def load_data_model() -> DataModel:
+    """One shared model per data version; sessions read it, never copy it."""
+    return DataModel.build(*(read_dataset(name) for name in MODEL_TABLES))
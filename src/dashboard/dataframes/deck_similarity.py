@@ -0,0 +1,10 @@
+from src.analytics.model import MODEL_TABLES
+from src.analytics.similarity import DeckSimilarity
+from src.dashboard.core import cache_by_data_version
+from src.dashboard.dataframes.data_model import load_data_model
+
+
+@cache_by_data_version(*MODEL_TABLES, resource=True)
+def load_deck_similarity() -> DeckSimilarity:
+    """Similarity of every pair of decks, computed once per data version."""
+    return DeckSimilarity.build(load_data_model())
@@ -1,34 +1,17 @@
-import streamlit as st
 import pandas as pd
 
-from src.dashboard.core import get_connection
+from src.analytics.queries import DECK_STATS_QUERY
+from src.dashboard.core import cache_by_data_version, get_connection
 
 
-@st.cache_data
+@cache_by_data_version("deck_stats", snapshot="deck_stats")
 def load_deck_stats():
     """Load tag counts and average CMC per deck"""
-    conn = get_connection()
-    query = """
-    SELECT 
-        d.name AS deck_name,
-        COUNT(DISTINCT dc.card_name) AS total_cards,
-        AVG(c.cmc) AS avg_cmc,
-        COUNT(DISTINCT ct.tag_name) AS unique_tags
-    FROM decks d
-    JOIN deck_cards dc ON d.name = dc.deck_name
-    JOIN cards c ON dc.card_name = c.name
-    LEFT JOIN card_tags ct ON dc.card_name = ct.card_name
-    LEFT JOIN card_types ctype ON dc.card_name = ctype.card_name
-    WHERE ctype.type_name != 'land'
-    GROUP BY d.name
-    ORDER BY d.name
-    """
-    return pd.read_sql_query(query, conn)
-
-deck_stats_df = load_deck_stats()
+    with get_connection("load_deck_stats") as conn:
+        return pd.read_sql_query(DECK_STATS_QUERY, conn)
 
 if __name__ == "__main__":
-    print(deck_stats_df.head())
+    print(load_deck_stats().head())
 
 # id        deck_name                 total_cards   avg_cmc   unique_tags
 # 0         counter_blitz             62            3.314607  9
@@ -0,0 +1,12 @@
+from typing import Dict
+
+from src.analytics.deck_views import DeckView, build_deck_views
+from src.analytics.model import MODEL_TABLES
+from src.dashboard.core import cache_by_data_version
+from src.dashboard.dataframes.data_model import load_data_model
+
+
+@cache_by_data_version(*MODEL_TABLES, resource=True)
+def load_deck_views() -> Dict[str, DeckView]:
+    """Per-deck views keyed by deck name, built once per data version; switching decks is a lookup."""
+    return build_deck_views(load_data_model())
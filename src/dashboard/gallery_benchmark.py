@@ -0,0 +1,55 @@
+"""Rerun time of the Card Browser gallery versus the number of matching cards.
+
+Renders the first N cards of a synthetic database through
+render_card_gallery, paginated (default page size) and with the whole
+result on one page, which is what the gallery did before pagination.
+
+Usage: PYTHONPATH=. python src/dashboard/gallery_benchmark.py [n_cards]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.precon_db.synthetic import build_synthetic_db
+
+RESULT_COUNTS = (24, 96, 384, 1536)
+
+
+def _gallery_script(n_results: int, page_size: int):
+    # Runs as a standalone Streamlit script; imports must live inside
+    from src.dashboard.dataframes.data_model import load_data_model
+    from src.dashboard.visualizations.card_gallery import render_card_gallery
+
+    model = load_data_model()
+    render_card_gallery(model, model.deck_cards.targets[:n_results], key="bench",
+                        page_sizes=sorted({24, page_size}), default_page_size=page_size)
+
+
+def _rerun_time(n_results: int, page_size: int, reruns: int = 3) -> float:
+    from streamlit.testing.v1 import AppTest
+
+    app_test = AppTest.from_function(_gallery_script, args=(n_results, page_size), default_timeout=600)
+    app_test.run()  # warm the model cache
+    start = time.perf_counter()
+    for _ in range(reruns):
+        app_test.run()
+    if app_test.exception:
+        raise RuntimeError(app_test.exception[0].value)
+    return (time.perf_counter() - start) / reruns
+
+
+if __name__ == "__main__":
+    n_cards = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = build_synthetic_db(Path(tmp) / "bench.db", n_cards=n_cards, n_decks=50)
+        # Must be set before the dashboard modules are imported
+        os.environ["PRECON_DB_PATH"] = str(db_path)
+
+        print(f"{'results':>8} {'paginated (24)':>15} {'single page':>12}")
+        for n_results in RESULT_COUNTS:
+            paginated = _rerun_time(n_results, page_size=24)
+            single_page = _rerun_time(n_results, page_size=n_results)
+            print(f"{n_results:>8} {paginated * 1000:>12.0f} ms {single_page * 1000:>9.0f} ms")
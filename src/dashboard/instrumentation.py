@@ -0,0 +1,36 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import streamlit as st
+
+# Set PRECON_PROFILE=1 to show the timing of every section on the page
+PROFILE = os.environ.get("PRECON_PROFILE", "") == "1"
+
+
+@contextmanager
+def timed_section(name: str):
+    """Time one rerunnable section of the page.
+
+    Every run of the section is counted in this session's section_timings(),
+    so comparing the counters before and after a widget change shows which
+    sections recomputed. With PRECON_PROFILE=1 the timing is also shown as a
+    caption at the end of the section, which a fragment rerun redraws.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timing = section_timings().setdefault(name, {"runs": 0, "last_ms": 0.0, "total_ms": 0.0})
+        timing["runs"] += 1
+        timing["last_ms"] = elapsed * 1000
+        timing["total_ms"] += elapsed * 1000
+        if PROFILE:
+            st.caption(f"⏱ {name}: {timing['last_ms']:.0f} ms · run {timing['runs']}")
+
+
+def section_timings() -> Dict[str, dict]:
+    """Runs, last and total milliseconds of every timed section in this session."""
+    return st.session_state.setdefault("section_timings", {})
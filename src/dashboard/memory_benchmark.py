@@ -0,0 +1,91 @@
+"""Resident memory per dashboard session, frame-based vs. integer-coded model.
+
+Every st.cache_data hit returns a fresh copy of the cached frame, so each
+session rendering the Deck Analysis tab used to hold its own copy of the
+cards, link and all-cards frames. The data model and card index are
+st.cache_resource objects shared by all sessions. Each mode runs in its own
+process so the RSS numbers do not mix (PRECON_DB_PATH is read when the
+dashboard modules are imported, so the child gets it through the environment).
+
+Usage: PYTHONPATH=. python src/dashboard/memory_benchmark.py [n_cards] [n_decks] [sessions]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from src.analytics.all_cards import ALL_CARDS_TABLES, build_all_cards_data_df
+from src.dashboard.core import cache_by_data_version, get_connection
+from src.dashboard.dataframes.card_index import load_card_index
+from src.dashboard.dataframes.data_model import load_data_model
+from src.dashboard.dataframes.deck_similarity import load_deck_similarity
+from src.dashboard.dataframes.deck_stats_df import load_deck_stats
+from src.dashboard.dataframes.deck_views import load_deck_views
+from src.precon_db.synthetic import build_synthetic_db
+
+
+def _rss_mib() -> float:
+    with open("/proc/self/statm") as statm:
+        resident_pages = int(statm.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _table_loader(table: str):
+    """st.cache_data loader of a whole table, as the tabs used before the data model."""
+    def load():
+        with get_connection(table) as conn:
+            return pd.read_sql_query(f"SELECT * FROM {table}", conn)
+
+    # Streamlit keys its caches by function name, so each table needs its own
+    load.__qualname__ = load.__name__ = f"load_{table}"
+    return cache_by_data_version(table)(load)
+
+
+_FRAME_LOADERS = [_table_loader(table) for table in ("cards", "deck_cards", "card_tags")]
+
+
+@cache_by_data_version(*ALL_CARDS_TABLES)
+def load_all_cards_data_df():
+    """st.cache_data loader of the all-cards frame the card list used before the data model."""
+    with get_connection("load_all_cards_data_df") as conn:
+        return build_all_cards_data_df(conn)
+
+
+def _session_frames() -> tuple:
+    return (load_deck_stats(), *(load() for load in _FRAME_LOADERS), load_all_cards_data_df())
+
+
+def _session_model() -> tuple:
+    return (load_deck_stats(), load_data_model(), load_card_index(), load_deck_views(), load_deck_similarity())
+
+
+def _measure(mode: str, sessions: int) -> None:
+    load_session = _session_frames if mode == "frames" else _session_model
+    start = _rss_mib()
+    held = [load_session()]
+    first = _rss_mib()
+    held += [load_session() for _ in range(sessions - 1)]
+    per_session = (_rss_mib() - first) / max(sessions - 1, 1)
+    print(f"{mode:<7} first session: {first - start:7.1f} MiB   each further session: {per_session:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        _measure(sys.argv[2], int(sys.argv[3]))
+        sys.exit()
+
+    n_cards = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_decks = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    sessions = sys.argv[3] if len(sys.argv) > 3 else "8"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = build_synthetic_db(Path(tmp) / "bench.db", n_cards=n_cards, n_decks=n_decks)
+        env = dict(os.environ, PRECON_DB_PATH=str(db_path))
+        print(f"{n_cards:,} cards / {n_decks:,} decks, {sessions} sessions")
+        for mode in ("frames", "model"):
+            # Streamlit warns about running without a server on stderr
+            subprocess.run([sys.executable, __file__, "--measure", mode, sessions], env=env, check=True,
+                           stderr=subprocess.DEVNULL)
@@ -0,0 +1,66 @@
+"""Query latency of the read-only connection pool under concurrent sessions.
+
+Each simulated session repeatedly runs the queries a dashboard rerun issues
+against a synthetic database, with a pool of one connection (equivalent to
+the old shared connection, minus the cursor interleaving) and with a pool of
+`pool_size` connections.
+
+Usage: PYTHONPATH=. python src/dashboard/pool_load_test.py [sessions] [reruns] [pool_size]
+"""
+import random
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from src.dashboard.connection_pool import ConnectionPool
+from src.precon_db.synthetic import build_synthetic_db
+
+SESSION_QUERIES = {
+    "data_version": ("SELECT table_name, version FROM table_versions WHERE table_name IN (?, ?)",
+                     lambda deck: ("cards", "deck_cards")),
+    "deck_stats": ("SELECT total_cards, avg_cmc, unique_tags FROM deck_stats WHERE deck_name = ?",
+                   lambda deck: (deck,)),
+    "deck_cards": ("SELECT c.name, c.cmc, c.type FROM deck_cards dc JOIN cards c ON c.name = dc.card_name "
+                   "WHERE dc.deck_name = ? AND dc.section IN ('main', 'commander')", lambda deck: (deck,)),
+}
+
+
+def run_sessions(pool: ConnectionPool, sessions: int, reruns: int, decks: list) -> None:
+    def session(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(reruns):
+            deck = rng.choice(decks)
+            for label, (query, params) in SESSION_QUERIES.items():
+                with pool.connection(label) as conn:
+                    conn.execute(query, params(deck)).fetchall()
+
+    threads = [threading.Thread(target=session, args=(seed,)) for seed in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def print_report(title: str, pool: ConnectionPool) -> None:
+    print(title)
+    print(f"  {'query':<16} {'count':>6} {'wait p50':>9} {'wait p99':>9} {'query p50':>10} {'query p99':>10}")
+    for label, stats in pool.latency_report().items():
+        print(f"  {label:<16} {stats['count']:>6} {stats['wait_p50']:>9.2f} {stats['wait_p99']:>9.2f} "
+              f"{stats['query_p50']:>10.2f} {stats['query_p99']:>10.2f}")
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pool_size = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = build_synthetic_db(Path(tmp) / "bench.db", n_cards=50_000, n_decks=500)
+        decks = [f"deck_{i}" for i in range(500)]
+        print(f"{sessions} sessions x {reruns} reruns, latencies in ms")
+        for size in (1, pool_size):
+            pool = ConnectionPool(db_path, size=size)
+            run_sessions(pool, sessions, reruns, decks)
+            print_report(f"pool size {size}:", pool)
+            pool.close()
@@ -0,0 +1,62 @@
+"""Time-to-first-paint of the dashboard against a large synthetic database,
+loading from SQL and from the columnar snapshot.
+
+Usage: PYTHONPATH=. python src/dashboard/startup_benchmark.py [n_cards] [n_decks]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.precon_db.synthetic import build_synthetic_db
+
+APP_PATH = Path(__file__).parent / "app.py"
+
+
+def _timed_run(app_test) -> float: # type: ignore
+    start = time.perf_counter()
+    app_test.run()
+    elapsed = time.perf_counter() - start
+    if app_test.exception:
+        raise RuntimeError(app_test.exception[0].value)
+    return elapsed
+
+
+def _cold_start(app_path: Path) -> tuple:
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    app_test = AppTest.from_file(str(app_path), default_timeout=600)
+    first_paint = _timed_run(app_test)
+    rerun = _timed_run(app_test)
+    app_test.session_state["main_tabs"] = "📈 Deck Analysis"
+    open_deck_tab = _timed_run(app_test)
+    return first_paint, rerun, open_deck_tab
+
+
+if __name__ == "__main__":
+    n_cards = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_decks = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = build_synthetic_db(Path(tmp) / "bench.db", n_cards=n_cards, n_decks=n_decks)
+        # Must be set before the dashboard modules are imported
+        os.environ["PRECON_DB_PATH"] = str(db_path)
+        from src.precon_db.snapshot import write_snapshot
+
+        timings = {"SQL": _cold_start(APP_PATH)}
+        conn = sqlite3.connect(str(db_path))
+        write_snapshot(conn, db_path)
+        conn.close()
+        timings["snapshot"] = _cold_start(APP_PATH)
+
+    print(f"{n_cards:,} cards / {n_decks:,} decks")
+    for source, (first_paint, rerun, open_deck_tab) in timings.items():
+        print(f"[{source}]")
+        print(f"time to first paint:        {first_paint * 1000:.0f} ms")
+        print(f"warm rerun:                 {rerun * 1000:.0f} ms")
+        print(f"first open of Deck Analysis: {open_deck_tab * 1000:.0f} ms")
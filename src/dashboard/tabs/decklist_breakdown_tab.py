@@ -1,13 +1,36 @@
+import sqlite3
+from typing import Dict
+
+import numpy as np
 from pandas import DataFrame
 import streamlit as st
-import plotly.express as px
 
-def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_df: DataFrame, deck_cards_df: DataFrame, cards_df: DataFrame, all_cards_df: DataFrame):
+from src.analytics.charts import deck_cmc_chart, deck_tag_chart, similarity_heatmap
+from src.analytics.deck_views import DeckView
+from src.analytics.model import DataModel
+from src.analytics.similarity import SIMILARITY_METRICS, DeckSimilarity
+from src.dashboard.dataframes.card_index import CardIndex
+from src.dashboard.dataframes.card_search import SEARCH_LIMIT, search_card_names
+from src.dashboard.instrumentation import timed_section
+from src.dashboard.visualizations.card_gallery import render_card_gallery
+from src.dashboard.visualizations.comparison_charts import deck_cmc_comparison_chart, highlight_bar
+
+def render_decklist_breakdown_tab(deck_stats_df: DataFrame, model: DataModel, card_index: CardIndex,
+                                  deck_views: Dict[str, DeckView], deck_similarity: DeckSimilarity):
     st.header("Decklist Breakdown")
 
-    
-    
     if not deck_stats_df.empty:
+        render_deck_details(deck_stats_df, model, card_index, deck_views, deck_similarity)
+    else:
+        st.info("No deck statistics available.")
+
+
+# Fragments: changing the deck reruns only this function, and changing a
+# Card Browser filter or a similarity option reruns only its own section
+@st.fragment
+def render_deck_details(deck_stats_df: DataFrame, model: DataModel, card_index: CardIndex,
+                        deck_views: Dict[str, DeckView], deck_similarity: DeckSimilarity):
+    with timed_section("deck details"):
         # Create a container to prevent scroll on change
         deck_filter_container = st.container()
         
@@ -19,22 +42,14 @@ def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_d
                 key="deck_filter"
             )
         
-        deck_tag_data = card_tags_per_deck_df[card_tags_per_deck_df['deck_name'] == selected_deck].copy()
+        # Every per-deck number below was precomputed for all decks at once
+        deck_view = deck_views[selected_deck]
         deck_data = deck_stats_df[deck_stats_df['deck_name'] == selected_deck].copy()
         col1, col2 = st.columns([2, 1])
 
-        print("deck_tag_data:\n\n", deck_tag_data)
-
         with col1:
             # Tag count for selected deck
-            fig_tags = px.bar(
-                deck_tag_data.sort_values('tag_count', ascending=False),
-                x='tag_name',
-                y='tag_count',
-                title=f'Tag Count in {selected_deck}',
-                labels={'tag_name': 'Tag', 'tag_count': 'Count'}
-            )
-            fig_tags.update_layout(xaxis_tickangle=-45)
+            fig_tags = deck_tag_chart(selected_deck, model.tag_names[deck_view.tag_ids], deck_view.tag_counts)
             st.plotly_chart(fig_tags, use_container_width=True)
         
         with col2:
@@ -50,35 +65,77 @@ def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_d
 
 
         st.subheader(f"Cards grouped by CMC in {selected_deck}")
-        fig_cmc_cards_deck = px.histogram(
-            deck_cards_df.merge(cards_df, left_on='card_name', right_on='name')[deck_cards_df['deck_name'] == selected_deck],
-            x='cmc',
-            title=f'CMC Distribution in {selected_deck}',
-            labels={'cmc': 'Converted Mana Cost', 'count': 'Number of Cards'},
-            nbins=15
-        )
+        fig_cmc_cards_deck = deck_cmc_chart(selected_deck, deck_view.cmc_values, deck_view.cmc_counts)
         st.plotly_chart(fig_cmc_cards_deck, use_container_width=True)
 
         # Average CMC per deck
         st.subheader("Compare deck CMC with Other Decks")
-        fig_cmc = px.bar(
-            deck_stats_df.sort_values('avg_cmc', ascending=False),
-            x='deck_name',
-            y='avg_cmc',
-            title='Average CMC Across All Decks',
-            labels={'deck_name': 'Deck', 'avg_cmc': 'Average CMC'}
-        )
-        fig_cmc.update_traces(
-            marker_color=['red' if deck == selected_deck else 'lightblue' for deck in deck_stats_df.sort_values('avg_cmc', ascending=False)['deck_name']]
-        )
-        fig_cmc.update_layout(xaxis_tickangle=-45, showlegend=False)
+        # Built once per data version; only the highlight depends on the selection
+        fig_cmc = highlight_bar(deck_cmc_comparison_chart(), selected_deck)
         st.plotly_chart(fig_cmc, use_container_width=True)
 
+    render_similar_decks(model, deck_similarity, selected_deck)
+    render_card_browser(model, card_index, selected_deck, deck_view)
+
+
+@st.fragment
+def render_similar_decks(model: DataModel, deck_similarity: DeckSimilarity, selected_deck: str):
+    with timed_section("similar decks"):
+        st.subheader(f"Decks most similar to {selected_deck}")
+        if len(model.deck_names) < 2:
+            st.info("Similarity needs at least two decks.")
+            return
+
+        option_col1, option_col2 = st.columns(2)
+        with option_col1:
+            metric_label = st.radio(
+                "Similarity:",
+                options=list(SIMILARITY_METRICS),
+                horizontal=True,
+                key="similarity_metric"
+            )
+        with option_col2:
+            max_k = min(20, len(model.deck_names) - 1)
+            k = st.slider("Decks to show:", min_value=1, max_value=max_k, value=min(10, max_k),
+                          key="similarity_k") if max_k > 1 else 1
+
+        # Every pair was scored once per data version; this is a row lookup
+        metric = SIMILARITY_METRICS[metric_label]
+        deck_id = model.deck_id(selected_deck)
+        similar_ids = deck_similarity.top_k(metric, deck_id, k)
+        matrix = getattr(deck_similarity, metric)
+
+        table_col, heatmap_col = st.columns([1, 2])
+        with table_col:
+            st.dataframe(
+                DataFrame({
+                    'Deck': model.deck_names[similar_ids],
+                    'Similarity': matrix[deck_id, similar_ids],
+                    'Shared cards': deck_similarity.shared_cards[deck_id, similar_ids],
+                }),
+                hide_index=True,
+                column_config={'Similarity': st.column_config.ProgressColumn(format='%.2f', min_value=0, max_value=1)}
+            )
+        with heatmap_col:
+            fig_similarity = similarity_heatmap(model.deck_names, matrix, np.concatenate([[deck_id], similar_ids]),
+                                                title=f'{metric_label} between {selected_deck} and its closest decks')
+            st.plotly_chart(fig_similarity, use_container_width=True)
+
+
+@st.fragment
+def render_card_browser(model: DataModel, card_index: CardIndex, selected_deck: str, deck_view: DeckView):
+    with timed_section("card browser"):
         # Card Browser Section
         st.subheader(f"Card Browser - {selected_deck}")
         
-        # Get all cards in the selected deck
-        all_cards_in_deck = all_cards_df[all_cards_df['decks'].str.contains(selected_deck, na=False)].copy() # type: ignore
+        search_text = st.text_input(
+            "Search all decks:",
+            placeholder="Card name, type or rules text, e.g. treas tok",
+            key="card_search_decklist"
+        )
+        if search_text.strip():
+            render_search_results(model, search_text)
+            return
         
         # Create filter section in columns
         st.markdown("### Filters")
@@ -86,7 +143,7 @@ def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_d
         
         with filter_col1:
             # Tag filter
-            available_tags = ["All Tags"] + sorted(deck_tag_data['tag_name'].unique())
+            available_tags = ["All Tags"] + list(model.tag_names[deck_view.tag_ids])
             selected_tag = st.selectbox(
                 "Tag:",
                 options=available_tags,
@@ -96,10 +153,7 @@ def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_d
         with filter_col2:
             # Card type filter
             # Extract all unique card types from the deck
-            all_types = set() # type: ignore
-            for types_str in all_cards_in_deck['card_types'].dropna():
-                all_types.update(types_str.split(','))
-            available_types = ["All Types"] + sorted(all_types) # type: ignore
+            available_types = ["All Types"] + list(model.type_names[deck_view.type_ids])
             selected_type = st.selectbox(
                 "Card Type:",
                 options=available_types,
@@ -108,8 +162,8 @@ def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_d
         
         with filter_col3:
             # CMC range filter
-            min_cmc = int(all_cards_in_deck['cmc'].min())
-            max_cmc = int(all_cards_in_deck['cmc'].max())
+            min_cmc = int(deck_view.min_cmc)
+            max_cmc = int(deck_view.max_cmc)
             cmc_range = st.slider(
                 "CMC Range:",
                 min_value=min_cmc,
@@ -118,25 +172,16 @@ def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_d
                 key="cmc_filter_decklist"
             )
         
-        # Apply filters
-        filtered_cards = all_cards_in_deck.copy()
-        
-        # Filter by tag
-        if selected_tag and selected_tag != "All Tags":
-            filtered_cards = filtered_cards[filtered_cards['card_tags'].str.contains(selected_tag, na=False)] # type: ignore
-        
-        # Filter by card type
-        if selected_type and selected_type != "All Types":
-            filtered_cards = filtered_cards[filtered_cards['card_types'].str.contains(selected_type, na=False)] # type: ignore
-        
-        # Filter by CMC range
-        filtered_cards = filtered_cards[
-            (filtered_cards['cmc'] >= cmc_range[0]) & 
-            (filtered_cards['cmc'] <= cmc_range[1])
-        ]
+        # Apply filters as intersections of the index posting lists
+        filtered_ids = card_index.filter(
+            deck=selected_deck,
+            tag=selected_tag if selected_tag and selected_tag != "All Tags" else None,
+            type_=selected_type if selected_type and selected_type != "All Types" else None,
+            cmc_range=cmc_range,
+        )
         
         # Display filtered results count
-        st.write(f"**{len(filtered_cards)} cards found** (out of {len(all_cards_in_deck)} total)")
+        st.write(f"**{len(filtered_ids)} cards found** (out of {len(deck_view.card_ids)} total)")
         
         # Sort options
         sort_col1, sort_col2 = st.columns([1, 3]) # type: ignore
@@ -147,33 +192,32 @@ def render_decklist_breakdown_tab(deck_stats_df: DataFrame, card_tags_per_deck_d
                 key="sort_filter_decklist"
             )
         
-        # Apply sorting
+        # Apply sorting; card ids are already in name order
         if sort_by == "CMC (Low to High)":
-            filtered_cards = filtered_cards.sort_values('cmc', ascending=True)
+            filtered_ids = filtered_ids[np.argsort(model.card_cmc[filtered_ids], kind='stable')]
         elif sort_by == "CMC (High to Low)":
-            filtered_cards = filtered_cards.sort_values('cmc', ascending=False)
-        else:  # Name
-            filtered_cards = filtered_cards.sort_values('card_name', ascending=True)
+            filtered_ids = filtered_ids[np.argsort(-model.card_cmc[filtered_ids], kind='stable')]
         
-        # Display cards as image gallery
-        if len(filtered_cards) > 0:
-            cols_per_row = 4
-            rows = [filtered_cards.iloc[i:i+cols_per_row] for i in range(0, len(filtered_cards), cols_per_row)]
-            
-            for row in rows:
-                cols = st.columns(cols_per_row)
-                for idx, (_, card) in enumerate(row.iterrows()):
-                    with cols[idx]:
-                        if card['image_url'] and card['image_url'].strip():
-                            st.image(card['image_url'], use_container_width=True)
-                            # Show card details in expander
-                            with st.expander("Details"):
-                                st.write(f"**CMC:** {card['cmc']}")
-                                st.write(f"**Types:** {card['card_types'] or 'N/A'}")
-                                st.write(f"**Tags:** {card['card_tags'] or 'N/A'}")
-                        else:
-                            st.info(f"**{card['card_name']}**\nCMC: {card['cmc']}\n(No image)")
+        # Display cards as image gallery, one page at a time
+        if len(filtered_ids) > 0:
+            render_card_gallery(model, filtered_ids, key="gallery_decklist")
         else:
-            st.warning("No cards match the selected filters.")        
+            st.warning("No cards match the selected filters.")
+
+
+def render_search_results(model: DataModel, search_text: str):
+    try:
+        card_names = search_card_names(search_text)
+    except sqlite3.OperationalError:
+        st.info("Card search needs the full-text index: run `make migrate`.")
+        return
+    # The full-text index only holds cards that are in some deck
+    if len(card_names) > SEARCH_LIMIT:
+        st.write(f"**{SEARCH_LIMIT}+ cards found** in all decks, showing the {SEARCH_LIMIT} best matches")
+    else:
+        st.write(f"**{len(card_names)} cards found** in all decks, best match first")
+    card_ids = model.card_ids(card_names[:SEARCH_LIMIT])
+    if len(card_ids) > 0:
+        render_card_gallery(model, card_ids, key="gallery_search")
     else:
-        st.info("No deck statistics available.")
\ No newline at end of file
+        st.warning("No cards match the search.")
@@ -2,25 +2,39 @@ from pandas import DataFrame
 import streamlit as st
 import plotly.express as px
 
-def render_tag_tab(card_tags_per_deck_df: DataFrame):
+from src.analytics.model import DataModel
+from src.dashboard.instrumentation import timed_section
+from src.dashboard.visualizations.comparison_charts import highlight_bar, tag_comparison_chart
+
+def render_tag_tab(model: DataModel):
     st.header("Filter by Tag - Quantity Across Decks")
     
-    if not card_tags_per_deck_df.empty:
-        
+    tag_totals = model.tag_totals()
+    if tag_totals.any():
+        render_tag_selection(model, list(model.tag_names[tag_totals > 0]))
+    else:
+        st.info("No card tags data available.")
+
+
+# A fragment: changing the tag reruns only this function, not the whole page
+@st.fragment
+def render_tag_selection(model: DataModel, available_tags: list):
+    with timed_section("tag tab"):
         # Tag selector
-        available_tags = sorted(card_tags_per_deck_df['tag_name'].unique())
         selected_tag = st.selectbox(
             "Select a tag to see its distribution across decks:",
             options=available_tags,
             key="tag_filter"
         )
         
-        # Filter data for selected tag
-        tag_data = card_tags_per_deck_df[card_tags_per_deck_df['tag_name'] == selected_tag].copy()
+        # Count the selected tag in every deck
+        counts = model.tag_counts_per_deck(selected_tag)
+        in_decks = counts > 0
+        tag_data = DataFrame({'deck_name': model.deck_names[in_decks], 'tag_count': counts[in_decks]})
         
         if not tag_data.empty:
             # Sort by count for better visualization
-            tag_data = tag_data.sort_values('tag_count', ascending=False)
+            tag_data = tag_data.sort_values('tag_count', ascending=False, kind='stable')
             
             col1, col2 = st.columns([2, 1])
             
@@ -56,25 +70,8 @@ def render_tag_tab(card_tags_per_deck_df: DataFrame):
             
             # Comparison chart - all tags for comparison
             st.subheader("Compare with Other Tags")
-            comparison_data = card_tags_per_deck_df.groupby('tag_name')['tag_count'].sum().sort_values(ascending=False).reset_index()
-            comparison_data.columns = ['Tag', 'Total Cards']
-            
-            fig_comparison = px.bar(
-                comparison_data,
-                x='Tag',
-                y='Total Cards',
-                title='Total Cards per Tag Across All Decks',
-                color='Total Cards',
-                color_continuous_scale='Viridis'
-            )
-            fig_comparison.update_layout(xaxis_tickangle=-45, showlegend=False)
-            
-            # Highlight selected tag
-            fig_comparison.update_traces(
-                marker_color=['red' if tag == selected_tag else 'lightblue' for tag in comparison_data['Tag']]
-            )
+            # Built once per data version; only the highlight depends on the selection
+            fig_comparison = highlight_bar(tag_comparison_chart(), selected_tag)
             st.plotly_chart(fig_comparison, use_container_width=True)
         else:
-            st.warning(f"No data found for tag: {selected_tag}")
-    else:
-        st.info("No card tags data available.")
\ No newline at end of file
+            st.warning(f"No data found for tag: {selected_tag}")
\ No newline at end of file
@@ -0,0 +1,68 @@
+import math
+from typing import Sequence
+
+import numpy as np
+import streamlit as st
+
+from src.analytics.model import DataModel
+from src.dashboard.core import get_thumbnail_cache
+
+PAGE_SIZES = (12, 24, 48, 96)
+
+
+def _page_bounds(n_cards: int, page_size: int, page: int) -> tuple:
+    """Clamp `page` (1-based) to the available pages and return (page, start, end)."""
+    n_pages = max(1, math.ceil(n_cards / page_size))
+    page = min(max(1, page), n_pages)
+    start = (page - 1) * page_size
+    return page, start, min(start + page_size, n_cards)
+
+
+def render_card_gallery(model: DataModel, card_ids: np.ndarray, key: str, cols_per_row: int = 4,
+                        page_sizes: Sequence[int] = PAGE_SIZES, default_page_size: int = 24):
+    """Image gallery of `card_ids`, one page at a time.
+
+    Only the cards of the current page get widgets and thumbnail lookups, so
+    rerun cost depends on the page size rather than on the number of matches.
+    """
+    page_size_key, page_key = f"{key}_page_size", f"{key}_page"
+    control_col1, control_col2, control_col3 = st.columns([1, 1, 2])
+    with control_col1:
+        page_size = st.selectbox(
+            "Cards per page:",
+            options=list(page_sizes),
+            index=list(page_sizes).index(default_page_size),
+            key=page_size_key
+        )
+
+    # A filter change can leave the stored page past the end; clamp it before
+    # the widget is created, which is the only time its state may be set
+    page, start, end = _page_bounds(len(card_ids), page_size, st.session_state.get(page_key, 1))
+    st.session_state[page_key] = page
+    n_pages = max(1, math.ceil(len(card_ids) / page_size))
+    with control_col2:
+        st.number_input("Page:", min_value=1, max_value=n_pages, step=1, key=page_key)
+    with control_col3:
+        st.markdown(f"<br>Showing {start + 1}–{end} of {len(card_ids)}", unsafe_allow_html=True)
+
+    page_ids = card_ids[start:end]
+    # Local thumbnails are served by this server; the full-size image is only a link
+    thumbnails = get_thumbnail_cache().paths_for(model.card_image_urls[page_ids])
+
+    for row_start in range(0, len(page_ids), cols_per_row):
+        cols = st.columns(cols_per_row)
+        for idx, card_id in enumerate(page_ids[row_start:row_start + cols_per_row]):
+            with cols[idx]:
+                image_url = model.card_image_urls[card_id]
+                cmc = model.card_cmc[card_id]
+                if image_url and image_url.strip():
+                    thumbnail = thumbnails.get(image_url)
+                    st.image(str(thumbnail) if thumbnail else image_url, use_container_width=True)
+                    # Show card details in expander
+                    with st.expander("Details"):
+                        st.markdown(f"[Full-size image]({image_url})")
+                        st.write(f"**CMC:** {cmc}")
+                        st.write(f"**Types:** {', '.join(model.card_type_names(card_id)) or 'N/A'}")
+                        st.write(f"**Tags:** {', '.join(model.card_tag_names(card_id)) or 'N/A'}")
+                else:
+                    st.info(f"**{model.card_names[card_id]}**\nCMC: {cmc}\n(No image)")
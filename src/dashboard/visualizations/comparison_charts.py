@@ -0,0 +1,62 @@
+import plotly.express as px
+import plotly.graph_objects as go
+
+from src.dashboard.core import cache_by_data_version
+from src.analytics.model import MODEL_TABLES
+from src.dashboard.dataframes.data_model import load_data_model
+from src.dashboard.dataframes.deck_stats_df import load_deck_stats
+
+# Bars of a comparison chart are light blue, the selected one red
+_SELECTION_STYLE = dict(
+    marker_color='lightblue',
+    selected={'marker': {'color': 'red'}},
+    unselected={'marker': {'opacity': 1}},
+)
+
+
+def highlight_bar(fig: go.Figure, name: str) -> go.Figure:
+    """Copy of the cached bar chart `fig` with the bar at x=`name` highlighted.
+
+    The cached figure is shared by every session and must not be modified.
+    Highlighting through selectedpoints validates a single index, which is
+    much cheaper than a per-bar color list on charts with many bars.
+    """
+    fig = go.Figure(fig)
+    x = list(fig.data[0].x)
+    fig.update_traces(selectedpoints=[x.index(name)] if name in x else [])
+    return fig
+
+
+@cache_by_data_version(*MODEL_TABLES, resource=True)
+def tag_comparison_chart() -> go.Figure:
+    """Total cards per tag across all decks; independent of the selected tag."""
+    model = load_data_model()
+    tag_totals = model.tag_totals()
+    tagged = tag_totals > 0
+    # Stable sort on descending totals keeps ties in tag name order
+    order = (-tag_totals[tagged]).argsort(kind='stable')
+    fig = px.bar(
+        x=model.tag_names[tagged][order],
+        y=tag_totals[tagged][order],
+        title='Total Cards per Tag Across All Decks',
+        labels={'x': 'Tag', 'y': 'Total Cards'}
+    )
+    fig.update_traces(**_SELECTION_STYLE)
+    fig.update_layout(xaxis_tickangle=-45, showlegend=False)
+    return fig
+
+
+@cache_by_data_version("deck_stats", resource=True)
+def deck_cmc_comparison_chart() -> go.Figure:
+    """Average CMC of every deck; independent of the selected deck."""
+    fig = px.bar(
+        load_deck_stats().sort_values('avg_cmc', ascending=False),
+        x='deck_name',
+        y='avg_cmc',
+        title='Average CMC Across All Decks',
+        labels={'deck_name': 'Deck', 'avg_cmc': 'Average CMC'}
+    )
+    fig.update_traces(**_SELECTION_STYLE)
+    fig.update_layout(xaxis_tickangle=-45, showlegend=False)
+    return fig
+
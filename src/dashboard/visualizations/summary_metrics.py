@@ -1,16 +1,17 @@
-from pandas import DataFrame
+from typing import Dict
+
 import streamlit as st
 
-def show_summary_metrics(cards_df: DataFrame, decks_df: DataFrame, tags_df: DataFrame, card_tags_df: DataFrame):
+def show_summary_metrics(summary_counts: Dict[str, int]):
     """Display summary metrics in the dashboard."""
     st.header("📊 Summary")
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("Total Cards", len(cards_df))
+        st.metric("Total Cards", int(summary_counts["total_cards"]))
     with col2:
-        st.metric("Total Decks", len(decks_df))
+        st.metric("Total Decks", int(summary_counts["total_decks"]))
     with col3:
-        st.metric("Total Tags", len(tags_df))
+        st.metric("Total Tags", int(summary_counts["total_tags"]))
     with col4:
-        st.metric("Unique Tagged Cards", len(card_tags_df['card_name'].unique()))
\ No newline at end of file
+        st.metric("Unique Tagged Cards", int(summary_counts["unique_tagged_cards"]))
\ No newline at end of file
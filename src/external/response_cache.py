@@ -0,0 +1,111 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Get project root directory (3 levels up from this file)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_CACHE_PATH = PROJECT_ROOT / ".cache" / "scryfall_cache.db"
+
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    body: str
+    etag: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def json(self): # type: ignore
+        return json.loads(self.body)
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str: # type: ignore
+    """Stable key for a request, independent of the order params were given in."""
+    payload = json.dumps([url, sorted((params or {}).items())])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with TTL and size-bounded LRU eviction.
+
+    Entries are stored in a small SQLite file. Stale entries are kept around
+    so they can be revalidated with their ETag, or served as-is when the API
+    is unreachable.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            status_code INTEGER NOT NULL,
+            body TEXT NOT NULL,
+            etag TEXT,
+            fetched_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+        """)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, body, etag, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CachedResponse(*row)
+
+    def put(self, key: str, url: str, status_code: int, body: str, etag: Optional[str]) -> None:
+        now = time.time()
+        size = len(body.encode())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status_code, body, etag, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status_code, body, etag, now, now, size)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as revalidated (e.g. after a 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
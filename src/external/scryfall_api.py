@@ -1,32 +1,204 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+from src.external.rate_limiter import TokenBucket
+from src.external.response_cache import ResponseCache, cache_key
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# A request that runs out of retries falls back to its cached copy; only after
+# this many failures in a row are cached entries served without trying the
+# network, and only for OFFLINE_COOLDOWN seconds
+OFFLINE_AFTER_FAILURES = 3
+OFFLINE_COOLDOWN = 60.0
+
+
+class ScryfallUnavailable(Exception):
+    """A request still failed (connection error, 429 or 5xx) after every retry, with no cached copy to fall back on."""
+
+
+class IncompleteSearch(Exception):
+    """A search announced more pages (has_more) but the next one came back without results."""
+
 
 class ScryfallAPI:
     BASE_URL = "https://api.scryfall.com"
+    HEADERS = {"User-Agent": "precon-stats/0.1", "Accept": "application/json"}
 
-    def get_card_by_name(self, name): # type: ignore
+    def __init__(self, base_url: Optional[str] = None, rate_limiter: Optional[TokenBucket] = None,
+                 max_retries: int = 5, backoff: float = 0.5, timeout: float = 30.0,
+                 cache: Optional[ResponseCache] = None, use_cache: bool = True, pool_size: int = 8,
+                 offline_after: int = OFFLINE_AFTER_FAILURES, offline_cooldown: float = OFFLINE_COOLDOWN):
+        self.base_url = base_url or self.BASE_URL
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache if cache is not None else (ResponseCache() if use_cache else None)
+        self.offline_after = offline_after
+        self.offline_cooldown = offline_cooldown
+        self._consecutive_failures = 0
+        self._offline_until = 0.0
+        self.request_count = 0
+        self.retry_count = 0
+        self.cache_hits = 0
+        self._counter_lock = threading.Lock()
 
-        response = requests.get(f"{self.BASE_URL}/cards/named", params={"exact": name}) # type: ignore
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
-        
-    def scryfall_oracle_search(self, query): # type: ignore
+        # One pooled session keeps TCP/TLS connections alive across calls
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
-        response = requests.get(f"{self.BASE_URL}/cards/search", params={"q": query}) # type: ignore
-        if response.status_code == 200:
-            return response.json()
-        else:
+    def _count(self, counter: str) -> None:
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def offline(self) -> bool:
+        """Whether Scryfall failed often enough lately that cached entries skip the network."""
+        return time.monotonic() < self._offline_until
+
+    def _record_outcome(self, failed: bool) -> None:
+        with self._counter_lock:
+            if not failed:
+                self._consecutive_failures = 0
+                self._offline_until = 0.0
+                return
+            self._consecutive_failures += 1
+            if self._consecutive_failures < self.offline_after or self.offline:
+                return
+            self._offline_until = time.monotonic() + self.offline_cooldown
+        print(f"Scryfall unreachable, serving cached responses for the next {self.offline_cooldown:.0f}s")
+
+    def _retry_delay(self, response: Optional[requests.Response], attempt: int) -> float:
+        if response is not None and "Retry-After" in response.headers:
+            try:
+                return float(response.headers["Retry-After"])
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def _get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> Optional[requests.Response]: # type: ignore
+        """GET honoring the shared rate limit, retrying on 429/5xx and connection errors."""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            self._count("request_count")
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout) # type: ignore
+            except (requests.ConnectionError, requests.Timeout):
+                response = None
+            if response is not None and response.status_code not in RETRY_STATUS_CODES:
+                return response
+            if attempt == self.max_retries:
+                return response
+            self._count("retry_count")
+            time.sleep(self._retry_delay(response, attempt))
+        return None
+
+    def _failure(self, url: str, response: Optional[requests.Response]) -> str:
+        reason = "connection failed" if response is None else f"HTTP {response.status_code}"
+        return f"{url}: {reason} after {self.max_retries} retries"
+
+    def _get_json(self, url: str, params: Optional[dict] = None, fresh: bool = False): # type: ignore
+        """Fetch a JSON payload, going through the response cache when enabled.
+
+        Fresh entries are served without touching the network, stale ones are
+        revalidated with their ETag, and any cached entry is used as a
+        fallback when Scryfall can't be reached. After `offline_after` such
+        failures in a row, cached entries skip the network for
+        `offline_cooldown` seconds. `fresh=True` always revalidates, ignoring
+        the TTL. Returns None when Scryfall answers
+        with no result (e.g. 404 for an empty search) and raises
+        ScryfallUnavailable when the retries ran out.
+        """
+        if self.cache is None:
+            response = self._get(url, params)
+            if response is None or response.status_code in RETRY_STATUS_CODES:
+                raise ScryfallUnavailable(self._failure(url, response))
+            if response.status_code == 200:
+                return response.json()
             return None
-    
-    def process_next_page(self, next_page_url): # type: ignore
-        response = requests.get(next_page_url) # type: ignore
+
+        key = cache_key(url, params)
+        cached = self.cache.get(key)
+        if cached and (self.offline or (not fresh and cached.is_fresh(self.cache.ttl))):
+            self._count("cache_hits")
+            return cached.json() if cached.status_code == 200 else None
+
+        headers = {"If-None-Match": cached.etag} if cached and cached.etag else None
+        response = self._get(url, params, headers=headers)
+
+        failed = response is None or response.status_code in RETRY_STATUS_CODES
+        self._record_outcome(failed)
+        if failed:
+            if cached:
+                self._count("cache_hits")
+                return cached.json() if cached.status_code == 200 else None
+            raise ScryfallUnavailable(self._failure(url, response))
+        if response.status_code == 304 and cached:
+            self.cache.touch(key)
+            self._count("cache_hits")
+            return cached.json() if cached.status_code == 200 else None
+        if response.status_code in (200, 404):
+            # 404 is how Scryfall answers an empty search, so it is worth caching too
+            self.cache.put(key, url, response.status_code, response.text, response.headers.get("ETag"))
         if response.status_code == 200:
             return response.json()
-        else:
-            return None
-        
+        return None
+
+    def get_card_by_name(self, name): # type: ignore
+        return self._get_json(f"{self.base_url}/cards/named", params={"exact": name}) # type: ignore
+
+    def get_set(self, set_code: str, fresh: bool = True): # type: ignore
+        return self._get_json(f"{self.base_url}/sets/{set_code}", fresh=fresh) # type: ignore
+
+    def scryfall_oracle_search(self, query, fresh: bool = False): # type: ignore
+        return self._get_json(f"{self.base_url}/cards/search", params={"q": query}, fresh=fresh) # type: ignore
+
+    def process_next_page(self, next_page_url, fresh: bool = False): # type: ignore
+        return self._get_json(next_page_url, fresh=fresh) # type: ignore
+
+    def get_image(self, url: str) -> Optional[bytes]:
+        """Raw bytes of a card image (served by Scryfall's CDN; not cached here)."""
+        response = self._get(url, headers={"Accept": "image/*"})
+        if response is not None and response.status_code == 200:
+            return response.content
+        return None
+
+    def iter_search(self, query: str, fresh: bool = False) -> Iterator[dict]: # type: ignore
+        """Yield every card matching `query`, following `next_page` links.
+
+        The next page is requested on a background thread while the caller
+        consumes the current one, and each page is dropped once its cards
+        have been yielded, so at most two pages are held in memory. A later
+        page that cannot be fetched raises (ScryfallUnavailable or
+        IncompleteSearch) instead of ending the results early.
+        """
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = self.scryfall_oracle_search(query, fresh=fresh) # type: ignore
+            yielded = 0
+            while page and "data" in page:
+                next_page = None
+                if page.get("has_more") and page.get("next_page"): # type: ignore
+                    next_page = prefetcher.submit(self.process_next_page, page["next_page"], fresh) # type: ignore
+                cards = page["data"] # type: ignore
+                page = None
+                yield from cards # type: ignore
+                yielded += len(cards) # type: ignore
+                if next_page is None:
+                    return
+                page = next_page.result()
+                if not page or "data" not in page:
+                    raise IncompleteSearch(f"{query}: next page missing after {yielded} cards")
+
 if __name__ == "__main__":
     api = ScryfallAPI()
     query = "set:otc"
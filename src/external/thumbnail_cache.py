@@ -0,0 +1,129 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# Get project root directory (3 levels up from this file)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_THUMBNAIL_DIR = PROJECT_ROOT / ".cache" / "thumbnails"
+
+
+class ThumbnailCache:
+    """Content-addressed on-disk store of card thumbnails with size-bounded LRU eviction.
+
+    Thumbnails live in `objects/<2 hex>/<sha256>.webp`, named after the hash
+    of their bytes, so reprints sharing artwork are stored once. A small
+    SQLite index maps each image URL to its object. Eviction drops the
+    objects whose URLs were used least recently until the total size fits
+    `max_bytes`.
+
+    With read_only=True (the dashboard) the index is opened read-only and
+    nothing is written or evicted.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_THUMBNAIL_DIR, max_bytes: int = 512 * 1024 * 1024,
+                 read_only: bool = False):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._total = 0
+        index_path = self.directory / "index.db"
+        if read_only:
+            self._conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True, check_same_thread=False) \
+                if index_path.exists() else None
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(index_path), check_same_thread=False)
+        self._conn.executescript("""
+        CREATE TABLE IF NOT EXISTS thumbnails (
+            url TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_thumbnails_sha256 ON thumbnails(sha256);
+        """)
+        self._total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM thumbnails GROUP BY sha256)"
+        ).fetchone()[0]
+
+    def _object_path(self, sha256: str) -> Path:
+        return self.directory / "objects" / sha256[:2] / f"{sha256}.webp"
+
+    def paths_for(self, urls: Iterable[str]) -> Dict[str, Path]:
+        """Local thumbnail path of every URL that has one."""
+        urls = [url for url in urls if url]
+        if self._conn is None or not urls:
+            return {}
+        rows = []
+        with self._lock:
+            # Stay under SQLite's limit on bound parameters
+            for start in range(0, len(urls), 900):
+                batch = urls[start:start + 900]
+                rows += self._conn.execute(
+                    f"SELECT url, sha256 FROM thumbnails WHERE url IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+        paths = {url: self._object_path(sha256) for url, sha256 in rows}
+        # A concurrent eviction may have removed the file after the lookup
+        return {url: path for url, path in paths.items() if path.exists()}
+
+    def path_for(self, url: str) -> Optional[Path]:
+        return self.paths_for([url]).get(url)
+
+    def put(self, url: str, data: bytes) -> Path:
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        with self._lock:
+            previous = self._conn.execute("SELECT sha256 FROM thumbnails WHERE url = ?", (url,)).fetchone()
+            if not self._is_referenced(sha256):
+                self._total += len(data)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbnails (url, sha256, size, last_access) VALUES (?, ?, ?, ?)",
+                (url, sha256, len(data), time.time())
+            )
+            if previous and previous[0] != sha256 and not self._is_referenced(previous[0]):
+                self._drop_object(previous[0])
+            if self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+        return path
+
+    def _is_referenced(self, sha256: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM thumbnails WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone() is not None
+
+    def _drop_object(self, sha256: str) -> None:
+        path = self._object_path(sha256)
+        if path.exists():
+            self._total -= path.stat().st_size
+            path.unlink()
+        self._conn.execute("DELETE FROM thumbnails WHERE sha256 = ?", (sha256,))
+
+    def touch(self, urls: Iterable[str]) -> None:
+        """Mark thumbnails as in use, so eviction removes stale ones first."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("UPDATE thumbnails SET last_access = ? WHERE url = ?",
+                                   [(now, url) for url in urls])
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Least recently used objects first; an object is as recent as its newest URL
+        objects = self._conn.execute(
+            "SELECT sha256 FROM thumbnails GROUP BY sha256 ORDER BY MAX(last_access)"
+        ).fetchall()
+        for sha256, in objects:
+            if self._total <= self.max_bytes:
+                break
+            self._drop_object(sha256)
+
+    def total_bytes(self) -> int:
+        return self._total
@@ -0,0 +1,92 @@
+import sqlite3
+from typing import Iterable, Optional
+
+# Resumos por deck materializados no fim da ingestão, para quem lê o banco
+# sem refazer os JOINs. deck_stats vem da migração 3; deck_tag_counts e
+# deck_cmc_histogram, removidas na migração 8, voltaram na migração 12.
+
+# `{deck_filter}` is either empty or an `AND d.name IN (...)` clause. Cards
+# count once per copy (deck_cards.quantity), only in the main deck and the
+# command zone; a card is a land when every one of its types is 'land'
+DECK_STATS_SQL = """
+INSERT INTO deck_stats (deck_name, total_cards, avg_cmc, unique_tags)
+SELECT
+    d.name AS deck_name,
+    SUM(dc.quantity) AS total_cards,
+    SUM(dc.quantity * c.cmc) * 1.0 / SUM(IIF(c.cmc IS NULL, 0, dc.quantity)) AS avg_cmc,
+    (SELECT COUNT(DISTINCT ct.tag_name)
+     FROM deck_cards tdc
+     JOIN card_tags ct ON tdc.card_name = ct.card_name
+     WHERE tdc.deck_name = d.name AND tdc.section IN ('main', 'commander')
+       AND EXISTS (SELECT 1 FROM card_types ctype
+                   WHERE ctype.card_name = tdc.card_name AND ctype.type_name != 'land')) AS unique_tags
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN cards c ON dc.card_name = c.name
+WHERE dc.section IN ('main', 'commander')
+  AND EXISTS (SELECT 1 FROM card_types ctype
+              WHERE ctype.card_name = dc.card_name AND ctype.type_name != 'land') {deck_filter}
+GROUP BY d.name
+"""
+
+# Copies of each tag in the deck, lands included, as in the model's deck views
+DECK_TAG_COUNTS_SQL = """
+INSERT INTO deck_tag_counts (deck_name, tag_name, tag_count)
+SELECT
+    d.name AS deck_name,
+    ct.tag_name,
+    SUM(dc.quantity) AS tag_count
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN card_tags ct ON dc.card_name = ct.card_name
+WHERE dc.section IN ('main', 'commander') {deck_filter}
+GROUP BY d.name, ct.tag_name
+"""
+
+# Copies of the non-land cards at each CMC, the cards deck_stats.avg_cmc averages
+DECK_CMC_HISTOGRAM_SQL = """
+INSERT INTO deck_cmc_histogram (deck_name, cmc, total_cards)
+SELECT
+    d.name AS deck_name,
+    c.cmc AS cmc,
+    SUM(dc.quantity) AS total_cards
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN cards c ON dc.card_name = c.name
+WHERE dc.section IN ('main', 'commander')
+  AND EXISTS (SELECT 1 FROM card_types ctype
+              WHERE ctype.card_name = dc.card_name AND ctype.type_name != 'land') {deck_filter}
+GROUP BY d.name, c.cmc
+"""
+
+AGGREGATES = (
+    ("deck_stats", DECK_STATS_SQL),
+    ("deck_tag_counts", DECK_TAG_COUNTS_SQL),
+    ("deck_cmc_histogram", DECK_CMC_HISTOGRAM_SQL),
+)
+
+
+def refresh_aggregates(conn: sqlite3.Connection, decks: Optional[Iterable[str]] = None) -> bool:
+    """Rebuild the per-deck summary tables.
+
+    With `decks=None` every row is recomputed; otherwise only the given
+    decks are deleted and recomputed (decks that no longer exist simply end
+    up with no rows). Returns False when there was nothing to recompute.
+    The caller owns the transaction.
+    """
+    if decks is None:
+        params = []
+        deck_filter = ""
+    else:
+        params = sorted(set(decks))
+        if not params:
+            return False
+        deck_filter = f"AND d.name IN ({', '.join('?' for _ in params)})"
+
+    for table, insert_sql in AGGREGATES:
+        if decks is None:
+            conn.execute(f"DELETE FROM {table}")
+        else:
+            conn.execute(f"DELETE FROM {table} WHERE deck_name IN ({', '.join('?' for _ in params)})", params)
+        conn.execute(insert_sql.format(deck_filter=deck_filter), params)
+    return True
@@ -0,0 +1,89 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import IO, Iterator, Set
+
+from src.precon_db.card_writer import CardWriter
+
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(fp: IO[str], chunk_size: int = 1 << 20) -> Iterator[dict]: # type: ignore
+    """Yield the elements of a top-level JSON array one at a time.
+
+    Scryfall bulk files are a single array that can be hundreds of MB, so
+    the file is read in chunks and each element is decoded with
+    `raw_decode` as soon as it is complete. Only the current chunk plus one
+    partial element are ever held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # Skip separators between elements
+        while pos < len(buffer) and (buffer[pos] in _WHITESPACE or (started and buffer[pos] == ",")):
+            pos += 1
+        if not started and pos < len(buffer):
+            if buffer[pos] != "[":
+                raise ValueError("Bulk file must contain a JSON array")
+            started = True
+            pos += 1
+            continue
+        if started and pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        if pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if end < len(buffer) or eof:
+                    pos = end
+                    yield item
+                    continue
+
+        if eof:
+            if started:
+                raise ValueError("Unexpected end of bulk file")
+            return
+        # Need more data: drop what was consumed and append the next chunk
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def _matches(card: dict, sets: Set[str], names: Set[str]) -> bool: # type: ignore
+    if card.get("set", "").lower() in sets:
+        return True
+    name = card.get("name", "")
+    # Double-faced cards are listed by their front face in decklists
+    return name in names or name.split(" // ")[0] in names
+
+
+def load_bulk_file(conn: sqlite3.Connection, path: Path, sets: Set[str], names: Set[str],
+                   batch_size: int = 5000) -> int:
+    """Stream a Scryfall bulk-data file into the cards/card_types tables.
+
+    Only cards from `sets` or whose name is in `names` are kept. Rows are
+    staged in a CardWriter and flushed every `batch_size` rows, one
+    transaction per batch. Returns the number of matching card objects.
+    """
+    sets = {s.lower() for s in sets}
+    writer = CardWriter(conn, flush_every=batch_size)
+    matched = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        for card in iter_json_array(f):
+            if not _matches(card, sets, names):
+                continue
+            matched += 1
+            writer.add_card(card)
+    writer.flush()
+    return matched
@@ -0,0 +1,34 @@
+from typing import List, Optional, Tuple
+
+CARD_TYPES = {
+    "creature", "instant", "sorcery", "enchantment", "artifact", "planeswalker", "land", "battle"
+}
+
+
+def oracle_text(card: dict) -> str: # type: ignore
+    """Rules text of the card; double-faced cards keep it per face, joined here one face per line."""
+    if "oracle_text" in card:
+        return card["oracle_text"] # type: ignore
+    return "\n".join(face.get("oracle_text", "") for face in card.get("card_faces", [])) # type: ignore
+
+
+def card_row(card: dict) -> Tuple[str, int, str, str, str]: # type: ignore
+    """Scryfall card object -> (name, cmc, type, image_url, oracle_text) row for the cards table."""
+    image_url = card.get("image_uris", {}).get("normal", "")  # type: ignore
+    return card["name"], card.get("cmc", 0), card.get("type_line", ""), image_url, oracle_text(card) # type: ignore
+
+
+def printing_row(card: dict) -> Optional[Tuple[str, str, str]]: # type: ignore
+    """Scryfall card object -> (set_code, collector_number, name) row for the card_printings table."""
+    if not card.get("set") or not card.get("collector_number"): # type: ignore
+        return None
+    return card["set"].lower(), card["collector_number"], card["name"] # type: ignore
+
+
+def card_type_rows(card_name: str, type_line: str) -> List[Tuple[str, str]]:
+    """Split a type line into (card_name, type_name) rows for the card_types table."""
+    rows = []
+    for word in type_line.split():
+        if word.lower() in CARD_TYPES:
+            rows.append((card_name, word.lower()))
+    return rows
@@ -0,0 +1,130 @@
+import re
+import sqlite3
+from typing import List
+
+# Índice de texto completo dos cards que estão em algum deck, que é o que a
+# busca do dashboard mostra. Guarda uma cópia do texto (são poucos cards), e
+# populate_db o reconstrói quando cards ou decks mudam (refresh_card_search).
+CARD_SEARCH_TABLE_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS card_search USING fts5(
+    name, type, oracle_text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    -- Prefix indexes answer "prol*" without scanning every token starting with it
+    prefix = '2 3'
+)
+"""
+
+# Rows are inserted most-played first, so rowid order (the order FTS5 reads
+# matches in) puts the cards in the most decks first
+_REFRESH_SQL = """
+INSERT INTO card_search (name, type, oracle_text)
+SELECT c.name, c.type, c.oracle_text
+FROM cards c
+JOIN (SELECT card_name, COUNT(DISTINCT deck_name) AS n_decks
+      FROM deck_cards WHERE section IN ('main', 'commander') GROUP BY card_name) d ON d.card_name = c.name
+ORDER BY d.n_decks DESC, c.name
+"""
+
+# bm25 weights of name, type and oracle_text: a hit in the name ranks first
+_COLUMN_WEIGHTS = (10.0, 2.0, 1.0)
+
+# Matches scored with bm25 per query, in each tier of search_cards. bm25 has
+# to score every candidate, so a term found in most cards would cost tens of
+# ms; past this many matches only the most-played ones are ranked
+RANK_CANDIDATES = 2000
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def refresh_card_search(conn: sqlite3.Connection) -> None:
+    """Rebuild the full-text index of the deck cards. The caller owns the transaction."""
+    conn.execute("DELETE FROM card_search")
+    conn.execute(_REFRESH_SQL)
+    # Merge the b-trees the rebuild left behind, so queries read one segment per term
+    conn.execute("INSERT INTO card_search (card_search) VALUES ('optimize')")
+
+
+def match_expression(text: str) -> str:
+    """FTS5 query matching every word of `text` as a prefix, e.g. 'draw car' -> '"draw"* "car"*'.
+
+    Words are quoted, so user input can never be read as FTS5 syntax. A
+    single letter only matches as a whole word: as a prefix it would match
+    most of the catalog.
+    """
+    return " ".join(f'"{word}"*' if len(word) > 1 else f'"{word}"' for word in _WORD_RE.findall(text))
+
+
+def _ranked_matches(conn: sqlite3.Connection, expression: str, limit: int) -> List[str]:
+    """Best `limit` of the first RANK_CANDIDATES matches of `expression` (most-played first), by bm25."""
+    rows = conn.execute(
+        f"SELECT name FROM ("
+        f"  SELECT name, bm25(card_search, {', '.join(map(str, _COLUMN_WEIGHTS))}) AS score"
+        f"  FROM card_search WHERE card_search MATCH ? LIMIT ?"
+        f") ORDER BY score LIMIT ?",
+        (expression, RANK_CANDIDATES, limit)
+    ).fetchall()
+    return [name for name, in rows]
+
+
+def search_cards(conn: sqlite3.Connection, text: str, limit: int = 100) -> List[str]:
+    """Names of the deck cards matching every word of `text`, best first.
+
+    Cards whose name matches every word come first, then cards matching in
+    their type or rules text; each tier is ordered by bm25. A broad query
+    ranks the RANK_CANDIDATES most-played matches of each tier, so a name
+    hit is never pushed out by thousands of rules text hits.
+    """
+    expression = match_expression(text)
+    if not expression:
+        return []
+    names = _ranked_matches(conn, f"name : ({expression})", limit)
+    if len(names) < limit:
+        in_name = set(names)
+        others = _ranked_matches(conn, expression, limit)
+        names += [name for name in others if name not in in_name][:limit - len(names)]
+    return names
+
+
+if __name__ == "__main__":
+    # Benchmark: query latency on a synthetic 100k-card catalog, by how many
+    # deck cards the query matches, against the LIKE scan it replaces
+    import sys
+    import tempfile
+    import time
+    from pathlib import Path
+
+    from src.precon_db.synthetic import build_synthetic_db
+
+    n_cards = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = ["card 1234", "haste", "treas tok", "exile artif", "gain life", "draw", "dest targ", "creature"]
+
+    def best_of(run, query: str, repeat: int = 10) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(str(build_synthetic_db(Path(tmp) / "synthetic.db", n_cards=n_cards)))
+        start = time.perf_counter()
+        refresh_card_search(conn)
+        conn.commit()
+        print(f"{n_cards:,} cards, index rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        def like_scan(query: str) -> None:
+            # Unranked, and only substrings: the closest the old code gets
+            clauses = " AND ".join("(name || ' ' || type || ' ' || oracle_text) LIKE ?" for _ in query.split())
+            conn.execute(f"SELECT name FROM cards WHERE name IN (SELECT card_name FROM deck_cards WHERE section IN ('main', 'commander')) "
+                         f"AND {clauses}",
+                         [f"%{word}%" for word in query.split()]).fetchall()
+
+        print(f"{conn.execute('SELECT COUNT(*) FROM card_search').fetchone()[0]:,} deck cards indexed")
+        print(f"{'query':<14} {'matches':>8} {'LIKE scan':>10} {'FTS5 top 500':>13}")
+        for query in queries:
+            matches = conn.execute("SELECT COUNT(*) FROM card_search WHERE card_search MATCH ?",
+                                   (match_expression(query),)).fetchone()[0]
+            print(f"{query:<14} {matches:>8,} {best_of(like_scan, query, repeat=3):>7.1f} ms "
+                  f"{best_of(lambda q: search_cards(conn, q, limit=500), query):>10.1f} ms")
+        conn.close()
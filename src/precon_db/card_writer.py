@@ -0,0 +1,233 @@
+import sqlite3
+import time
+from typing import Iterable, List, Tuple
+
+from src.precon_db.card_rows import card_row, card_type_rows, printing_row
+from src.precon_db.change_tracking import bump_table_versions
+
+
+class RowBatch:
+    """Table rows of Scryfall cards, transformed but not yet written.
+
+    Ingest workers fill one batch per chunk of search results, off the
+    writer thread; CardWriter.add_batch stages it for writing.
+    """
+
+    def __init__(self):
+        self.cards: List[Tuple[str, int, str, str, str]] = []
+        self.card_printings: List[Tuple[str, str, str]] = []
+        self.card_types: List[Tuple[str, str]] = []
+        self.tags: List[Tuple[str]] = []
+        self.card_tags: List[Tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.cards) + len(self.card_printings) + len(self.card_types) + len(self.tags) + len(self.card_tags)
+
+    def add_card(self, card: dict) -> str: # type: ignore
+        """Stage a Scryfall card object and its types. Returns the card name."""
+        row = card_row(card)
+        self.cards.append(row)
+        printing = printing_row(card)
+        if printing is not None:
+            self.card_printings.append(printing)
+        self.card_types.extend(card_type_rows(row[0], row[2]))
+        return row[0]
+
+    def add_card_tag(self, card: dict, tag_name: str) -> None: # type: ignore
+        card_name = self.add_card(card)
+        self.tags.append((tag_name,))
+        self.card_tags.append((card_name, tag_name))
+
+
+def forget_set_links(conn: sqlite3.Connection, set_codes: Iterable[str]) -> None:
+    """Delete the card_types and card_tags rows of every card printed in `set_codes`.
+
+    Link rows are only ever inserted, so a type or tag a card lost upstream
+    would survive a refetch; refetching the sets writes the current ones
+    back. The caller owns the transaction.
+    """
+    set_codes = sorted(set(set_codes))
+    if not set_codes:
+        return
+    cards = f"SELECT card_name FROM card_printings WHERE set_code IN ({', '.join('?' for _ in set_codes)})"
+    for table in ("card_types", "card_tags"):
+        conn.execute(f"DELETE FROM {table} WHERE card_name IN ({cards})", set_codes)
+    bump_table_versions(conn, ["card_types", "card_tags"])
+
+
+class CardWriter(RowBatch):
+    """Stages rows in memory and writes them with executemany.
+
+    Cards, tags and deck membership are buffered and flushed every
+    `flush_every` staged rows (and on `flush()`), one transaction per flush.
+    Deck rows go through a temp staging table so membership is resolved
+    against `cards` with a single INSERT ... SELECT instead of one lookup per
+    decklist line; decklists already resolved against `cards` (see
+    add_deck_cards) skip the staging table.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, flush_every: int = 10000):
+        super().__init__()
+        self.conn = conn
+        self.flush_every = flush_every
+        self.deck_cards: List[Tuple[str, str, int, str]] = []
+        self.resolved_deck_cards: List[Tuple[str, str, int, str]] = []
+        self.rows_written = 0
+        conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS staged_deck_cards (
+            card_name TEXT NOT NULL,
+            deck_name TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            section TEXT NOT NULL
+        )
+        """)
+
+    @property
+    def pending(self) -> int:
+        return len(self) + len(self.deck_cards) + len(self.resolved_deck_cards)
+
+    def _maybe_flush(self) -> None:
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def add_card(self, card: dict) -> str: # type: ignore
+        card_name = super().add_card(card)
+        self._maybe_flush()
+        return card_name
+
+    def add_card_tag(self, card: dict, tag_name: str) -> None: # type: ignore
+        super().add_card_tag(card, tag_name)
+        self._maybe_flush()
+
+    def add_batch(self, batch: RowBatch) -> None:
+        """Stage rows transformed elsewhere, e.g. on an ingest worker thread."""
+        self.cards.extend(batch.cards)
+        self.card_printings.extend(batch.card_printings)
+        self.card_types.extend(batch.card_types)
+        self.tags.extend(batch.tags)
+        self.card_tags.extend(batch.card_tags)
+        self._maybe_flush()
+
+    def add_deck_card(self, deck_name: str, card_name: str, quantity: int = 1, section: str = "main") -> None:
+        self.deck_cards.append((card_name, deck_name, quantity, section))
+        self._maybe_flush()
+
+    def add_deck_cards(self, deck_name: str, cards: Iterable[Tuple[str, int, str]]) -> None:
+        """Stage a whole decklist of (card_name, quantity, section) rows whose
+        card names are known to be in `cards`, as returned by resolve_decklist."""
+        self.resolved_deck_cards.extend((card_name, deck_name, quantity, section) for card_name, quantity, section in cards)
+        self._maybe_flush()
+
+    def flush(self) -> None:
+        cursor = self.conn.cursor()
+        written_tables = []
+        for table, statement, rows in (
+            # A refetched card takes the latest values; rows that did not change are not rewritten
+            ("cards", "INSERT INTO cards (name, cmc, type, image_url, oracle_text) VALUES (?, ?, ?, ?, ?) "
+                      "ON CONFLICT (name) DO UPDATE SET cmc = excluded.cmc, type = excluded.type, "
+                      "image_url = excluded.image_url, oracle_text = excluded.oracle_text "
+                      "WHERE (cmc, type, image_url, oracle_text) IS NOT "
+                      "(excluded.cmc, excluded.type, excluded.image_url, excluded.oracle_text)",
+             self.cards),
+            ("card_printings", "INSERT OR REPLACE INTO card_printings (set_code, collector_number, card_name) VALUES (?, ?, ?)",
+             self.card_printings),
+            ("card_types", "INSERT OR IGNORE INTO card_types (card_name, type_name) VALUES (?, ?)", self.card_types),
+            ("tags", "INSERT OR IGNORE INTO tags (name) VALUES (?)", self.tags),
+            ("card_tags", "INSERT OR IGNORE INTO card_tags (card_name, tag_name) VALUES (?, ?)", self.card_tags),
+        ):
+            if rows:
+                cursor.executemany(statement, rows)
+                written_tables.append(table)
+
+        if self.deck_cards:
+            cursor.executemany("INSERT INTO staged_deck_cards (card_name, deck_name, quantity, section) VALUES (?, ?, ?, ?)",
+                               self.deck_cards)
+            # Só relaciona cards que existem na tabela de cards
+            cursor.execute("""
+            INSERT OR IGNORE INTO decks (name)
+            SELECT DISTINCT s.deck_name FROM staged_deck_cards s JOIN cards c ON c.name = s.card_name
+            """)
+            cursor.execute("""
+            INSERT OR IGNORE INTO deck_cards (card_name, deck_name, quantity, section)
+            SELECT s.card_name, s.deck_name, s.quantity, s.section
+            FROM staged_deck_cards s JOIN cards c ON c.name = s.card_name
+            """)
+            cursor.execute("DELETE FROM staged_deck_cards")
+            written_tables += ["decks", "deck_cards"]
+
+        if self.resolved_deck_cards:
+            cursor.executemany("INSERT OR IGNORE INTO decks (name) VALUES (?)",
+                               [(deck_name,) for deck_name in {row[1] for row in self.resolved_deck_cards}])
+            cursor.executemany("INSERT OR IGNORE INTO deck_cards (card_name, deck_name, quantity, section) VALUES (?, ?, ?, ?)",
+                               self.resolved_deck_cards)
+            written_tables += ["decks", "deck_cards"]
+
+        if written_tables:
+            bump_table_versions(self.conn, written_tables)
+        self.conn.commit()
+        self.rows_written += self.pending
+        for buffer in (self.cards, self.card_printings, self.card_types, self.tags, self.card_tags, self.deck_cards,
+                       self.resolved_deck_cards):
+            buffer.clear()
+
+
+def _synthetic_cards(n: int): # type: ignore
+    for i in range(n):
+        yield {
+            "name": f"Card {i}",
+            "cmc": i % 8,
+            "type_line": "Legendary Artifact Creature — Golem" if i % 3 else "Instant",
+            "image_uris": {"normal": f"https://example.com/{i}.jpg"},
+        }
+
+
+if __name__ == "__main__":
+    # Benchmark: row-at-a-time inserts vs CardWriter on a synthetic 100k-card dataset
+    import tempfile
+    from pathlib import Path
+
+    from src.precon_db.init_db import connect
+    from src.precon_db.migrations import migrate
+
+    n_cards = 100_000
+    tags = ["ramp", "draw", "removal-creature"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before: default PRAGMAs, one execute per row, membership checked per line
+        conn = sqlite3.connect(str(Path(tmp) / "before.db"))
+        migrate(conn)
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        rows = 0
+        for i, card in enumerate(_synthetic_cards(n_cards)):
+            name, cmc, type_, image_url, _ = card_row(card)
+            cursor.execute("INSERT OR IGNORE INTO cards (name, cmc, type, image_url) VALUES (?, ?, ?, ?)", (name, cmc, type_, image_url))
+            for type_row in card_type_rows(name, type_):
+                cursor.execute("INSERT OR IGNORE INTO card_types (card_name, type_name) VALUES (?, ?)", type_row)
+            tag = tags[i % len(tags)]
+            cursor.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag,))
+            cursor.execute("INSERT OR IGNORE INTO card_tags (card_name, tag_name) VALUES (?, ?)", (name, tag))
+            cursor.execute("SELECT 1 FROM cards WHERE name = ?", (name,))
+            if cursor.fetchone():
+                cursor.execute("INSERT OR IGNORE INTO decks (name) VALUES (?)", (f"deck_{i % 100}",))
+                cursor.execute("INSERT OR IGNORE INTO deck_cards (card_name, deck_name) VALUES (?, ?)", (name, f"deck_{i % 100}"))
+            rows += 4 + len(card_type_rows(name, type_))
+        conn.commit()
+        before = rows / (time.perf_counter() - start)
+        conn.close()
+
+        # After: loader PRAGMAs and batched executemany
+        conn = connect(Path(tmp) / "after.db")
+        migrate(conn)
+        writer = CardWriter(conn)
+        start = time.perf_counter()
+        for i, card in enumerate(_synthetic_cards(n_cards)):
+            writer.add_card_tag(card, tags[i % len(tags)])
+        for i in range(n_cards):
+            writer.add_deck_card(f"deck_{i % 100}", f"Card {i}")
+        writer.flush()
+        after = writer.rows_written / (time.perf_counter() - start)
+        conn.close()
+
+    print(f"before: {before:,.0f} rows/s")
+    print(f"after:  {after:,.0f} rows/s ({after / before:.1f}x)")
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+def set_fingerprint(set_data: Optional[dict], tags: List[str]) -> Optional[str]: # type: ignore
+    """Hash of the Scryfall set metadata plus the tag list used to query it.
+
+    Scryfall set objects carry no updated_at, so the card count and release
+    date stand in for it: new spoilers bump `card_count`. Including the tag
+    list means editing tag_list.txt also marks every set as changed.
+    """
+    if not set_data:
+        return None
+    payload = {
+        "code": set_data.get("code"),
+        "card_count": set_data.get("card_count"),
+        "released_at": set_data.get("released_at"),
+        "tags": sorted(tags),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def deck_fingerprint(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def get_set_fingerprints(conn: sqlite3.Connection) -> Dict[str, str]:
+    return dict(conn.execute("SELECT set_code, fingerprint FROM set_fingerprints").fetchall())
+
+
+def get_deck_fingerprints(conn: sqlite3.Connection) -> Dict[str, str]:
+    return dict(conn.execute("SELECT deck_name, fingerprint FROM deck_fingerprints").fetchall())
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def record_set_fingerprint(conn: sqlite3.Connection, set_code: str, fingerprint: str) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO set_fingerprints (set_code, fingerprint, ingested_at) VALUES (?, ?, ?)",
+        (set_code, fingerprint, _now())
+    )
+
+
+def record_deck_fingerprint(conn: sqlite3.Connection, deck_name: str, fingerprint: str) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO deck_fingerprints (deck_name, fingerprint, ingested_at) VALUES (?, ?, ?)",
+        (deck_name, fingerprint, _now())
+    )
+
+
+def bump_table_versions(conn: sqlite3.Connection, tables: Iterable[str]) -> None:
+    """Advance the ingest generation of `tables`.
+
+    Call this inside the transaction that modifies the tables; running
+    dashboards compare these counters to decide which cached datasets are
+    stale.
+    """
+    conn.executemany(
+        "INSERT INTO table_versions (table_name, version) VALUES (?, 1) "
+        "ON CONFLICT(table_name) DO UPDATE SET version = version + 1",
+        [(table,) for table in sorted(set(tables))]
+    )
+
+
+@dataclass
+class ChangeReport:
+    sets_added: List[str] = field(default_factory=list)
+    sets_changed: List[str] = field(default_factory=list)
+    sets_unchanged: List[str] = field(default_factory=list)
+    # Fetched with a failed search: their fingerprint is not recorded, so the next run retries them
+    sets_incomplete: List[str] = field(default_factory=list)
+    decks_added: List[str] = field(default_factory=list)
+    decks_changed: List[str] = field(default_factory=list)
+    decks_unchanged: List[str] = field(default_factory=list)
+    decks_removed: List[str] = field(default_factory=list)
+
+    @property
+    def sets_to_fetch(self) -> List[str]:
+        return self.sets_added + self.sets_changed
+
+    def print(self) -> None:
+        print("Resumo da ingestão:")
+        for label, items in (
+            ("Sets added", self.sets_added),
+            ("Sets changed", self.sets_changed),
+            ("Sets unchanged", self.sets_unchanged),
+            ("Sets incomplete", self.sets_incomplete),
+            ("Decks added", self.decks_added),
+            ("Decks changed", self.decks_changed),
+            ("Decks unchanged", self.decks_unchanged),
+            ("Decks removed", self.decks_removed),
+        ):
+            if items:
+                print(f"  {label} ({len(items)}): {', '.join(sorted(items))}")
@@ -0,0 +1,52 @@
+"""Checks that an ingested database carries the card data the app relies on.
+
+Local `set:` and `o:` evaluation and the full-text search read
+card_printings and cards.oracle_text. A database whose sets were last
+fetched before those were ingested (migrations 5 and 6) loads fine but
+silently matches nothing, so the image build runs this after its ingest.
+It also checks the file is in WAL mode, which the dashboard's connection
+pool relies on so readers never block behind an ingest.
+
+Usage: python src/precon_db/data_checks.py [DB_PATH]
+"""
+import sqlite3
+import sys
+from pathlib import Path
+from typing import List
+
+from src.precon_db.init_db import DB_PATH
+
+
+def check_card_data(conn: sqlite3.Connection) -> List[str]:
+    """Problems with the card data, empty when every card was fully ingested."""
+    n_cards = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+    if not n_cards:
+        return ["cards is empty"]
+    problems = []
+    # Ingested cards get "" when they have no rules text; NULL means never refetched
+    no_oracle_text = conn.execute("SELECT COUNT(*) FROM cards WHERE oracle_text IS NULL").fetchone()[0]
+    if no_oracle_text:
+        problems.append(f"{no_oracle_text} of {n_cards} cards have no oracle_text")
+    if not conn.execute("SELECT EXISTS (SELECT 1 FROM card_printings)").fetchone()[0]:
+        problems.append("card_printings is empty")
+    return problems
+
+
+def check_journal_mode(conn: sqlite3.Connection) -> List[str]:
+    """Empty when the database is in WAL mode (kept in the file once a loader connection set it)."""
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    return [] if journal_mode == "wal" else [f"journal_mode is {journal_mode}, not wal"]
+
+
+if __name__ == "__main__":
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DB_PATH
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    problems = check_card_data(conn) + check_journal_mode(conn)
+    conn.close()
+
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        print("Rode populate_db.py para buscar de novo os sets desatualizados e ativar o WAL")
+        sys.exit(1)
+    print("Dados dos cards completos ✅")
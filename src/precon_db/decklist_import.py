@@ -0,0 +1,141 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.precon_db.decklist_parser import DecklistEntry, parse_decklist
+
+# Below this many files, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+
+class CardResolver:
+    """In-memory lookup of decklist entries to card names.
+
+    Entries with a set code and collector number resolve through the
+    card_printings table, which also picks the right card for double-faced
+    and split cards listed by one face. The rest fall back to an exact name
+    match, then to the front face of a double-faced card.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.printings: Dict[Tuple[str, str], str] = {
+            (set_code, collector_number): card_name
+            for set_code, collector_number, card_name in conn.execute(
+                "SELECT set_code, collector_number, card_name FROM card_printings"
+            )
+        }
+        self.names: Dict[str, str] = {}
+        for name, in conn.execute("SELECT name FROM cards"):
+            self.names[name] = name
+            self.names.setdefault(name.split(" // ")[0], name)
+
+    def resolve(self, entry: DecklistEntry) -> Optional[str]:
+        if entry.set_code and entry.collector_number:
+            card_name = self.printings.get((entry.set_code, entry.collector_number))
+            if card_name is not None:
+                return card_name
+        return self.names.get(entry.name)
+
+
+def resolve_decklist(resolver: CardResolver,
+                     entries: List[DecklistEntry]) -> Tuple[List[Tuple[str, int, str]], List[str]]:
+    """Resolve parsed entries to (card_name, quantity, section) rows plus the unresolved names.
+
+    A card listed on several lines of the same section adds up its
+    quantities; a card in the main deck and in the sideboard gets one row
+    per section.
+    """
+    rows: Dict[Tuple[str, str], List] = {}
+    unresolved = []
+    for entry in entries:
+        card_name = resolver.resolve(entry)
+        if card_name is None:
+            unresolved.append(entry.name)
+        elif (card_name, entry.section) in rows:
+            rows[card_name, entry.section][1] += entry.quantity
+        else:
+            rows[card_name, entry.section] = [card_name, entry.quantity, entry.section]
+    return [tuple(row) for row in rows.values()], unresolved
+
+
+def parse_decklist_file(path: Path) -> Tuple[Path, List[DecklistEntry]]:
+    return path, parse_decklist(Path(path).read_text(encoding="utf-8"))
+
+
+def parse_decklist_files(paths: Sequence[Path],
+                         max_workers: Optional[int] = None) -> Iterator[Tuple[Path, List[DecklistEntry]]]:
+    """Parse decklist files across a process pool, yielding (path, entries) in input order.
+
+    Small batches are parsed in this process.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(paths) < PARALLEL_MIN_FILES:
+        yield from map(parse_decklist_file, paths)
+        return
+    # A few chunks per worker keeps them busy without pickling every file separately
+    chunksize = max(1, len(paths) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(parse_decklist_file, paths, chunksize=chunksize)
+
+
+if __name__ == "__main__":
+    # Benchmark: old line splitting + SQL-side membership vs. parser + resolver,
+    # sequential and across the process pool, on thousands of synthetic decklists
+    import random
+    import sys
+    import tempfile
+    import time
+
+    from src.precon_db.card_writer import CardWriter
+    from src.precon_db.init_db import connect
+    from src.precon_db.migrations import migrate
+
+    n_decks = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    n_cards = 20_000
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        decklists = Path(tmp) / "decklists"
+        decklists.mkdir()
+        for i in range(n_decks):
+            lines = [f"{rng.choice((1, 1, 1, 2, 10))}x Card {c} (syn) {c}" for c in rng.sample(range(n_cards), 100)]
+            (decklists / f"deck_{i}.txt").write_text("\n".join(lines) + "\n")
+        paths = sorted(decklists.glob("*.txt"))
+
+        def load(label, parse, max_workers=1):
+            conn = connect(Path(tmp) / f"{label}.db")
+            migrate(conn)
+            conn.executemany("INSERT INTO cards (name, cmc, type, image_url) VALUES (?, 0, '', '')",
+                             [(f"Card {c}",) for c in range(n_cards)])
+            conn.executemany("INSERT INTO card_printings VALUES ('syn', ?, ?)",
+                             [(str(c), f"Card {c}") for c in range(n_cards)])
+            conn.commit()
+            writer = CardWriter(conn)
+            start = time.perf_counter()
+            parse(writer, conn, max_workers)
+            writer.flush()
+            elapsed = time.perf_counter() - start
+            rows = conn.execute("SELECT COUNT(*), SUM(quantity) FROM deck_cards").fetchone()
+            conn.close()
+            print(f"{label:<22} {elapsed * 1000:7.0f} ms   {rows[0]:,} rows, {rows[1]:,} cards")
+
+        def split_lines(writer, conn, max_workers):
+            for path in paths:
+                with open(path) as f:
+                    for line in f:
+                        card_name = line.split("x ")[-1].split(" (")[0].strip()
+                        if card_name:
+                            writer.add_deck_card(path.stem, card_name)
+
+        def parser(writer, conn, max_workers):
+            resolver = CardResolver(conn)
+            for path, entries in parse_decklist_files(paths, max_workers=max_workers):
+                writer.add_deck_cards(path.stem, resolve_decklist(resolver, entries)[0])
+
+        workers = max(2, os.cpu_count() or 1)
+        print(f"{n_decks:,} decklists, {os.cpu_count()} CPUs")
+        load("split lines", split_lines)
+        load("parser, 1 process", parser)
+        load(f"parser, {workers} processes", parser, max_workers=workers)
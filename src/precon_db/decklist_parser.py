@@ -0,0 +1,63 @@
+import re
+from typing import List, NamedTuple, Optional
+
+# Section headers as written by Arena, MTGO, Moxfield and Archidekt exports
+SECTIONS = {
+    "commander": "commander",
+    "commanders": "commander",
+    "companion": "companion",
+    "deck": "main",
+    "main": "main",
+    "mainboard": "main",
+    "sideboard": "sideboard",
+    "maybeboard": "maybeboard",
+}
+
+_SECTION_RE = re.compile(r"^(?://\s*)?([A-Za-z]+)\s*:?$")
+# "1x Name (SET) 123 *CMDR*": quantity, set, collector number and markers are optional
+_LINE_RE = re.compile(r"""
+    ^(?:(?P<quantity>\d+)\s*[xX]?\s+)?
+    (?P<name>.+?)
+    (?:\s+\((?P<set_code>[A-Za-z0-9]+)\)(?:\s+(?P<collector_number>[^\s*]+))?)?
+    (?P<markers>(?:\s+\*[A-Za-z]+\*)*)$
+""", re.VERBOSE)
+
+
+class DecklistEntry(NamedTuple):
+    quantity: int
+    name: str
+    set_code: Optional[str] = None
+    collector_number: Optional[str] = None
+    section: str = "main"
+
+
+def parse_decklist_line(line: str, section: str = "main") -> Optional[DecklistEntry]:
+    """Parse one card line; None for blank lines and comments."""
+    line = line.strip()
+    if not line or line.startswith(("#", "//")):
+        return None
+    match = _LINE_RE.match(line)
+    if match is None:
+        return None
+    quantity, name, set_code, collector_number, markers = match.groups()
+    if markers and "*CMDR*" in markers.upper():
+        section = "commander"
+    return DecklistEntry(int(quantity) if quantity else 1, name.strip(), set_code.lower() if set_code else None,
+                         collector_number, section)
+
+
+def parse_decklist(text: str) -> List[DecklistEntry]:
+    """Parse a plain-text decklist, keeping track of the section each line is in."""
+    entries = []
+    section = "main"
+    for line in text.splitlines():
+        # Card lines almost always start with their quantity; only other lines can be headers
+        if not line[:1].isdigit():
+            header = _SECTION_RE.match(line.strip())
+            if header and header[1].lower() in SECTIONS:
+                section = SECTIONS[header[1].lower()]
+                continue
+        entry = parse_decklist_line(line, section)
+        if entry is not None:
+            entries.append(entry)
+    return entries
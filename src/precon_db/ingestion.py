@@ -0,0 +1,227 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from src.external.scryfall_api import ScryfallAPI
+from src.precon_db.card_writer import CardWriter, RowBatch
+
+
+@dataclass(frozen=True)
+class SearchJob:
+    mtg_set: str
+    # None for a plain card search; otherwise every result gets this tag
+    tag: Optional[str]
+    query: str
+    fresh: bool = False
+
+
+@dataclass
+class IngestionStats:
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    # Jobs whose search raised, e.g. Scryfall still unavailable after every retry
+    failed_jobs: List[SearchJob] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Completed jobs per second since the run started."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"[{self.completed}/{self.total}] failed={self.failed} "
+                f"{self.throughput:.1f} queries/s in {self.elapsed:.1f}s")
+
+
+@dataclass
+class StageTimings:
+    """Seconds spent in each pipeline stage; worker stages are summed over workers."""
+
+    # Workers: waiting on Scryfall (rate limit, network and JSON decoding)
+    fetch: float = 0.0
+    # Workers: turning card objects into table rows
+    transform: float = 0.0
+    # Workers: blocked on a full queue, i.e. waiting for the writer
+    backpressure: float = 0.0
+    # Writer: staging rows and committing transactions
+    write: float = 0.0
+    # Writer: waiting on an empty queue, i.e. waiting for the workers
+    writer_idle: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"fetch {self.fetch:.1f}s, transform {self.transform:.1f}s, backpressure {self.backpressure:.1f}s "
+                f"| write {self.write:.1f}s, writer idle {self.writer_idle:.1f}s")
+
+
+# Queue item marking the end of a job
+_DONE = None
+
+
+class IngestionPipeline:
+    """Fetch and transform search results on worker threads, write them on one.
+
+    `jobs` workers run searches concurrently, all sharing the API's token
+    bucket, so adding workers overlaps network latency without exceeding
+    Scryfall's request rate. Each worker turns every `batch_size` cards into
+    table rows and puts them on a bounded queue. The calling thread is the
+    only writer: it drains the queue into a CardWriter on its own
+    connection, one transaction per `flush_every` rows. When the writer
+    falls behind, the full queue stalls the workers instead of piling up
+    cards in memory.
+    """
+
+    def __init__(self, scryfall_api: Optional[ScryfallAPI] = None, jobs: int = 4, batch_size: int = 175,
+                 queue_size: Optional[int] = None, flush_every: int = 10000,
+                 on_job_done: Optional[Callable[[SearchJob, int, IngestionStats], None]] = None):
+        self.scryfall_api = scryfall_api or ScryfallAPI()
+        self.jobs = jobs
+        self.batch_size = batch_size
+        self.flush_every = flush_every
+        self.on_job_done = on_job_done
+        # A few batches per worker keeps the writer busy without buffering whole sets
+        self._queue: "queue.Queue[Tuple[SearchJob, Optional[RowBatch]]]" = queue.Queue(queue_size or 4 * jobs)
+        self._timings_lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self.stats = IngestionStats()
+        self.timings = StageTimings()
+
+    def _put(self, item: Tuple[SearchJob, Optional[RowBatch]]) -> float:
+        start = time.perf_counter()
+        self._queue.put(item)
+        return time.perf_counter() - start
+
+    def _run_job(self, job: SearchJob) -> None:
+        fetch = transform = backpressure = 0.0
+        batch = RowBatch()
+        try:
+            # Jobs still queued when the writer failed end here, without a request
+            if self._cancelled.is_set():
+                return
+            cards = self.scryfall_api.iter_search(job.query, fresh=job.fresh) # type: ignore
+            while True:
+                start = time.perf_counter()
+                card = next(cards, None)
+                fetched = time.perf_counter()
+                fetch += fetched - start
+                if card is None or self._cancelled.is_set():
+                    break
+                if job.tag is None:
+                    batch.add_card(card)
+                else:
+                    batch.add_card_tag(card, job.tag)
+                transform += time.perf_counter() - fetched
+                if len(batch.cards) >= self.batch_size:
+                    backpressure += self._put((job, batch))
+                    batch = RowBatch()
+            if batch.cards:
+                backpressure += self._put((job, batch))
+        except Exception as e:
+            print(f"Query failed for {job.query}: {e}")
+            with self._timings_lock:
+                self.stats.failed += 1
+                self.stats.failed_jobs.append(job)
+        finally:
+            backpressure += self._put((job, _DONE))
+            with self._timings_lock:
+                self.timings.fetch += fetch
+                self.timings.transform += transform
+                self.timings.backpressure += backpressure
+
+    def run(self, conn: sqlite3.Connection, jobs: Iterable[SearchJob]) -> IngestionStats:
+        """Run every job and write its cards through `conn`. Returns the run's stats."""
+        jobs = list(jobs)
+        self.stats = IngestionStats(total=len(jobs))
+        self.timings = StageTimings()
+        self._cancelled.clear()
+        writer = CardWriter(conn, flush_every=self.flush_every)
+        cards_per_job = {job: 0 for job in jobs}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for job in jobs:
+                executor.submit(self._run_job, job)
+            remaining = len(jobs)
+            try:
+                while remaining:
+                    start = time.perf_counter()
+                    job, batch = self._queue.get()
+                    got = time.perf_counter()
+                    self.timings.writer_idle += got - start
+                    if batch is _DONE:
+                        remaining -= 1
+                        self.stats.completed += 1
+                        if self.on_job_done:
+                            self.on_job_done(job, cards_per_job[job], self.stats)
+                        continue
+                    cards_per_job[job] += len(batch.cards)
+                    writer.add_batch(batch)
+                    self.timings.write += time.perf_counter() - got
+            except BaseException:
+                # Stop the workers and unblock any waiting on the full queue, so the pool can shut down
+                self._cancelled.set()
+                while remaining:
+                    if self._queue.get()[1] is _DONE:
+                        remaining -= 1
+                raise
+
+        start = time.perf_counter()
+        writer.flush()
+        self.timings.write += time.perf_counter() - start
+        return self.stats
+
+
+if __name__ == "__main__":
+    # Benchmark: a dozen sets against a simulated Scryfall (fixed latency per
+    # page, real 10 requests/s token bucket), with 1, 4 and 8 workers
+    import sys
+    import tempfile
+    from pathlib import Path
+
+    from src.precon_db.init_db import connect
+    from src.precon_db.migrations import migrate
+
+    class _SimulatedScryfall(ScryfallAPI):
+        latency = 0.25
+        pages_per_search = 2
+
+        def _page(self, query: str, page: int): # type: ignore
+            time.sleep(self.latency)
+            self._count("request_count")
+            data = [{"name": f"{query} #{page * 175 + i}", "cmc": i % 8, "type_line": "Artifact Creature — Golem",
+                     "set": query.split()[0][4:], "collector_number": str(page * 175 + i)} for i in range(175)]
+            has_more = page + 1 < self.pages_per_search
+            return {"data": data, "has_more": has_more, "next_page": f"{query}|{page + 1}" if has_more else None}
+
+        def scryfall_oracle_search(self, query, fresh: bool = False): # type: ignore
+            self.rate_limiter.acquire()
+            return self._page(query, 0)
+
+        def process_next_page(self, next_page_url, fresh: bool = False): # type: ignore
+            self.rate_limiter.acquire()
+            query, page = next_page_url.rsplit("|", 1)
+            return self._page(query, int(page))
+
+    sets = [f"s{i:02d}" for i in range(12)]
+    search_jobs = [SearchJob(mtg_set=s, tag=None, query=f"set:{s}") for s in sets]
+    search_jobs += [SearchJob(mtg_set=s, tag=t, query=f"set:{s} otag:{t}") for s in sets for t in ("ramp", "draw")]
+    worker_counts = [int(arg) for arg in sys.argv[1:]] or [1, 4, 8]
+
+    print(f"{len(search_jobs)} searches x {_SimulatedScryfall.pages_per_search} pages, "
+          f"{_SimulatedScryfall.latency * 1000:.0f} ms per page")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts:
+            conn = connect(Path(tmp) / f"jobs{workers}.db")
+            migrate(conn)
+            pipeline = IngestionPipeline(_SimulatedScryfall(use_cache=False), jobs=workers)
+            stats = pipeline.run(conn, search_jobs)
+            rows = conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+            conn.close()
+            print(f"--jobs {workers}: {stats.elapsed:5.1f}s, {rows:,} cards | {pipeline.timings}")
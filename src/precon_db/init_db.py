@@ -1,58 +1,40 @@
 import sqlite3
 from pathlib import Path
 
+from src.precon_db.migrations import migrate
+
 # Get project root directory (2 levels up from this file)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DB_PATH = PROJECT_ROOT / "precon.db"
 
-# Cria (ou abre) o arquivo do banco
-conn = sqlite3.connect(str(DB_PATH))
-cursor = conn.cursor()
-
-# Cria as tabelas
-cursor.executescript("""
-CREATE TABLE IF NOT EXISTS cards (
-    name TEXT PRIMARY KEY,
-    image_url TEXT,
-    cmc  INTEGER,
-    type TEXT
-);
-
-CREATE TABLE IF NOT EXISTS decks (
-    name TEXT PRIMARY KEY
-);
-
-CREATE TABLE IF NOT EXISTS tags (
-    name TEXT PRIMARY KEY
-);
-
-CREATE TABLE IF NOT EXISTS deck_cards (
-    card_name TEXT NOT NULL,
-    deck_name TEXT NOT NULL,
-    PRIMARY KEY (card_name, deck_name),
-    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE,
-    FOREIGN KEY (deck_name) REFERENCES decks(name) ON DELETE CASCADE
-);
-
-CREATE TABLE IF NOT EXISTS card_tags (
-    card_name TEXT NOT NULL,
-    tag_name TEXT NOT NULL,
-    PRIMARY KEY (card_name, tag_name),
-    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE,
-    FOREIGN KEY (tag_name) REFERENCES tags(name) ON DELETE CASCADE
-);
-                     
-CREATE TABLE IF NOT EXISTS card_types (
-    card_name TEXT NOT NULL,
-    type_name TEXT NOT NULL,
-    PRIMARY KEY (card_name, type_name),
-    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE
-);
-
-""")
-
-conn.commit()
-print("Banco criado com sucesso ✅")
+# PRAGMAs usados durante a carga: WAL permite leituras do dashboard durante a
+# escrita e synchronous=NORMAL evita um fsync por transação
+LOADER_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def connect(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    """Open the database with the loader-time PRAGMAs applied."""
+    conn = sqlite3.connect(str(db_path))
+    for pragma in LOADER_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def init_db(db_path: Path = DB_PATH, verbose: bool = False) -> int:
+    # Cria (ou abre) o arquivo do banco
+    conn = connect(db_path)
+
+    # Cria as tabelas e aplica as migrações pendentes
+    version = migrate(conn, verbose=verbose)
+
+    conn.close()
+    return version
+
 
 # # Exemplo de inserções
 # cursor.execute("INSERT OR IGNORE INTO cards (name) VALUES (?)", ("Fireball",))
@@ -76,4 +58,7 @@ print("Banco criado com sucesso ✅")
 # for row in cursor.execute("SELECT * FROM deck_cards"):
 #     print(row)
 
-conn.close()
+
+if __name__ == "__main__":
+    version = init_db(verbose=True)
+    print(f"Banco criado com sucesso ✅ (schema v{version})")
@@ -0,0 +1,187 @@
+import operator
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# One search term: optional negation, a keyword, an operator and a value
+_TERM_RE = re.compile(r'(-?)([a-z]+)(>=|<=|!=|:|=|>|<)("[^"]*"|/(?:[^/\\]|\\.)*/|\S+)', re.IGNORECASE)
+
+_SET_KEYWORDS = {"set", "s", "e", "edition"}
+_ORACLE_KEYWORDS = {"o", "oracle"}
+_TYPE_KEYWORDS = {"t", "type"}
+_CMC_KEYWORDS = {"cmc", "mv", "manavalue"}
+_CMC_OPERATORS: Dict[str, Callable] = {
+    ":": operator.eq, "=": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+}
+
+
+class UnsupportedQuery(ValueError):
+    """The query uses Scryfall syntax the local evaluator does not implement (e.g. otag:)."""
+
+
+def _text_pattern(value: str) -> "re.Pattern[str]":
+    """Compiled o:/t: value: /regex/ as is, anything else as a case-insensitive substring."""
+    if len(value) > 1 and value.startswith("/") and value.endswith("/"):
+        return re.compile(value[1:-1], re.IGNORECASE)
+    # Matched against lowercased text, so a literal needs no IGNORECASE
+    return re.compile(re.escape(value.strip('"').lower()))
+
+
+class TextColumn:
+    """One text per card, lowercased and joined into a single newline-separated buffer.
+
+    A pattern is then one C-level scan over every card at once instead of a
+    Python-level search per card; match positions map back to card ids
+    through the start offsets.
+    """
+
+    def __init__(self, texts: List[str]):
+        lowered = [text.lower() for text in texts]
+        self.buffer = "\n".join(lowered)
+        self.starts = np.zeros(len(lowered), dtype=np.int64)
+        if lowered:
+            np.cumsum([len(text) + 1 for text in lowered[:-1]], out=self.starts[1:])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def matching(self, pattern: "re.Pattern[str]") -> np.ndarray:
+        """Mask of the texts containing a match of `pattern`."""
+        positions = np.fromiter((match.start() for match in pattern.finditer(self.buffer)), dtype=np.int64)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[np.searchsorted(self.starts, positions, side="right") - 1] = True
+        return mask
+
+
+@dataclass
+class LocalCardPool:
+    """The cards table held as aligned arrays, searched with a subset of Scryfall syntax.
+
+    Supported terms are set:, o:, t: and cmc comparisons, each optionally
+    negated with `-`, combined with an implicit AND, which is all the tag
+    list needs. o: and t: match case-insensitive substrings (or /regex/) of
+    the oracle text and type line. set: matches the printings recorded in
+    card_printings, so a card reprinted in a set belongs to it.
+    """
+
+    names: np.ndarray
+    oracle_texts: TextColumn
+    type_lines: TextColumn
+    cmc: np.ndarray
+    set_members: Dict[str, np.ndarray]
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "LocalCardPool":
+        rows = conn.execute("SELECT name, COALESCE(oracle_text, ''), COALESCE(type, ''), cmc FROM cards "
+                            "ORDER BY name").fetchall()
+        names = np.array([row[0] for row in rows], dtype=object)
+        set_members: Dict[str, List[int]] = {}
+        for set_code, card_name in conn.execute("SELECT DISTINCT set_code, card_name FROM card_printings"):
+            set_members.setdefault(set_code, []).append(card_name)
+        return cls(
+            names=names,
+            oracle_texts=TextColumn([row[1] for row in rows]),
+            type_lines=TextColumn([row[2] for row in rows]),
+            cmc=np.array([row[3] or 0 for row in rows], dtype=float),
+            set_members={
+                set_code: np.isin(names, np.array(members, dtype=object))
+                for set_code, members in set_members.items()
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def in_set(self, set_code: str) -> np.ndarray:
+        return self.set_members.get(set_code.lower(), np.zeros(len(self), dtype=bool))
+
+    def _term_mask(self, keyword: str, op: str, value: str) -> np.ndarray:
+        if keyword in _SET_KEYWORDS and op == ":":
+            return self.in_set(value.strip('"'))
+        if keyword in _ORACLE_KEYWORDS and op == ":":
+            return self.oracle_texts.matching(_text_pattern(value))
+        if keyword in _TYPE_KEYWORDS and op == ":":
+            return self.type_lines.matching(_text_pattern(value))
+        if keyword in _CMC_KEYWORDS:
+            try:
+                return _CMC_OPERATORS[op](self.cmc, float(value))
+            except ValueError:
+                raise UnsupportedQuery(f"cmc needs a number, got {value!r}") from None
+        raise UnsupportedQuery(f"{keyword}{op} is not supported locally")
+
+    def mask(self, query: str) -> np.ndarray:
+        """Boolean mask over the pool of the cards matching `query`."""
+        result = np.ones(len(self), dtype=bool)
+        position = 0
+        query = query.strip()
+        while position < len(query):
+            match = _TERM_RE.match(query, position)
+            if match is None:
+                raise UnsupportedQuery(f"cannot parse {query[position:]!r}")
+            negated, keyword, op, value = match.groups()
+            term = self._term_mask(keyword.lower(), op, value)
+            result &= ~term if negated else term
+            position = match.end()
+            while position < len(query) and query[position].isspace():
+                position += 1
+        return result
+
+    def search(self, query: str) -> List[str]:
+        """Names of the cards matching `query`, in name order."""
+        return list(self.names[self.mask(query)])
+
+    def oracle_tags(self, patterns: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """Mask of the cards whose oracle text matches each tag's o: value, one buffer scan per tag."""
+        return {tag: self.oracle_texts.matching(_text_pattern(value)) for tag, value in patterns.items()}
+
+
+def oracle_tag_rows(pool: LocalCardPool, oracle_tags: Dict[str, str],
+                    mtg_sets: Iterable[str]) -> Tuple[List[Tuple[str]], List[Tuple[str, str]]]:
+    """(tags rows, card_tags rows) of every o: tag in every set, as `set:X o:"..."` would return."""
+    masks = pool.oracle_tags(oracle_tags)
+    in_sets = {mtg_set: pool.in_set(mtg_set) for mtg_set in mtg_sets}
+    card_tags = set()
+    for tag, mask in masks.items():
+        for in_set in in_sets.values():
+            card_tags.update((name, tag) for name in pool.names[mask & in_set])
+    return [(tag,) for tag in oracle_tags], sorted(card_tags)
+
+
+if __name__ == "__main__":
+    # Benchmark: a case-insensitive search per card vs. the joined buffer, over a synthetic card pool
+    import random
+    import sys
+    import time
+
+    n_cards = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rng = random.Random(0)
+    phrases = ["draw a card", "proliferate", "destroy target creature", "create a treasure token",
+               "counter target spell", "exile target artifact", "you gain 3 life", "scry 2", "flying"]
+    filler = "when this enters the battlefield target player mills two cards then shuffles".split()
+    texts = [" ".join(rng.choices(filler, k=20)) + (f" {rng.choice(phrases)}." if rng.random() < 0.3 else "")
+             for _ in range(n_cards)]
+    tags = {phrase: f'"{phrase}"' for phrase in phrases}
+
+    start = time.perf_counter()
+    per_card = {}
+    for tag in tags:
+        search = re.compile(re.escape(tag), re.IGNORECASE).search
+        per_card[tag] = np.array([search(text) is not None for text in texts])
+    per_card_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pool = LocalCardPool(names=np.array([f"Card {i}" for i in range(n_cards)], dtype=object),
+                         oracle_texts=TextColumn(texts), type_lines=TextColumn(["Creature"] * n_cards),
+                         cmc=np.zeros(n_cards), set_members={})
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    buffered = pool.oracle_tags(tags)
+    buffer_time = time.perf_counter() - start
+    assert all((per_card[tag] == buffered[tag]).all() for tag in tags)
+    print(f"{n_cards:,} cards, {len(tags)} o: tags")
+    print(f"search per card:   {per_card_time * 1000:6.0f} ms")
+    print(f"joined buffer:     {buffer_time * 1000:6.0f} ms (+ {build_time * 1000:.0f} ms to build it once)")
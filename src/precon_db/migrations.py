@@ -0,0 +1,345 @@
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+
+# Cada migração roda uma única vez, em ordem, e grava sua versão em
+# PRAGMA user_version. Nunca edite uma migração já publicada: adicione outra.
+# O passo pode ser um script SQL ou uma função que recebe a conexão. O SQL
+# fica escrito aqui, e não importado de aggregates/card_search: se mudar lá,
+# um banco antigo ainda passa pelo mesmo histórico de schema.
+MIGRATIONS: List[Tuple[int, str, Union[str, Callable[[sqlite3.Connection], None]]]] = [
+    (1, "base schema", """
+CREATE TABLE IF NOT EXISTS cards (
+    name TEXT PRIMARY KEY,
+    image_url TEXT,
+    cmc  INTEGER,
+    type TEXT
+);
+
+CREATE TABLE IF NOT EXISTS decks (
+    name TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS tags (
+    name TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS deck_cards (
+    card_name TEXT NOT NULL,
+    deck_name TEXT NOT NULL,
+    PRIMARY KEY (card_name, deck_name),
+    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE,
+    FOREIGN KEY (deck_name) REFERENCES decks(name) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS card_tags (
+    card_name TEXT NOT NULL,
+    tag_name TEXT NOT NULL,
+    PRIMARY KEY (card_name, tag_name),
+    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE,
+    FOREIGN KEY (tag_name) REFERENCES tags(name) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS card_types (
+    card_name TEXT NOT NULL,
+    type_name TEXT NOT NULL,
+    PRIMARY KEY (card_name, type_name),
+    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS set_fingerprints (
+    set_code TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS deck_fingerprints (
+    deck_name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+"""),
+    (2, "covering indexes for dashboard queries", """
+-- Link tables are keyed (card_name, x); these serve lookups and joins by x
+CREATE INDEX IF NOT EXISTS idx_deck_cards_deck ON deck_cards(deck_name, card_name);
+CREATE INDEX IF NOT EXISTS idx_card_tags_tag ON card_tags(tag_name, card_name);
+CREATE INDEX IF NOT EXISTS idx_card_types_type ON card_types(type_name, card_name);
+-- Lets card joins read cmc/type without touching the table
+CREATE INDEX IF NOT EXISTS idx_cards_name_cmc_type ON cards(name, cmc, type);
+ANALYZE;
+"""),
+    (3, "materialized per-deck aggregate tables", """
+CREATE TABLE IF NOT EXISTS deck_stats (
+    deck_name TEXT PRIMARY KEY,
+    total_cards INTEGER NOT NULL,
+    avg_cmc REAL,
+    unique_tags INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS deck_tag_counts (
+    deck_name TEXT NOT NULL,
+    tag_name TEXT NOT NULL,
+    tag_count INTEGER NOT NULL,
+    PRIMARY KEY (deck_name, tag_name)
+);
+
+CREATE TABLE IF NOT EXISTS deck_cmc_histogram (
+    deck_name TEXT NOT NULL,
+    cmc INTEGER,
+    total_cards INTEGER NOT NULL,
+    PRIMARY KEY (deck_name, cmc)
+);
+
+INSERT INTO deck_stats (deck_name, total_cards, avg_cmc, unique_tags)
+SELECT
+    d.name AS deck_name,
+    COUNT(DISTINCT dc.card_name) AS total_cards,
+    AVG(c.cmc) AS avg_cmc,
+    COUNT(DISTINCT ct.tag_name) AS unique_tags
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN cards c ON dc.card_name = c.name
+LEFT JOIN card_tags ct ON dc.card_name = ct.card_name
+LEFT JOIN card_types ctype ON dc.card_name = ctype.card_name
+WHERE ctype.type_name != 'land'
+GROUP BY d.name;
+
+INSERT INTO deck_tag_counts (deck_name, tag_name, tag_count)
+SELECT
+    dc.deck_name,
+    ct.tag_name,
+    COUNT(*) as tag_count
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN card_tags ct ON dc.card_name = ct.card_name
+GROUP BY dc.deck_name, ct.tag_name;
+
+INSERT INTO deck_cmc_histogram (deck_name, cmc, total_cards)
+SELECT
+    d.name AS deck_name,
+    c.cmc AS cmc,
+    COUNT(DISTINCT dc.card_name) AS total_cards
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN cards c ON dc.card_name = c.name
+WHERE c.type NOT LIKE '%Land%'
+GROUP BY c.cmc, d.name;
+"""),
+    (4, "per-table ingest generation counters", """
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO table_versions (table_name, version)
+SELECT name, 1 FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != 'table_versions';
+"""),
+    (5, "decklist quantities and sections, card printings", """
+ALTER TABLE deck_cards ADD COLUMN quantity INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE deck_cards ADD COLUMN section TEXT NOT NULL DEFAULT 'main';
+-- Resolves decklist lines such as "1x Sol Ring (C21) 263" by (set, collector number)
+CREATE TABLE IF NOT EXISTS card_printings (
+    set_code TEXT NOT NULL,
+    collector_number TEXT NOT NULL,
+    card_name TEXT NOT NULL,
+    PRIMARY KEY (set_code, collector_number),
+    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE
+);
+INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('card_printings', 1);
+-- Decks linked before this migration have quantity 1 everywhere; forgetting
+-- their fingerprints makes the next ingest relink them
+DELETE FROM deck_fingerprints;
+"""),
+    (6, "oracle text for local search", """
+ALTER TABLE cards ADD COLUMN oracle_text TEXT;
+-- Cards ingested before this migration have no oracle text; forgetting the
+-- set fingerprints makes the next ingest refetch them
+DELETE FROM set_fingerprints;
+"""),
+    (7, "full-text index over card names, types and oracle text", """
+CREATE VIRTUAL TABLE IF NOT EXISTS card_search USING fts5(
+    name, type, oracle_text,
+    content = 'cards',
+    tokenize = 'unicode61 remove_diacritics 2',
+    -- Prefix indexes answer "prol*" without scanning every token starting with it
+    prefix = '2 3'
+);
+INSERT INTO card_search (card_search) VALUES ('rebuild');
+INSERT INTO card_search (card_search) VALUES ('optimize');
+INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('card_search', 1);
+"""),
+    (8, "drop per-deck tag and CMC tables", """
+-- As abas calculam contagens de tags e histogramas de CMC a partir do
+-- DataModel; ninguém mais lê estas tabelas
+DROP TABLE IF EXISTS deck_tag_counts;
+DROP TABLE IF EXISTS deck_cmc_histogram;
+DELETE FROM table_versions WHERE table_name IN ('deck_tag_counts', 'deck_cmc_histogram');
+"""),
+    (9, "deck_stats counting card copies", """
+DELETE FROM deck_stats;
+INSERT INTO deck_stats (deck_name, total_cards, avg_cmc, unique_tags)
+SELECT
+    d.name AS deck_name,
+    SUM(dc.quantity) AS total_cards,
+    SUM(dc.quantity * c.cmc) * 1.0 / SUM(IIF(c.cmc IS NULL, 0, dc.quantity)) AS avg_cmc,
+    (SELECT COUNT(DISTINCT ct.tag_name)
+     FROM deck_cards tdc
+     JOIN card_tags ct ON tdc.card_name = ct.card_name
+     WHERE tdc.deck_name = d.name
+       AND EXISTS (SELECT 1 FROM card_types ctype
+                   WHERE ctype.card_name = tdc.card_name AND ctype.type_name != 'land')) AS unique_tags
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN cards c ON dc.card_name = c.name
+WHERE EXISTS (SELECT 1 FROM card_types ctype
+              WHERE ctype.card_name = dc.card_name AND ctype.type_name != 'land')
+GROUP BY d.name;
+UPDATE table_versions SET version = version + 1 WHERE table_name = 'deck_stats';
+"""),
+    (10, "full-text index over deck cards only", """
+-- A tabela da migração 7 indexava o catálogo inteiro, com conteúdo externo
+-- em cards; a nova indexa só os cards de decks e não dá para alterá-la
+DROP TABLE IF EXISTS card_search;
+CREATE VIRTUAL TABLE IF NOT EXISTS card_search USING fts5(
+    name, type, oracle_text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    -- Prefix indexes answer "prol*" without scanning every token starting with it
+    prefix = '2 3'
+);
+INSERT INTO card_search (name, type, oracle_text)
+SELECT c.name, c.type, c.oracle_text
+FROM cards c
+JOIN (SELECT card_name, COUNT(*) AS n_decks FROM deck_cards GROUP BY card_name) d ON d.card_name = c.name
+ORDER BY d.n_decks DESC, c.name;
+INSERT INTO card_search (card_search) VALUES ('optimize');
+UPDATE table_versions SET version = version + 1 WHERE table_name = 'card_search';
+"""),
+    (11, "deck_cards keyed by section", """
+-- Um card no deck principal e no sideboard virava uma linha só, com as
+-- quantidades somadas; a seção passa a fazer parte da chave
+CREATE TABLE deck_cards_by_section (
+    card_name TEXT NOT NULL,
+    deck_name TEXT NOT NULL,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    section TEXT NOT NULL DEFAULT 'main',
+    PRIMARY KEY (card_name, deck_name, section),
+    FOREIGN KEY (card_name) REFERENCES cards(name) ON DELETE CASCADE,
+    FOREIGN KEY (deck_name) REFERENCES decks(name) ON DELETE CASCADE
+);
+INSERT INTO deck_cards_by_section (card_name, deck_name, quantity, section)
+SELECT card_name, deck_name, quantity, section FROM deck_cards;
+DROP TABLE deck_cards;
+ALTER TABLE deck_cards_by_section RENAME TO deck_cards;
+CREATE INDEX IF NOT EXISTS idx_deck_cards_deck ON deck_cards(deck_name, card_name);
+-- Decks linked before this migration may have merged rows; forgetting their
+-- fingerprints makes the next ingest relink them
+DELETE FROM deck_fingerprints;
+
+-- Sideboard, maybeboard and companion cards leave the summaries and the search
+DELETE FROM deck_stats;
+INSERT INTO deck_stats (deck_name, total_cards, avg_cmc, unique_tags)
+SELECT
+    d.name AS deck_name,
+    SUM(dc.quantity) AS total_cards,
+    SUM(dc.quantity * c.cmc) * 1.0 / SUM(IIF(c.cmc IS NULL, 0, dc.quantity)) AS avg_cmc,
+    (SELECT COUNT(DISTINCT ct.tag_name)
+     FROM deck_cards tdc
+     JOIN card_tags ct ON tdc.card_name = ct.card_name
+     WHERE tdc.deck_name = d.name AND tdc.section IN ('main', 'commander')
+       AND EXISTS (SELECT 1 FROM card_types ctype
+                   WHERE ctype.card_name = tdc.card_name AND ctype.type_name != 'land')) AS unique_tags
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN cards c ON dc.card_name = c.name
+WHERE dc.section IN ('main', 'commander')
+  AND EXISTS (SELECT 1 FROM card_types ctype
+              WHERE ctype.card_name = dc.card_name AND ctype.type_name != 'land')
+GROUP BY d.name;
+DELETE FROM card_search;
+INSERT INTO card_search (name, type, oracle_text)
+SELECT c.name, c.type, c.oracle_text
+FROM cards c
+JOIN (SELECT card_name, COUNT(DISTINCT deck_name) AS n_decks
+      FROM deck_cards WHERE section IN ('main', 'commander') GROUP BY card_name) d ON d.card_name = c.name
+ORDER BY d.n_decks DESC, c.name;
+INSERT INTO card_search (card_search) VALUES ('optimize');
+UPDATE table_versions SET version = version + 1 WHERE table_name IN ('deck_cards', 'deck_stats', 'card_search');
+"""),
+    (12, "per-deck tag and CMC tables, counting card copies", """
+-- A migração 8 removeu estas tabelas; voltam mantidas a cada ingestão,
+-- contando cópias e só o deck como jogado, como deck_stats
+CREATE TABLE IF NOT EXISTS deck_tag_counts (
+    deck_name TEXT NOT NULL,
+    tag_name TEXT NOT NULL,
+    tag_count INTEGER NOT NULL,
+    PRIMARY KEY (deck_name, tag_name)
+);
+
+CREATE TABLE IF NOT EXISTS deck_cmc_histogram (
+    deck_name TEXT NOT NULL,
+    cmc INTEGER,
+    total_cards INTEGER NOT NULL,
+    PRIMARY KEY (deck_name, cmc)
+);
+
+INSERT INTO deck_tag_counts (deck_name, tag_name, tag_count)
+SELECT
+    d.name AS deck_name,
+    ct.tag_name,
+    SUM(dc.quantity) AS tag_count
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN card_tags ct ON dc.card_name = ct.card_name
+WHERE dc.section IN ('main', 'commander')
+GROUP BY d.name, ct.tag_name;
+
+INSERT INTO deck_cmc_histogram (deck_name, cmc, total_cards)
+SELECT
+    d.name AS deck_name,
+    c.cmc AS cmc,
+    SUM(dc.quantity) AS total_cards
+FROM decks d
+JOIN deck_cards dc ON d.name = dc.deck_name
+JOIN cards c ON dc.card_name = c.name
+WHERE dc.section IN ('main', 'commander')
+  AND EXISTS (SELECT 1 FROM card_types ctype
+              WHERE ctype.card_name = dc.card_name AND ctype.type_name != 'land')
+GROUP BY d.name, c.cmc;
+
+INSERT INTO table_versions (table_name, version) VALUES ('deck_tag_counts', 1), ('deck_cmc_histogram', 1)
+ON CONFLICT(table_name) DO UPDATE SET version = version + 1;
+"""),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, verbose: bool = False) -> int:
+    """Apply every pending migration in order. Returns the resulting version.
+
+    Each step and its user_version bump run in one transaction, so a failed
+    migration leaves the database at the previous version.
+    """
+    current = get_version(conn)
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        if verbose:
+            print(f"Aplicando migração {version}: {description}")
+        try:
+            if callable(step):
+                conn.execute("BEGIN")
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            else:
+                conn.executescript(f"BEGIN;\n{step}\nPRAGMA user_version = {version};\nCOMMIT;")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        current = version
+    return current
@@ -1,41 +1,32 @@
 import sqlite3
 import sys
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 from pathlib import Path
 
-import os
 
-from src.external.scryfall_api import ScryfallAPI
+from src.external.scryfall_api import ScryfallAPI, ScryfallUnavailable
+from src.precon_db.aggregates import AGGREGATES, refresh_aggregates
+from src.precon_db.bulk_import import load_bulk_file
+from src.precon_db.card_search import refresh_card_search
+from src.precon_db.card_writer import CardWriter, RowBatch, forget_set_links
+from src.precon_db.decklist_import import CardResolver, parse_decklist_files, resolve_decklist
+from src.precon_db.decklist_parser import parse_decklist
+from src.precon_db.change_tracking import (
+    ChangeReport, bump_table_versions, deck_fingerprint, get_deck_fingerprints, get_set_fingerprints, record_deck_fingerprint,
+    record_set_fingerprint, set_fingerprint,
+)
+from src.precon_db.ingestion import IngestionPipeline, IngestionStats, SearchJob
+from src.precon_db.init_db import connect, init_db
+from src.precon_db.local_search import LocalCardPool, oracle_tag_rows
+from src.precon_db.snapshot import write_snapshot
+from src.precon_db.thumbnails import cache_thumbnails
 
 # Get project root directory (2 levels up from this file)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DB_PATH = PROJECT_ROOT / "precon.db"
 
-def _insert_card_with_tag(cursor: sqlite3.Cursor, card_name: str, tag_name: str, cmc: int, type_: str, image_url: str) -> None:
-    # Insere o card na tabela de cards
-    cursor.execute("INSERT OR IGNORE INTO cards (name, cmc, type, image_url) VALUES (?, ?, ?, ?)", (card_name, cmc, type_, image_url))
-
-    # Insere a tag na tabela de tags
-    cursor.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag_name,))
-
-    # Relaciona o card com a tag na tabela de card_tags
-    cursor.execute(
-        "INSERT OR IGNORE INTO card_tags (card_name, tag_name) VALUES (?, ?)",
-        (card_name, tag_name)
-    )
-
-def _insert_deck_if_card_exists(cursor: sqlite3.Cursor, deck_name: str, card_name: str) -> None:
-    # Verifica se o card existe na tabela de cards
-    cursor.execute("SELECT 1 FROM cards WHERE name = ?", (card_name,))
-    if cursor.fetchone():
-        # Insere o deck na tabela de decks
-        cursor.execute("INSERT OR IGNORE INTO decks (name) VALUES (?)", (deck_name,))
-        
-        # Relaciona o card com o deck na tabela de deck_cards
-        cursor.execute(
-            "INSERT OR IGNORE INTO deck_cards (card_name, deck_name) VALUES (?, ?)",
-            (card_name, deck_name)
-        )
+# Concurrent Scryfall searches; they all share one rate limit
+DEFAULT_JOBS = 4
 
 def _get_tag_list():
     tag_file = PROJECT_ROOT / "tag_list.txt"
@@ -43,134 +34,303 @@ def _get_tag_list():
         tags = [line.strip() for line in f.readlines() if line.strip()]
     return tags
 
+def _split_tag_list() -> Tuple[Dict[str, str], List[str]]:
+    """({tag: o: value} of the "phrase -> tag" lines, otag names of the rest)."""
+    oracle_tags = {}
+    otags = []
+    for tag_description in _get_tag_list():
+        if "->" in tag_description:
+            phrase, tag = (part.strip() for part in tag_description.split("->", 1))
+            oracle_tags[tag] = f'"{phrase}"'
+        else:
+            otags.append(tag_description)
+    return oracle_tags, otags
+
 def _get_set_list():
     set_file = PROJECT_ROOT / "set_list.txt"
     with open(set_file, "r") as f:
         sets = [line.strip() for line in f.readlines() if line.strip()]
     return sets
 
-def _add_card_type(cursor: sqlite3.Cursor, card_name: str, type_name: str) -> None:
-    types = {
-        "creature", "instant", "sorcery", "enchantment", "artifact", "planeswalker", "land", "battle"
-    }
+def _get_decklist_card_names() -> Set[str]:
+    names = set()
+    decklists_path = PROJECT_ROOT / "decklists"
+    for file_path in decklists_path.glob("*.txt"):
+        names.update(entry.name for entry in parse_decklist(file_path.read_text(encoding="utf-8")))
+    return names
 
-    type_words = type_name.split()
-    for word in type_words:
-        if word.lower() in types:
-            cursor.execute(
-                "INSERT OR IGNORE INTO card_types (card_name, type_name) VALUES (?, ?)",
-                (card_name, word.lower())
-            )
+def _resolve_sets(set: Optional[str], mtg_sets: Optional[List[str]]) -> List[str]:
+    if mtg_sets is not None:
+        return mtg_sets
+    if set:
+        return [set]
+    return _get_set_list()
 
-def populate_db_with_cards(set: Optional[str] = None):
-    scryfall_api = ScryfallAPI()
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
-
-    def _process_page(card_data): # type: ignore
-        if card_data and "data" in card_data:
-            for card in card_data["data"]: # type: ignore
-                card_name = card["name"] # type: ignore
-                cmc = card["cmc"] # type: ignore
-                type_ = card["type_line"] # type: ignore
-                image_url = card.get("image_uris", {}).get("normal", "")  # type: ignore
-                cursor.execute("INSERT OR IGNORE INTO cards (name, cmc, type, image_url) VALUES (?, ?, ?, ?)", (card_name, cmc, type_, image_url)) # type: ignore
-                _add_card_type(cursor, card_name, type_)  # type: ignore
-            print(f"Inserted cards from set {mtg_set}")
-            if "has_more" in card_data and card_data["has_more"]:  # type: ignore
-                _process_page(scryfall_api.process_next_page(card_data["next_page"]))  # type: ignore
-        else:
-            print(f"No cards found for set {mtg_set}")
+def _build_card_jobs(mtg_sets: List[str], fresh: bool = False) -> List[SearchJob]:
+    return [SearchJob(mtg_set=mtg_set, tag=None, query=f'set:{mtg_set}', fresh=fresh) for mtg_set in mtg_sets]
 
-    if set:
-        mtg_sets = [set]
+def _print_job_done(job: SearchJob, inserted: int, stats: IngestionStats) -> None:
+    subject = f"set {job.mtg_set}" if job.tag is None else f"set {job.mtg_set} with tag {job.tag}"
+    if job in stats.failed_jobs:
+        print(f"{stats} Search failed for {subject} after {inserted} cards")
+    elif inserted:
+        print(f"{stats} Inserted {inserted} cards from {subject}")
     else:
-        mtg_sets = _get_set_list()
-
-    for mtg_set in mtg_sets:
-        query = f'set:{mtg_set}'
-        card_data = scryfall_api.scryfall_oracle_search(query)  # type: ignore
-        _process_page(card_data)
+        print(f"{stats} No cards found for {subject}")
 
+def refresh_search_index(conn: sqlite3.Connection):
+    """Rebuild the dashboard's full-text card search after the deck cards changed."""
+    refresh_card_search(conn)
+    bump_table_versions(conn, ["card_search"])
     conn.commit()
-    print("Dados inseridos com sucesso ✅")
-    conn.close()
 
-def populate_db_with_tags(set: Optional[str] = None):
-    scryfall_api = ScryfallAPI()
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+def ingest_sets(jobs: List[SearchJob], max_workers: int = DEFAULT_JOBS) -> List[SearchJob]:
+    """Run card and tag searches on `max_workers` threads, written by a single writer.
 
-    if set:
-        mtg_sets = [set]
+    Returns the jobs whose search failed or was cut short, whose sets are
+    incomplete in the database.
+    """
+    conn = connect()
+    pipeline = IngestionPipeline(jobs=max_workers, on_job_done=_print_job_done)
+    stats = pipeline.run(conn, jobs)
+    conn.close()
+
+    print(f"Requests: {pipeline.scryfall_api.request_count} (retries: {pipeline.scryfall_api.retry_count})")
+    print(f"Stages: {pipeline.timings}")
+    if stats.failed:
+        print(f"{stats.failed} searches failed, sets: {', '.join(sorted({job.mtg_set for job in stats.failed_jobs}))}")
     else:
-        mtg_sets = _get_set_list()
+        print("Dados inseridos com sucesso ✅")
+    return stats.failed_jobs
 
-    for mtg_set in mtg_sets:
-        for tag_description in _get_tag_list():
-            if "->" in tag_description:
-                query = f'set:{mtg_set} o:"{tag_description.split("->")[0].strip()}"'
-                tag = tag_description.split("->")[1].strip()
-            else:
-                query = f'set:{mtg_set} otag:"{tag_description}"'
-                tag = tag_description
-            card_data = scryfall_api.scryfall_oracle_search(query)  # type: ignore
-
-            if card_data and "data" in card_data:
-                for card in card_data["data"]: # type: ignore
-                    card_name = card["name"] # type: ignore
-                    cmc = card["cmc"] # type: ignore
-                    type_ = card["type_line"] # type: ignore
-                    image_url = card.get("image_uris", {}).get("normal", "")  # type: ignore
-                    _insert_card_with_tag(cursor, card_name, tag, cmc, type_, image_url) # type: ignore
-                print(f"Inserted cards from set {mtg_set} with tag {tag}")
-            else:
-                print(f"No cards found for set {mtg_set} with tag {tag}")
+def populate_db_with_cards(set: Optional[str] = None, mtg_sets: Optional[List[str]] = None, fresh: bool = False,
+                           max_workers: int = DEFAULT_JOBS):
+    ingest_sets(_build_card_jobs(_resolve_sets(set, mtg_sets), fresh=fresh), max_workers=max_workers)
+
+def populate_db_with_bulk(bulk_file: str):
+    """Load card metadata from a local Scryfall bulk-data file instead of the search API."""
+    conn = connect()
+
+    print(f"Streaming bulk file {bulk_file}")
+    matched = load_bulk_file(conn, Path(bulk_file), set(_get_set_list()), _get_decklist_card_names())
+    print(f"Inserted {matched} cards from bulk file")
 
-    conn.commit()
     print("Dados inseridos com sucesso ✅")
+    conn.close()
+
+def _build_tag_jobs(mtg_sets: List[str], fresh: bool = False) -> List[SearchJob]:
+    """Scryfall searches of the otag: tags; oracle text tags are evaluated locally by tag_cards_by_oracle_text."""
+    _, otags = _split_tag_list()
+    return [SearchJob(mtg_set=mtg_set, tag=tag, query=f'set:{mtg_set} otag:"{tag}"', fresh=fresh)
+            for mtg_set in mtg_sets for tag in otags]
 
+def tag_cards_by_oracle_text(mtg_sets: List[str]):
+    """Tag the cards of `mtg_sets` whose stored oracle text matches a "phrase -> tag" line.
+
+    Same result as a `set:X o:"phrase"` search per set and tag, computed
+    from the cards table in one pass per tag instead of one request each.
+    """
+    oracle_tags, _ = _split_tag_list()
+    if not oracle_tags:
+        return
+    conn = connect()
+    batch = RowBatch()
+    batch.tags, batch.card_tags = oracle_tag_rows(LocalCardPool.load(conn), oracle_tags, mtg_sets)
+    writer = CardWriter(conn)
+    writer.add_batch(batch)
+    writer.flush()
     conn.close()
+    print(f"Tagged {len(batch.card_tags)} cards by oracle text locally")
 
-def populate_db_with_decks(deck: Optional[str] = None):
-    conn = sqlite3.connect(str(DB_PATH))
-    cursor = conn.cursor()
+def populate_db_with_tags(set: Optional[str] = None, max_workers: int = DEFAULT_JOBS, mtg_sets: Optional[List[str]] = None,
+                          fresh: bool = False):
+    mtg_sets = _resolve_sets(set, mtg_sets)
+    ingest_sets(_build_tag_jobs(mtg_sets, fresh=fresh), max_workers=max_workers)
+    tag_cards_by_oracle_text(mtg_sets)
 
-    decklists_path = PROJECT_ROOT / "decklists"
+def populate_db_with_decks(deck: Optional[str] = None, force: bool = False, report: Optional[ChangeReport] = None,
+                           max_workers: Optional[int] = None):
+    """Load decklists whose file content changed since the last run.
+
+    A changed deck has its deck_cards rows rewritten; decks whose file was
+    deleted are removed when the whole directory is processed. `force`
+    relinks every deck, which is needed after new cards were ingested.
+    Large batches of decklists are parsed on `max_workers` processes; lines
+    are resolved to cards in memory and written by this process.
+    """
+    conn = connect()
+    writer = CardWriter(conn)
+    report = report if report is not None else ChangeReport()
 
+    decklists_path = PROJECT_ROOT / "decklists"
     if deck:
-        decklists_path = decklists_path / f"{deck}.txt"
-    
-    # Check all files inside decklists directory
-    if os.path.exists(decklists_path):
-        for filename in os.listdir(decklists_path):
-            file_path = os.path.join(decklists_path, filename)
-            if os.path.isfile(file_path):
-                clean_filename = filename.rsplit(".", 1)[0]  # Remove file extension for deck name
-                print(f"Processing deck file: {clean_filename}")
-                with open(file_path, "r") as f:
-                    for line in f:
-                        card_name = line.split("x ")[-1].split(" (")[0].strip()  # Clean line to get card name
-                        if card_name:
-                            _insert_deck_if_card_exists(cursor, clean_filename, card_name)  # type: ignore
-                print(f"Inserted cards from deck {clean_filename}")
+        deck_files = [decklists_path / f"{deck}.txt"]
     else:
-        print(f"Directory {decklists_path} not found")
+        deck_files = sorted(path for path in decklists_path.glob("*") if path.is_file())
 
-    conn.commit()
+    if not deck_files or not all(path.exists() for path in deck_files):
+        print(f"Decklist not found in {decklists_path}")
+        conn.close()
+        return report
+
+    known = get_deck_fingerprints(conn)
+    to_load = {}
+    for file_path in deck_files:
+        clean_filename = file_path.stem  # Remove file extension for deck name
+        fingerprint = deck_fingerprint(file_path)
+        if clean_filename not in known:
+            report.decks_added.append(clean_filename)
+        elif known[clean_filename] != fingerprint:
+            report.decks_changed.append(clean_filename)
+        else:
+            report.decks_unchanged.append(clean_filename)
+            if not force:
+                continue
+        to_load[file_path] = fingerprint
+
+    resolver = CardResolver(conn) if to_load else None
+    for file_path, entries in parse_decklist_files(list(to_load), max_workers=max_workers):
+        clean_filename = file_path.stem
+        print(f"Processing deck file: {clean_filename}")
+        conn.execute("DELETE FROM deck_cards WHERE deck_name = ?", (clean_filename,))
+        bump_table_versions(conn, ["deck_cards"])
+        cards, unresolved = resolve_decklist(resolver, entries)
+        writer.add_deck_cards(clean_filename, cards)
+        if unresolved:
+            print(f"  {len(unresolved)} cards not in the database: {', '.join(unresolved[:5])}"
+                  f"{', ...' if len(unresolved) > 5 else ''}")
+        record_deck_fingerprint(conn, clean_filename, to_load[file_path])
+
+    if not deck:
+        present = {path.stem for path in deck_files}
+        for removed in sorted(set(known) - present):
+            conn.execute("DELETE FROM deck_cards WHERE deck_name = ?", (removed,))
+            conn.execute("DELETE FROM decks WHERE name = ?", (removed,))
+            conn.execute("DELETE FROM deck_fingerprints WHERE deck_name = ?", (removed,))
+            bump_table_versions(conn, ["deck_cards", "decks"])
+            report.decks_removed.append(removed)
+
+    writer.flush()
     print("Dados inseridos com sucesso ✅")
 
     conn.close()
+    return report
+
+def plan_set_changes(mtg_sets: List[str], force: bool = False) -> Tuple[ChangeReport, Dict[str, str]]:
+    """Compare each set's current Scryfall fingerprint with the stored one."""
+    scryfall_api = ScryfallAPI()
+    conn = connect()
+    known = get_set_fingerprints(conn)
+    conn.close()
+
+    report = ChangeReport()
+    fingerprints = {}
+    tags = _get_tag_list()
+    for mtg_set in mtg_sets:
+        try:
+            set_data = scryfall_api.get_set(mtg_set)
+        except ScryfallUnavailable:
+            set_data = None
+        fingerprint = set_fingerprint(set_data, tags) # type: ignore
+        if fingerprint is None:
+            # Sem metadados (offline ou set desconhecido): busca de qualquer forma
+            report.sets_changed.append(mtg_set)
+            continue
+        fingerprints[mtg_set] = fingerprint
+        if mtg_set not in known:
+            report.sets_added.append(mtg_set)
+        elif known[mtg_set] != fingerprint or force:
+            report.sets_changed.append(mtg_set)
+        else:
+            report.sets_unchanged.append(mtg_set)
+    return report, fingerprints
+
+def refresh_deck_aggregates(report: ChangeReport, full: bool = False) -> None:
+    """Recompute the materialized deck summaries and the card search touched by this ingest."""
+    conn = connect()
+    if full or report.sets_to_fetch:
+        # Cards/tags changed, which can affect any deck
+        refreshed = refresh_aggregates(conn)
+    else:
+        refreshed = refresh_aggregates(conn, decks=report.decks_added + report.decks_changed + report.decks_removed)
+    # A no-op ingest keeps the versions, so running dashboards keep their cached summaries
+    if refreshed:
+        bump_table_versions(conn, [table for table, _ in AGGREGATES])
+        # The search index holds the cards of every deck, so it changes with them
+        refresh_search_index(conn)
+    conn.commit()
+    conn.close()
+
+def populate_db(set: Optional[str] = None, force: bool = False, max_workers: int = DEFAULT_JOBS) -> ChangeReport:
+    """Incremental ingest: refetch only changed sets and relink only changed decks.
+
+    Card and tag searches of every changed set run in one pipeline, so
+    `max_workers` searches are in flight at any time.
+    """
+    mtg_sets = _resolve_sets(set, None)
+    report, fingerprints = plan_set_changes(mtg_sets, force=force)
+
+    to_fetch = report.sets_to_fetch
+    if to_fetch:
+        # Sets Scryfall reports as changed are rewritten, not just added to.
+        # Sets fetched without metadata (offline) keep their links
+        conn = connect()
+        forget_set_links(conn, [mtg_set for mtg_set in report.sets_changed if mtg_set in fingerprints])
+        conn.commit()
+        conn.close()
+        failed_jobs = ingest_sets(_build_card_jobs(to_fetch, fresh=True) + _build_tag_jobs(to_fetch, fresh=True),
+                                  max_workers=max_workers)
+        tag_cards_by_oracle_text(to_fetch)
+
+        # Sets with a failed search keep their old fingerprint, so the next run fetches them again
+        report.sets_incomplete = sorted({job.mtg_set for job in failed_jobs})
+        conn = connect()
+        for mtg_set in to_fetch:
+            if mtg_set in fingerprints and mtg_set not in report.sets_incomplete:
+                record_set_fingerprint(conn, mtg_set, fingerprints[mtg_set])
+        conn.commit()
+        conn.close()
+
+    # New cards can complete decklists that were already loaded, so relink them all
+    populate_db_with_decks(force=force or bool(to_fetch), report=report, max_workers=max_workers)
+    refresh_deck_aggregates(report, full=force)
+    report.print()
+    return report
 
 if __name__ == "__main__":
+    init_db()  # Cria as tabelas novas em bancos existentes
     args = sys.argv[1:]
+    force = "--force" in args
+    no_thumbnails = "--no-thumbnails" in args
+    args = [arg for arg in args if arg not in ("--force", "--no-thumbnails")]
+    # --jobs N: concurrent Scryfall searches, and decklist parsing processes
+    jobs = DEFAULT_JOBS
+    if "--jobs" in args:
+        index = args.index("--jobs")
+        jobs = int(args[index + 1])
+        del args[index:index + 2]
     if args and args[0] == "--set" and len(args) > 1:
-        populate_db_with_tags(set=args[1])
+        populate_db(set=args[1], force=force, max_workers=jobs)
     elif args and args[0] == "--decks" and len(args) > 1:
-        populate_db_with_decks()
+        report = populate_db_with_decks(deck=args[1], force=force, max_workers=jobs)
+        refresh_deck_aggregates(report, full=force)
+        report.print()
     elif args and args[0] == "--decks-only":
-        populate_db_with_decks()
+        report = populate_db_with_decks(force=force, max_workers=jobs)
+        refresh_deck_aggregates(report, full=force)
+        report.print()
+    elif args and args[0] == "--bulk" and len(args) > 1:
+        populate_db_with_bulk(args[1])
+        populate_db_with_tags(max_workers=jobs)
+        report = populate_db_with_decks(force=True, max_workers=jobs)
+        refresh_deck_aggregates(report, full=True)
+        report.print()
     else:
-        populate_db_with_cards()
-        populate_db_with_tags()
-        populate_db_with_decks()
\ No newline at end of file
+        populate_db(force=force, max_workers=jobs)
+
+    # Columnar copy of the dashboard datasets, memory-mapped on cold start
+    conn = connect()
+    write_snapshot(conn)
+    if not no_thumbnails:
+        print(f"Thumbnails: {cache_thumbnails(conn)}")
+    conn.close()
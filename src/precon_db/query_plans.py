@@ -0,0 +1,69 @@
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from src.analytics.all_cards import CARD_LINK_QUERIES, CARDS_QUERY
+from src.analytics.queries import DECK_CARDS_QUERY, DECK_STATS_QUERY
+from src.precon_db.aggregates import AGGREGATES
+from src.precon_db.init_db import DB_PATH
+
+
+def _dashboard_queries() -> Dict[str, str]:
+    queries = {
+        "all_cards_data": CARDS_QUERY,
+        "deck_stats": DECK_STATS_QUERY,
+        "deck_cards": DECK_CARDS_QUERY,
+    }
+    for column, query in CARD_LINK_QUERIES.items():
+        queries[f"all_cards_data_{column}"] = query
+    # The dashboard reads materialized tables; the heavy joins run at ingest
+    for table, insert_sql in AGGREGATES:
+        queries[f"materialize_{table}"] = insert_sql.format(deck_filter="")
+    return queries
+
+
+def find_table_scans(conn: sqlite3.Connection, query: str) -> List[str]:
+    """Plan steps that read a whole table where an index lookup was expected.
+
+    The outermost loop of an aggregate over every deck/card has to visit
+    every row, so a plain SCAN is tolerated there. Any other SCAN that is not
+    served by a covering index, and any AUTOMATIC index (SQLite building a
+    throwaway index because a real one is missing), is reported.
+    """
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+    problems = []
+    outer_loop_seen = False
+    for _, parent, _, detail in rows:
+        is_loop = detail.startswith("SCAN ") or detail.startswith("SEARCH ")
+        is_outer_loop = is_loop and parent == 0 and not outer_loop_seen
+        if is_outer_loop:
+            outer_loop_seen = True
+        if "AUTOMATIC" in detail:
+            problems.append(detail)
+        elif detail.startswith("SCAN ") and "COVERING INDEX" not in detail and not is_outer_loop:
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """Map each dashboard/ingest query with a table-scan regression to its offending plan steps."""
+    failures = {}
+    for name, query in _dashboard_queries().items():
+        problems = find_table_scans(conn, query)
+        if problems:
+            failures[name] = problems
+    return failures
+
+
+if __name__ == "__main__":
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DB_PATH
+    conn = sqlite3.connect(str(db_path))
+    failures = check_query_plans(conn)
+    conn.close()
+
+    for name, problems in failures.items():
+        print(f"❌ {name}: {'; '.join(problems)}")
+    if failures:
+        sys.exit(1)
+    print("Todos os planos de consulta usam índices ✅")
@@ -0,0 +1,117 @@
+"""Columnar snapshot of the dashboard datasets.
+
+After an ingest, every dataset the dashboard loads is written to an
+uncompressed Arrow IPC (Feather v2) file. Uncompressed IPC files can be
+memory-mapped, so a cold dashboard process maps the pages (shared with every
+other process reading the same file) instead of rebuilding frames row by row
+through pd.read_sql_query.
+
+Each file records the table_versions of the tables it was built from; the
+dashboard only uses a file that is newer than the database and whose versions
+match it, and falls back to SQL otherwise.
+"""
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from src.analytics.model import MODEL_TABLES, model_table_query
+from src.analytics.queries import DECK_STATS_QUERY
+from src.precon_db.init_db import DB_PATH, connect
+
+VERSIONS_KEY = b"precon_table_versions"
+
+# String columns where fewer than this fraction of the values are distinct
+# are stored dictionary-encoded and load as pandas categoricals
+CATEGORICAL_MAX_RATIO = 0.5
+
+
+def snapshot_dir(db_path: Path) -> Path:
+    """precon.db -> precon.snapshot/, so every database has its own snapshot."""
+    db_path = Path(db_path)
+    return db_path.parent / f"{db_path.stem}.snapshot"
+
+
+def _sql(query: str) -> Callable[[sqlite3.Connection], pd.DataFrame]:
+    return lambda conn: pd.read_sql_query(query, conn)
+
+
+def snapshot_datasets() -> Dict[str, Tuple[Tuple[str, ...], Callable[[sqlite3.Connection], pd.DataFrame]]]:
+    """Dataset name -> (source tables, builder), matching the dashboard loaders."""
+    datasets = {table: ((table,), _sql(model_table_query(table))) for table in MODEL_TABLES}
+    datasets["deck_stats"] = (("deck_stats",), _sql(DECK_STATS_QUERY))
+    return datasets
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, column in enumerate(table.column_names):
+        values = table.column(i)
+        if pa.types.is_string(values.type) and len(values) and \
+                len(values.unique()) <= CATEGORICAL_MAX_RATIO * len(values):
+            table = table.set_column(i, column, values.dictionary_encode())
+    return table
+
+
+def write_snapshot(conn: sqlite3.Connection, db_path: Path = DB_PATH) -> Dict[str, Path]:
+    """Write every dashboard dataset of the database at `db_path` to its snapshot directory."""
+    directory = snapshot_dir(db_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Fold the WAL into the database file now, so a later checkpoint does not
+    # make the database look newer than the snapshot
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    versions = dict(conn.execute("SELECT table_name, version FROM table_versions").fetchall())
+
+    written = {}
+    for name, (tables, build) in snapshot_datasets().items():
+        table = _to_arrow(build(conn))
+        metadata = dict(table.schema.metadata or {})
+        metadata[VERSIONS_KEY] = json.dumps({t: versions.get(t, 0) for t in tables}).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        path = directory / f"{name}.arrow"
+        tmp_path = path.with_suffix(".arrow.tmp")
+        # Uncompressed, so readers can memory-map the buffers
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+        written[name] = path
+    return written
+
+
+def read_snapshot(name: str, data_version: Tuple, db_path: Path = DB_PATH) -> Optional[pd.DataFrame]:
+    """Memory-map dataset `name` of the database at `db_path`, if the snapshot is current.
+
+    `data_version` is the sorted ((table, version), ...) tuple returned by the
+    dashboard's get_data_version(). Returns None when the file is missing,
+    older than the database or built from other table versions.
+    """
+    path = snapshot_dir(db_path) / f"{name}.arrow"
+    if not path.exists() or path.stat().st_mtime < Path(db_path).stat().st_mtime:
+        return None
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        recorded = json.loads((reader.schema.metadata or {}).get(VERSIONS_KEY, b"{}"))
+        if tuple(sorted(recorded.items())) != tuple(data_version):
+            return None
+        table = reader.read_all()
+    df = table.to_pandas()
+    # to_pandas() turns list columns into numpy object arrays, which pickle
+    # (st.cache_data) far slower than the lists the SQL loaders return
+    for i, column in enumerate(table.column_names):
+        if pa.types.is_list(table.schema.field(i).type):
+            df[column] = table.column(i).to_pylist()
+    return df
+
+
+if __name__ == "__main__":
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DB_PATH
+    conn = connect(db_path)
+    for name, path in write_snapshot(conn, db_path).items():
+        print(f"{name}: {path} ({path.stat().st_size / 1024:.0f} KiB)")
+    conn.close()
@@ -0,0 +1,59 @@
+import itertools
+import random
+import sqlite3
+from pathlib import Path
+
+from src.precon_db.aggregates import refresh_aggregates
+from src.precon_db.card_rows import CARD_TYPES
+from src.precon_db.card_search import refresh_card_search
+from src.precon_db.migrations import migrate
+
+
+def build_synthetic_db(db_path: Path, n_cards: int = 100_000, n_decks: int = 1_000, n_tags: int = 30,
+                       cards_per_deck: int = 100, seed: int = 0) -> Path:
+    """Create a fully migrated database filled with random cards, tags and decks.
+
+    Used by the benchmarks to measure loaders and the dashboard against a
+    catalog much larger than the real one.
+    """
+    rng = random.Random(seed)
+    types = sorted(CARD_TYPES)
+    names = [f"Card {i}" for i in range(n_cards)]
+    tags = [f"tag_{i}" for i in range(n_tags)]
+    decks = [f"deck_{i}" for i in range(n_decks)]
+    # Oracle text drawn from a Zipf distribution over a large vocabulary, so
+    # term frequencies look like rules text: a few words in most cards, most
+    # words in very few
+    vocabulary = ("target creature you the card a of to your and each player until end turn control draw this "
+                  "damage enters battlefield when spell counter destroy exile artifact create token treasure gain "
+                  "life flying haste trample opponent loses graveyard return hand search library").split()
+    vocabulary += [f"word{i}" for i in range(5_000)]
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+    conn = sqlite3.connect(str(db_path))
+    migrate(conn)
+    conn.executemany(
+        "INSERT OR IGNORE INTO cards (name, cmc, type, image_url, oracle_text) VALUES (?, ?, ?, ?, ?)",
+        [(name, rng.randint(0, 9), rng.choice(types).title(), f"https://example.com/{i}.jpg",
+          " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(5, 40))).capitalize() + ".")
+         for i, name in enumerate(names)]
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO card_types (card_name, type_name) VALUES (?, ?)",
+        [(name, t.lower()) for name, t in conn.execute("SELECT name, type FROM cards")]
+    )
+    conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", [(tag,) for tag in tags])
+    conn.executemany(
+        "INSERT OR IGNORE INTO card_tags (card_name, tag_name) VALUES (?, ?)",
+        [(rng.choice(names), rng.choice(tags)) for _ in range(n_cards)]
+    )
+    conn.executemany("INSERT OR IGNORE INTO decks (name) VALUES (?)", [(deck,) for deck in decks])
+    conn.executemany(
+        "INSERT OR IGNORE INTO deck_cards (card_name, deck_name) VALUES (?, ?)",
+        [(card, deck) for deck in decks for card in rng.sample(names, min(cards_per_deck, n_cards))]
+    )
+    refresh_aggregates(conn)
+    refresh_card_search(conn)
+    conn.commit()
+    conn.close()
+    return Path(db_path)
@@ -0,0 +1,83 @@
+"""Download card images once and keep resized thumbnails for the dashboard gallery."""
+import io
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from PIL import Image
+
+from src.external.rate_limiter import TokenBucket
+from src.external.scryfall_api import ScryfallAPI
+from src.external.thumbnail_cache import ThumbnailCache
+from src.precon_db.init_db import connect
+
+# Four gallery columns in the wide layout are a bit over 300px each
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_QUALITY = 80
+
+
+def make_thumbnail(data: bytes, width: int = THUMBNAIL_WIDTH) -> bytes:
+    """Resize an image to `width` pixels wide, keeping its aspect ratio, as WebP."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="WEBP", quality=THUMBNAIL_QUALITY, method=6)
+    return output.getvalue()
+
+
+@dataclass
+class ThumbnailStats:
+    cached: int = 0
+    downloaded: int = 0
+    failed: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.downloaded} downloaded, {self.cached} already cached, {self.failed} failed"
+
+
+def cache_thumbnails(conn: sqlite3.Connection, cache: Optional[ThumbnailCache] = None,
+                     scryfall_api: Optional[ScryfallAPI] = None, max_workers: int = 8) -> ThumbnailStats:
+    """Make sure every card image has a local thumbnail.
+
+    Only URLs without a thumbnail are downloaded. Every URL still used by a
+    card is touched, so eviction drops thumbnails of removed cards first.
+    """
+    cache = cache or ThumbnailCache()
+    # The image CDN is not subject to the API's 10 req/s limit
+    api = scryfall_api or ScryfallAPI(rate_limiter=TokenBucket(rate=50.0, capacity=50.0), use_cache=False,
+                                      max_retries=2, pool_size=max_workers)
+    urls = [url for url, in conn.execute("SELECT DISTINCT image_url FROM cards WHERE image_url IS NOT NULL AND image_url != ''")]
+    existing = cache.paths_for(urls)
+    stats = ThumbnailStats(cached=len(existing))
+    missing = [url for url in urls if url not in existing]
+
+    def fetch(url: str) -> Optional[bytes]:
+        data = api.get_image(url)
+        try:
+            return make_thumbnail(data) if data else None
+        except OSError:  # not a decodable image
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url, thumbnail in zip(missing, executor.map(fetch, missing)):
+            if thumbnail is None:
+                stats.failed += 1
+                if not stats.downloaded and stats.failed >= 2 * max_workers:
+                    print("Image CDN unreachable, skipping the remaining thumbnails")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                continue
+            cache.put(url, thumbnail)
+            stats.downloaded += 1
+
+    cache.touch(urls)
+    return stats
+
+
+if __name__ == "__main__":
+    conn = connect()
+    print(f"Thumbnails: {cache_thumbnails(conn)}")
+    conn.close()
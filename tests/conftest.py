@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.external.rate_limiter import TokenBucket
+from src.external.scryfall_api import ScryfallAPI
+
+# (status, headers, JSON body) answered by the stub server
+Reply = Tuple[int, Dict[str, str], Optional[dict]]
+
+
+class StubScryfall:
+    """Local stand-in for api.scryfall.com, answering from scripted replies.
+
+    `routes` maps a search query (the `q` parameter) or a path to either a
+    list of replies, served in order with the last one repeated, or a
+    function of the request count returning a reply. Every request is
+    recorded with its arrival time.
+    """
+
+    def __init__(self):
+        self.routes: Dict[str, object] = {}
+        self.requests: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def count(self, key: str) -> int:
+        return sum(1 for _, requested in self.requests if requested == key)
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        parsed = urlparse(handler.path)
+        key = parse_qs(parsed.query).get("q", [parsed.path])[0]
+        with self._lock:
+            self.requests.append((time.monotonic(), key))
+            attempt = self.count(key) - 1
+        route = self.routes.get(key)
+        if route is None:
+            status, headers, body = 404, {}, {"object": "error", "status": 404}
+        elif callable(route):
+            status, headers, body = route(attempt)
+        else:
+            status, headers, body = route[min(attempt, len(route) - 1)]  # type: ignore
+        payload = json.dumps(body or {}).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def search_pages(self, query: str, pages: List[List[dict]]) -> None:
+        """Serve `pages` for `query`, linked through has_more/next_page like Scryfall."""
+        for number, cards in enumerate(pages):
+            key = query if number == 0 else f"/page/{query}/{number}"
+            has_more = number + 1 < len(pages)
+            self.routes[key] = [(200, {}, {
+                "object": "list", "data": cards, "has_more": has_more,
+                "next_page": f"{self.url}/page/{query}/{number + 1}" if has_more else None,
+            })]
+
+
+def stub_api(stub: StubScryfall, **kwargs) -> ScryfallAPI:
+    """ScryfallAPI talking to `stub`, uncached, with a fast rate limit and short backoff."""
+    kwargs.setdefault("rate_limiter", TokenBucket(rate=1000, capacity=1000))
+    kwargs.setdefault("backoff", 0.01)
+    return ScryfallAPI(base_url=stub.url, use_cache=False, **kwargs)
+
+
+def card(name: str, cmc: int = 1) -> dict:
+    return {"name": name, "cmc": cmc, "type_line": "Creature — Golem", "set": "tst", "collector_number": "1",
+            "oracle_text": f"{name} enters the battlefield."}
+
+
+@pytest.fixture
+def scryfall() -> Iterator[StubScryfall]:
+    stub = StubScryfall()
+    stub._thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
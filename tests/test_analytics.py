@@ -0,0 +1,161 @@
+import pandas as pd
+import pytest
+
+from src.analytics.deck_views import build_deck_views
+from src.analytics.model import DataModel, read_model
+from src.analytics.queries import DECK_STATS_QUERY
+from src.analytics.report import UnknownDecks, build_deck_reports, generate_report
+from src.analytics.similarity import DeckSimilarity
+from src.precon_db.aggregates import refresh_aggregates
+from src.precon_db.decklist_import import CardResolver, resolve_decklist
+from src.precon_db.decklist_parser import parse_decklist
+from src.precon_db.init_db import connect
+from src.precon_db.migrations import migrate
+
+CARDS = [("Island", 0, "land"), ("Mountain", 0, "land"), ("Lightning Bolt", 1, "instant"),
+         ("Opt", 1, "instant"), ("Sol Ring", 1, "artifact")]
+# (deck, card, quantity)
+DECK_CARDS = [("izzet", "Island", 14), ("izzet", "Mountain", 13), ("izzet", "Lightning Bolt", 1),
+              ("izzet", "Opt", 1), ("izzet", "Sol Ring", 1), ("mono_u", "Island", 30), ("mono_u", "Opt", 1)]
+CARD_TAGS = [("Opt", "draw"), ("Sol Ring", "ramp"), ("Island", "ramp")]
+
+
+@pytest.fixture
+def db(tmp_path):
+    conn = connect(tmp_path / "precon.db")
+    migrate(conn)
+    conn.executemany("INSERT INTO cards (name, cmc, type) VALUES (?, ?, ?)", CARDS)
+    conn.executemany("INSERT INTO card_types (card_name, type_name) VALUES (?, ?)",
+                     [(name, type_name) for name, _, type_name in CARDS])
+    conn.executemany("INSERT INTO decks (name) VALUES (?)", [("izzet",), ("mono_u",)])
+    conn.executemany("INSERT INTO deck_cards (deck_name, card_name, quantity) VALUES (?, ?, ?)", DECK_CARDS)
+    conn.executemany("INSERT INTO tags (name) VALUES (?)", [("draw",), ("ramp",)])
+    conn.executemany("INSERT INTO card_tags (card_name, tag_name) VALUES (?, ?)", CARD_TAGS)
+    refresh_aggregates(conn)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_deck_views_count_copies(db):
+    model = read_model(db)
+    view = build_deck_views(model)["izzet"]
+
+    assert dict(zip(model.card_names[view.card_ids], view.card_quantities)) == {
+        "Island": 14, "Lightning Bolt": 1, "Mountain": 13, "Opt": 1, "Sol Ring": 1}
+    assert dict(zip(view.cmc_values, view.cmc_counts)) == {0.0: 27, 1.0: 3}
+    assert dict(zip(model.tag_names[view.tag_ids], view.tag_counts)) == {"draw": 1, "ramp": 15}
+
+
+def test_tag_counts_count_copies(db):
+    model = read_model(db)
+
+    assert list(model.tag_counts_per_deck("ramp")) == [15, 30]
+    assert dict(zip(model.tag_names, model.tag_totals())) == {"draw": 2, "ramp": 45}
+
+
+def test_similarity_counts_distinct_cards_and_weighted_tags(db):
+    model = read_model(db)
+    similarity = DeckSimilarity.build(model)
+
+    assert similarity.shared_cards[0, 1] == 2
+    assert similarity.card_jaccard[0, 1] == pytest.approx(2 / 5)
+    # izzet (draw 1, ramp 15) vs mono_u (draw 1, ramp 30)
+    assert similarity.tag_cosine[0, 1] == pytest.approx((1 + 15 * 30) / ((1 + 15**2) * (1 + 30**2)) ** 0.5)
+
+
+def test_deck_stats_count_copies(db):
+    stats = dict((row[0], row[1:]) for row in db.execute("SELECT * FROM deck_stats"))
+
+    # Lands are left out of the non-land totals
+    assert stats["izzet"] == (3, 1.0, 2)
+    assert stats["mono_u"] == (1, 1.0, 1)
+
+
+def test_materialized_tag_counts_and_cmc_histogram(db):
+    model = read_model(db)
+    views = build_deck_views(model)
+
+    for deck_name, view in views.items():
+        tag_counts = dict(db.execute("SELECT tag_name, tag_count FROM deck_tag_counts WHERE deck_name = ?",
+                                     (deck_name,)))
+        assert tag_counts == dict(zip(model.tag_names[view.tag_ids], view.tag_counts))
+    # Lands are left out, as in deck_stats.avg_cmc
+    assert sorted(db.execute("SELECT deck_name, cmc, total_cards FROM deck_cmc_histogram")) == [
+        ("izzet", 1, 3), ("mono_u", 1, 1)]
+
+    db.execute("UPDATE deck_cards SET quantity = 4 WHERE deck_name = 'mono_u' AND card_name = 'Opt'")
+    refresh_aggregates(db, decks=["mono_u"])
+    assert db.execute("SELECT tag_count FROM deck_tag_counts WHERE deck_name = 'mono_u' AND tag_name = 'draw'"
+                      ).fetchone() == (4,)
+    assert sorted(db.execute("SELECT deck_name, cmc, total_cards FROM deck_cmc_histogram")) == [
+        ("izzet", 1, 3), ("mono_u", 1, 4)]
+
+
+def test_sideboard_cards_are_stored_but_not_counted(db):
+    entries = parse_decklist("1 Opt\n1 Sol Ring\n\nSideboard\n2 Opt\n3 Lightning Bolt\n")
+    rows, unresolved = resolve_decklist(CardResolver(db), entries)
+    assert sorted(rows) == [("Lightning Bolt", 3, "sideboard"), ("Opt", 1, "main"), ("Opt", 2, "sideboard"),
+                            ("Sol Ring", 1, "main")]
+    assert unresolved == []
+
+    db.execute("INSERT INTO decks (name) VALUES ('sideboarded')")
+    db.executemany("INSERT INTO deck_cards (deck_name, card_name, quantity, section) VALUES ('sideboarded', ?, ?, ?)",
+                   rows)
+    refresh_aggregates(db)
+    model = read_model(db)
+    view = build_deck_views(model)["sideboarded"]
+
+    assert db.execute("SELECT total_cards, avg_cmc, unique_tags FROM deck_stats WHERE deck_name = 'sideboarded'"
+                      ).fetchone() == (2, 1.0, 2)
+    assert dict(zip(model.card_names[view.card_ids], view.card_quantities)) == {"Opt": 1, "Sol Ring": 1}
+
+
+def test_unknown_names_raise(db):
+    model = read_model(db)
+
+    assert model.deck_id("mono_u") == 1
+    for name in ("aaa", "jund", "zzz"):
+        with pytest.raises(KeyError):
+            model.deck_id(name)
+    with pytest.raises(KeyError):
+        model.tag_id("lifegain")
+
+
+def test_links_without_quantities_weigh_one():
+    model = DataModel.build(
+        cards=pd.DataFrame({"name": ["Opt"], "cmc": [1.0], "image_url": [""]}),
+        decks=pd.DataFrame({"name": ["mono_u"]}),
+        tags=pd.DataFrame({"name": ["draw"]}),
+        deck_cards=pd.DataFrame({"deck_name": ["mono_u"], "card_name": ["Opt"]}),
+        card_tags=pd.DataFrame({"card_name": ["Opt"], "tag_name": ["draw"]}),
+        card_types=pd.DataFrame({"card_name": ["Opt"], "type_name": ["instant"]}),
+    )
+
+    assert list(model.deck_cards.weights) == [1]
+
+
+def test_report_summary_matches_deck_stats(db):
+    deck_stats = pd.read_sql_query(DECK_STATS_QUERY, db)
+    summaries = {report.deck_name: report.summary for report in build_deck_reports(read_model(db), deck_stats)}
+
+    # mono_u's only ramp card is an Island, and land tags are left out as in deck_stats
+    assert summaries["mono_u"]["unique_tags"] == 1
+    assert summaries["izzet"]["unique_tags"] == 2
+
+
+def test_report_rejects_unknown_decks(db, tmp_path):
+    with pytest.raises(UnknownDecks, match="Unknown deck\\(s\\): nope"):
+        generate_report(db, tmp_path / "reports", decks=["izzet", "nope"])
+
+
+def test_report_index_quotes_deck_links(db, tmp_path):
+    db.execute("INSERT INTO decks (name) VALUES ('R&D #1')")
+    db.execute("INSERT INTO deck_cards (deck_name, card_name) VALUES ('R&D #1', 'Opt')")
+    db.commit()
+
+    generate_report(db, tmp_path, formats=["html"], max_workers=1)
+
+    index = (tmp_path / "html" / "index.html").read_text(encoding="utf-8")
+    assert '<a href="R%26D%20%231.html">R&amp;D #1</a>' in index
+    assert (tmp_path / "html" / "R&D #1.html").exists()
@@ -0,0 +1,55 @@
+import pytest
+
+from src.precon_db import card_search
+from src.precon_db.card_search import refresh_card_search, search_cards
+from src.precon_db.init_db import connect
+from src.precon_db.migrations import migrate
+
+
+@pytest.fixture
+def db(tmp_path):
+    conn = connect(tmp_path / "precon.db")
+    migrate(conn)
+    # Ten goblins, of which only the odd ones are in a deck; Goblin 9 is in every deck
+    conn.executemany("INSERT INTO cards (name, type) VALUES (?, 'creature')",
+                     [(f"Goblin {i}",) for i in range(10)])
+    conn.executemany("INSERT INTO decks (name) VALUES (?)", [("red",), ("mono_red",)])
+    conn.executemany("INSERT INTO deck_cards (deck_name, card_name) VALUES ('red', ?)",
+                     [(f"Goblin {i}",) for i in range(1, 10, 2)])
+    conn.execute("INSERT INTO deck_cards (deck_name, card_name) VALUES ('mono_red', 'Goblin 9')")
+    refresh_card_search(conn)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def test_search_only_returns_deck_cards(db):
+    assert sorted(search_cards(db, "goblin")) == ["Goblin 1", "Goblin 3", "Goblin 5", "Goblin 7", "Goblin 9"]
+    assert search_cards(db, "goblin 2") == []
+
+
+def test_limit_applies_after_the_deck_restriction(db):
+    assert len(search_cards(db, "goblin", limit=3)) == 3
+    assert len(search_cards(db, "goblin", limit=6)) == 5
+
+
+def test_only_the_most_played_candidates_are_ranked(db, monkeypatch):
+    monkeypatch.setattr(card_search, "RANK_CANDIDATES", 1)
+
+    assert search_cards(db, "goblin") == ["Goblin 9"]
+
+
+def test_name_hits_rank_first_even_past_the_candidate_cap(db, monkeypatch):
+    # The two most-played cards only match "goblin" in their type line, so
+    # every name hit falls outside the first RANK_CANDIDATES rows
+    db.execute("INSERT INTO decks (name) VALUES ('goblins')")
+    db.executemany("INSERT INTO cards (name, type) VALUES (?, 'Creature — Goblin')", [("Krenko",), ("Muxus",)])
+    db.executemany("INSERT INTO deck_cards (deck_name, card_name) VALUES (?, ?)",
+                   [(deck, card) for deck in ("red", "mono_red", "goblins") for card in ("Krenko", "Muxus")])
+    refresh_card_search(db)
+    monkeypatch.setattr(card_search, "RANK_CANDIDATES", 2)
+
+    results = search_cards(db, "goblin")
+    assert results[0] == "Goblin 9"
+    assert results[2:] == ["Krenko", "Muxus"]
+    assert search_cards(db, "goblin 7") == ["Goblin 7"]
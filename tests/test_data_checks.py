@@ -0,0 +1,32 @@
+import sqlite3
+
+from src.precon_db.data_checks import check_card_data, check_journal_mode
+from src.precon_db.init_db import connect
+from src.precon_db.migrations import migrate
+
+
+def test_cards_ingested_before_oracle_text_and_printings_fail(tmp_path):
+    conn = connect(tmp_path / "precon.db")
+    migrate(conn)
+    assert check_card_data(conn) == ["cards is empty"]
+
+    conn.execute("INSERT INTO cards (name, cmc, type, oracle_text) VALUES ('Opt', 1, 'Instant', 'Scry 1.')")
+    conn.execute("INSERT INTO cards (name, cmc, type) VALUES ('Sol Ring', 1, 'Artifact')")
+    assert check_card_data(conn) == ["1 of 2 cards have no oracle_text", "card_printings is empty"]
+
+    conn.execute("UPDATE cards SET oracle_text = '' WHERE name = 'Sol Ring'")
+    conn.execute("INSERT INTO card_printings VALUES ('c21', '263', 'Sol Ring')")
+    assert check_card_data(conn) == []
+    conn.close()
+
+
+def test_loader_connections_leave_the_file_in_wal_mode(tmp_path):
+    sqlite3.connect(tmp_path / "precon.db").close()
+    reader = sqlite3.connect(f"file:{tmp_path / 'precon.db'}?mode=ro", uri=True)
+    assert check_journal_mode(reader) == ["journal_mode is delete, not wal"]
+    reader.close()
+
+    connect(tmp_path / "precon.db").close()
+    reader = sqlite3.connect(f"file:{tmp_path / 'precon.db'}?mode=ro", uri=True)
+    assert check_journal_mode(reader) == []
+    reader.close()
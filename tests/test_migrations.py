@@ -0,0 +1,29 @@
+from src.precon_db.init_db import connect
+from src.precon_db.migrations import LATEST_VERSION, MIGRATIONS, get_version, migrate
+
+
+def _schema(conn):
+    return sorted(conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+
+
+def _migrate_to(conn, target):
+    for version, _, step in MIGRATIONS[:target]:
+        conn.executescript(f"BEGIN;\n{step}\nPRAGMA user_version = {version};\nCOMMIT;")
+
+
+def test_old_database_reaches_the_fresh_schema(tmp_path):
+    fresh = connect(tmp_path / "fresh.db")
+    migrate(fresh)
+
+    old = connect(tmp_path / "old.db")
+    _migrate_to(old, 2)
+    old.execute("INSERT INTO cards (name, cmc, type) VALUES ('Opt', 1, 'Instant'), ('Island', 0, 'Basic Land')")
+    old.execute("INSERT INTO card_types VALUES ('Opt', 'instant'), ('Island', 'land')")
+    old.execute("INSERT INTO decks VALUES ('mono_u')")
+    old.execute("INSERT INTO deck_cards VALUES ('Opt', 'mono_u'), ('Island', 'mono_u')")
+    old.commit()
+
+    assert migrate(old) == LATEST_VERSION == get_version(fresh)
+    assert _schema(old) == _schema(fresh)
+    assert old.execute("SELECT deck_name, total_cards, avg_cmc FROM deck_stats").fetchall() == [("mono_u", 1, 1.0)]
+    assert sorted(old.execute("SELECT name FROM card_search")) == [("Island",), ("Opt",)]
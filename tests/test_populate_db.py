@@ -0,0 +1,66 @@
+import functools
+
+from src.precon_db import populate_db
+from src.precon_db.change_tracking import ChangeReport
+from src.precon_db.ingestion import IngestionPipeline
+from src.precon_db.init_db import connect
+from src.precon_db.migrations import migrate
+from tests.conftest import card, stub_api
+
+
+def _versions(db_path):
+    conn = connect(db_path)
+    versions = dict(conn.execute("SELECT table_name, version FROM table_versions WHERE table_name LIKE 'deck_%'"))
+    conn.close()
+    return versions
+
+
+def test_noop_ingest_keeps_aggregate_versions(tmp_path, monkeypatch):
+    db_path = tmp_path / "precon.db"
+    conn = connect(db_path)
+    migrate(conn)
+    conn.close()
+    monkeypatch.setattr(populate_db, "connect", lambda: connect(db_path))
+    before = _versions(db_path)
+
+    populate_db.refresh_deck_aggregates(ChangeReport(decks_unchanged=["quick_draw"]))
+    assert _versions(db_path) == before
+
+    populate_db.refresh_deck_aggregates(ChangeReport(decks_changed=["quick_draw"]))
+    after = _versions(db_path)
+    assert after["deck_stats"] == before.get("deck_stats", 0) + 1
+
+
+def test_refetched_set_rewrites_changed_cards_and_links(tmp_path, monkeypatch, scryfall):
+    db_path = tmp_path / "precon.db"
+    conn = connect(db_path)
+    migrate(conn)
+    conn.close()
+    monkeypatch.setattr(populate_db, "connect", lambda: connect(db_path))
+    monkeypatch.setattr(populate_db, "ScryfallAPI", lambda: stub_api(scryfall))
+    monkeypatch.setattr(populate_db, "IngestionPipeline",
+                        functools.partial(IngestionPipeline, scryfall_api=stub_api(scryfall)))
+    monkeypatch.setattr(populate_db, "_get_tag_list", lambda: ["ramp", "draw"])
+    monkeypatch.setattr(populate_db, "populate_db_with_decks", lambda force, report, max_workers: report)
+
+    def serve(card_count, golem, ramp, draw):
+        scryfall.routes["/sets/tst"] = [(200, {}, {"code": "tst", "card_count": card_count, "released_at": "2024-01-01"})]
+        scryfall.search_pages("set:tst", [[golem]])
+        scryfall.search_pages('set:tst otag:"ramp"', [ramp])
+        scryfall.search_pages('set:tst otag:"draw"', [draw])
+
+    golem = card("Golem", cmc=2)
+    serve(1, golem, ramp=[golem], draw=[])
+    assert populate_db.populate_db(set="tst").sets_added == ["tst"]
+
+    # Upstream the Golem got cheaper, lost its ramp tag and gained draw
+    golem = {**card("Golem", cmc=1), "type_line": "Artifact Creature — Golem"}
+    serve(2, golem, ramp=[], draw=[golem])
+    assert populate_db.populate_db(set="tst").sets_changed == ["tst"]
+
+    conn = connect(db_path)
+    assert conn.execute("SELECT cmc, type FROM cards WHERE name = 'Golem'").fetchone() == (1, "Artifact Creature — Golem")
+    assert sorted(conn.execute("SELECT type_name FROM card_types WHERE card_name = 'Golem'")) == [
+        ("artifact",), ("creature",)]
+    assert conn.execute("SELECT tag_name FROM card_tags WHERE card_name = 'Golem'").fetchall() == [("draw",)]
+    conn.close()
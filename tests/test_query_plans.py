@@ -0,0 +1,20 @@
+import pytest
+
+from src.precon_db.init_db import connect
+from src.precon_db.migrations import migrate
+from src.precon_db.query_plans import _dashboard_queries, find_table_scans
+
+QUERIES = _dashboard_queries()
+
+
+@pytest.fixture(scope="module")
+def migrated_db(tmp_path_factory):
+    conn = connect(tmp_path_factory.mktemp("plans") / "precon.db")
+    migrate(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_query_uses_indexes(migrated_db, name):
+    assert find_table_scans(migrated_db, QUERIES[name]) == []
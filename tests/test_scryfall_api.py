@@ -0,0 +1,162 @@
+import time
+
+import pytest
+
+from src.external.rate_limiter import TokenBucket
+from src.external.response_cache import ResponseCache
+from src.external.scryfall_api import IncompleteSearch, ScryfallUnavailable
+from src.precon_db.ingestion import IngestionPipeline, SearchJob
+from src.precon_db.init_db import connect
+from src.precon_db.migrations import migrate
+from tests.conftest import card, stub_api
+
+
+def test_429_waits_for_retry_after(scryfall):
+    scryfall.routes["set:tst"] = [(429, {"Retry-After": "0.3"}, None),
+                                  (200, {}, {"object": "list", "data": [card("Golem")], "has_more": False})]
+    api = stub_api(scryfall)
+
+    page = api.scryfall_oracle_search("set:tst")
+
+    assert [c["name"] for c in page["data"]] == ["Golem"]
+    assert api.retry_count == 1
+    (first, _), (second, _) = scryfall.requests
+    assert second - first >= 0.3
+
+
+def test_5xx_retries_with_exponential_backoff(scryfall):
+    scryfall.routes["set:tst"] = [(503, {}, None), (502, {}, None),
+                                  (200, {}, {"object": "list", "data": [], "has_more": False})]
+    api = stub_api(scryfall, backoff=0.1)
+
+    assert api.scryfall_oracle_search("set:tst")["data"] == []
+    assert api.retry_count == 2
+    times = [at for at, _ in scryfall.requests]
+    # backoff * 2**attempt, plus up to `backoff` of jitter
+    assert times[1] - times[0] >= 0.1
+    assert times[2] - times[1] >= 0.2
+
+
+def test_retries_running_out_raise(scryfall):
+    scryfall.routes["set:tst"] = [(500, {}, None)]
+    api = stub_api(scryfall, max_retries=2)
+
+    with pytest.raises(ScryfallUnavailable):
+        api.scryfall_oracle_search("set:tst")
+    assert scryfall.count("set:tst") == 3
+
+
+def _page(*names):
+    return 200, {}, {"object": "list", "data": [card(name) for name in names], "has_more": False}
+
+
+def test_one_failed_request_falls_back_without_going_offline(scryfall, tmp_path):
+    scryfall.routes["set:old"] = [_page("Golem"), (503, {}, None)]
+    scryfall.routes["set:new"] = [_page("Myr"), _page("Myr", "Thopter")]
+    api = stub_api(scryfall, cache=ResponseCache(tmp_path / "cache.db"), max_retries=1)
+    api.scryfall_oracle_search("set:old")
+    api.scryfall_oracle_search("set:new")
+
+    assert [c["name"] for c in api.scryfall_oracle_search("set:old", fresh=True)["data"]] == ["Golem"]
+    assert not api.offline
+    # The next request still reaches Scryfall instead of the stale cached copy
+    assert [c["name"] for c in api.scryfall_oracle_search("set:new", fresh=True)["data"]] == ["Myr", "Thopter"]
+    assert scryfall.count("set:new") == 2
+
+
+def test_failures_in_a_row_serve_the_cache_for_a_cooldown(scryfall, tmp_path):
+    scryfall.routes["set:old"] = [_page("Golem"), (503, {}, None)]
+    scryfall.routes["set:new"] = [_page("Myr"), _page("Myr", "Thopter")]
+    api = stub_api(scryfall, cache=ResponseCache(tmp_path / "cache.db"), max_retries=0,
+                   offline_after=2, offline_cooldown=0.3)
+    api.scryfall_oracle_search("set:old")
+    api.scryfall_oracle_search("set:new")
+
+    for _ in range(2):
+        api.scryfall_oracle_search("set:old", fresh=True)
+    assert api.offline
+    assert [c["name"] for c in api.scryfall_oracle_search("set:new", fresh=True)["data"]] == ["Myr"]
+    assert scryfall.count("set:new") == 1
+
+    time.sleep(0.3)
+    assert [c["name"] for c in api.scryfall_oracle_search("set:new", fresh=True)["data"]] == ["Myr", "Thopter"]
+    assert not api.offline
+
+
+def test_empty_search_is_not_a_failure(scryfall):
+    # Scryfall answers a search without results with a 404
+    assert stub_api(scryfall).scryfall_oracle_search("set:none") is None
+
+
+def test_token_bucket_paces_concurrent_workers(scryfall):
+    scryfall.routes["set:tst"] = [(200, {}, {"object": "list", "data": [], "has_more": False})]
+    api = stub_api(scryfall, rate_limiter=TokenBucket(rate=20, capacity=1))
+    jobs = [SearchJob(mtg_set="tst", tag=None, query="set:tst") for _ in range(9)]
+
+    IngestionPipeline(api, jobs=4).run(connect(":memory:"), jobs)
+
+    times = sorted(at for at, _ in scryfall.requests)
+    assert len(times) == 9
+    # One token up front, then one every 1/20 s however many workers ask
+    assert times[-1] - times[0] >= 8 / 20 * 0.9
+
+
+def test_failed_searches_are_counted(scryfall, tmp_path):
+    scryfall.search_pages("set:tst", [[card("Golem"), card("Myr")], [card("Thopter")]])
+    scryfall.routes["set:bad"] = [(503, {}, None)]
+    conn = connect(tmp_path / "precon.db")
+    migrate(conn)
+    good = SearchJob(mtg_set="tst", tag=None, query="set:tst")
+    bad = SearchJob(mtg_set="bad", tag=None, query="set:bad")
+    done = {}
+
+    pipeline = IngestionPipeline(stub_api(scryfall, max_retries=1), jobs=2,
+                                 on_job_done=lambda job, inserted, stats: done.update({job: inserted}))
+    stats = pipeline.run(conn, [good, bad])
+
+    assert stats.completed == 2
+    assert stats.failed == 1
+    assert stats.failed_jobs == [bad]
+    assert done == {good: 3, bad: 0}
+    assert conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0] == 3
+
+
+def test_search_follows_every_page(scryfall):
+    scryfall.search_pages("set:tst", [[card("Golem")], [card("Myr")], [card("Thopter")]])
+
+    names = [c["name"] for c in stub_api(scryfall).iter_search("set:tst")]
+
+    assert names == ["Golem", "Myr", "Thopter"]
+
+
+def test_missing_later_page_raises_instead_of_truncating(scryfall):
+    scryfall.search_pages("set:tst", [[card("Golem")], [card("Myr")]])
+    # The second page now answers 404, e.g. an expired next_page link
+    del scryfall.routes["/page/set:tst/1"]
+    results = stub_api(scryfall).iter_search("set:tst")
+
+    assert next(results)["name"] == "Golem"
+    with pytest.raises(IncompleteSearch):
+        next(results)
+
+
+def test_truncated_search_is_a_failed_job(scryfall):
+    scryfall.search_pages("set:tst", [[card("Golem")], [card("Myr")]])
+    scryfall.routes["/page/set:tst/1"] = [(500, {}, None)]
+    job = SearchJob(mtg_set="tst", tag=None, query="set:tst")
+
+    stats = IngestionPipeline(stub_api(scryfall, max_retries=1), jobs=1).run(connect(":memory:"), [job])
+
+    assert stats.failed_jobs == [job]
+
+
+def test_writer_failure_stops_queued_jobs(scryfall):
+    for i in range(6):
+        scryfall.search_pages(f"set:s{i}", [[card(f"Card {i}")]])
+    jobs = [SearchJob(mtg_set=f"s{i}", tag=None, query=f"set:s{i}") for i in range(6)]
+
+    # No schema: the first write raises and cancels the run
+    with pytest.raises(Exception):
+        IngestionPipeline(stub_api(scryfall), jobs=1, flush_every=1).run(connect(":memory:"), jobs)
+
+    assert len(scryfall.requests) < len(jobs)